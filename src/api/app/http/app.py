@@ -19,8 +19,7 @@ from internal.server import Http
 from .module import injector
 
 app = Http(__name__,
-           static_folder="../../storage/file_storage",
-           static_url_path="/static",
+           static_folder=None,
            router=injector.get(Router),
            db=db,
            weaviate=injector.get(FlaskWeaviate),
@@ -55,6 +55,45 @@ class Config:
             "broker_connection_retry_on_startup": _get_bool_env("CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP")
         }
 
+        self.CELERY_WORKER_AMOUNT = int(_get_env("CELERY_WORKER_AMOUNT"))
+
+        # pdf并行解析配置
+        self.PDF_PARSE_WORKERS = int(_get_env("PDF_PARSE_WORKERS"))
+        self.PDF_PARSE_PAGES_PER_CHUNK = int(_get_env("PDF_PARSE_PAGES_PER_CHUNK"))
+        self.PDF_PARSE_PROCESS_POOL = _get_bool_env("PDF_PARSE_PROCESS_POOL")
+
+        # 文档解析结果缓存目录
+        self.PARSE_CACHE_DIR = _get_env("PARSE_CACHE_DIR")
+
+        # 静态文件发送配置
+        self.STATIC_DELIVERY_MODE = _get_env("STATIC_DELIVERY_MODE")
+        self.STATIC_ACCEL_PREFIX = _get_env("STATIC_ACCEL_PREFIX")
+        self.STATIC_MAX_AGE = int(_get_env("STATIC_MAX_AGE"))
+
+        # 工作流调试运行方式，可选thread/celery
+        self.WORKFLOW_RUN_MODE = _get_env("WORKFLOW_RUN_MODE")
+
+        # 工作流运行追踪配置
+        self.WORKFLOW_TRACE_EXPORTER = _get_env("WORKFLOW_TRACE_EXPORTER")
+        self.WORKFLOW_TRACE_FILE_DIR = _get_env("WORKFLOW_TRACE_FILE_DIR")
+        self.WORKFLOW_TRACE_OTLP_ENDPOINT = _get_env("WORKFLOW_TRACE_OTLP_ENDPOINT")
+
+        # 工作流运行结果中单独存储的节点数据目录
+        self.WORKFLOW_STATE_VALUE_DIR = _get_env("WORKFLOW_STATE_VALUE_DIR")
+
+        # 工作流Http请求节点连接池配置
+        self.HTTP_REQUEST_NODE_CONNECT_TIMEOUT = float(_get_env("HTTP_REQUEST_NODE_CONNECT_TIMEOUT"))
+        self.HTTP_REQUEST_NODE_READ_TIMEOUT = float(_get_env("HTTP_REQUEST_NODE_READ_TIMEOUT"))
+        self.HTTP_REQUEST_NODE_MAX_CONNECTIONS = int(_get_env("HTTP_REQUEST_NODE_MAX_CONNECTIONS"))
+        self.HTTP_REQUEST_NODE_MAX_CONNECTIONS_PER_HOST = int(_get_env("HTTP_REQUEST_NODE_MAX_CONNECTIONS_PER_HOST"))
+        self.HTTP_REQUEST_NODE_MAX_RESPONSE_SIZE = int(_get_env("HTTP_REQUEST_NODE_MAX_RESPONSE_SIZE"))
+
+        # 工作流代码节点沙箱进程池配置
+        self.CODE_SANDBOX_WORKERS = int(_get_env("CODE_SANDBOX_WORKERS"))
+        self.CODE_SANDBOX_CPU_TIME = int(_get_env("CODE_SANDBOX_CPU_TIME"))
+        self.CODE_SANDBOX_MEMORY_LIMIT = int(_get_env("CODE_SANDBOX_MEMORY_LIMIT"))
+        self.CODE_SANDBOX_TIMEOUT = float(_get_env("CODE_SANDBOX_TIMEOUT"))
+
         # 辅助Agent应用id标识
         self.ASSISTANT_AGENT_ID = _get_env("ASSISTANT_AGENT_ID")
 
@@ -26,6 +26,44 @@ DEFAULT_CONFIG = {
     "CELERY_TASK_IGNORE_RESULT": "False",
     "CELERY_RESULT_EXPIRES": 3600,
     "CELERY_BROKER_CONNECTION_RETRY_ON_STARTUP": "True",
+    "CELERY_WORKER_AMOUNT": 5,
+
+    # pdf并行解析配置，进程数为0时按CPU核数/Celery并发数自动计算，运行环境不允许创建子进程时关闭进程池
+    "PDF_PARSE_WORKERS": 0,
+    "PDF_PARSE_PAGES_PER_CHUNK": 20,
+    "PDF_PARSE_PROCESS_POOL": "True",
+
+    # 文档解析结果缓存目录，为空时写入项目下的storage/parse_cache
+    "PARSE_CACHE_DIR": "",
+
+    # 静态文件发送配置，非flask模式下由前置的web服务器直接发送文件
+    "STATIC_DELIVERY_MODE": "flask",
+    "STATIC_ACCEL_PREFIX": "/_protected_storage/",
+    "STATIC_MAX_AGE": 3600,
+
+    # 工作流调试运行方式，celery模式下投递到workflow队列中运行，事件通过Redis转发
+    "WORKFLOW_RUN_MODE": "thread",
+
+    # 工作流运行追踪配置，导出方式可选 none/json/otlp，json文件目录为空时写入storage/workflow_trace
+    "WORKFLOW_TRACE_EXPORTER": "none",
+    "WORKFLOW_TRACE_FILE_DIR": "",
+    "WORKFLOW_TRACE_OTLP_ENDPOINT": "http://localhost:4318/v1/traces",
+
+    # 工作流运行结果中超过大小限制的节点输入/输出单独存储的目录，为空时写入storage/workflow_state
+    "WORKFLOW_STATE_VALUE_DIR": "",
+
+    # 工作流Http请求节点连接池配置，超时时间单位为秒，响应大小单位为字节
+    "HTTP_REQUEST_NODE_CONNECT_TIMEOUT": 5,
+    "HTTP_REQUEST_NODE_READ_TIMEOUT": 60,
+    "HTTP_REQUEST_NODE_MAX_CONNECTIONS": 100,
+    "HTTP_REQUEST_NODE_MAX_CONNECTIONS_PER_HOST": 10,
+    "HTTP_REQUEST_NODE_MAX_RESPONSE_SIZE": 10485760,
+
+    # 工作流代码节点沙箱进程池配置，进程数为0时使用CPU核数，CPU时间及超时时间单位为秒，内存单位为字节
+    "CODE_SANDBOX_WORKERS": 0,
+    "CODE_SANDBOX_CPU_TIME": 10,
+    "CODE_SANDBOX_MEMORY_LIMIT": 536870912,
+    "CODE_SANDBOX_TIMEOUT": 30,
 
     # 辅助Agent
     "ASSISTANT_AGENT_ID": "6774fcef-b594-8008-b30c-a05b8190afe9",
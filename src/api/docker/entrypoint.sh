@@ -8,8 +8,8 @@ if [[ "${MIGRATION_ENABLED}" == "true" ]]; then
 fi
 
 if [[ "${MODE}" == "celery" ]]; then
-  # 运行celery
-  celery -A app.http.app.celery worker -P ${CELERY_WORKER_CLASS:-prefork} -c ${CELERY_WORKER_AMOUNT:-5} --loglevel INFO
+  # 运行celery，可通过CELERY_QUEUES=workflow启动只运行工作流的工作进程
+  celery -A app.http.app.celery worker -P ${CELERY_WORKER_CLASS:-prefork} -c ${CELERY_WORKER_AMOUNT:-5} -Q ${CELERY_QUEUES:-celery,workflow} --loglevel INFO
 
 else
   # 5 api环境，判断是生产环境，还是开发环境
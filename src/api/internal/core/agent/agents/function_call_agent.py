@@ -20,6 +20,8 @@ from internal.lib.helper import convert_model_to_dict
 from .base_angent import BaseAgent
 from ...language_model.entities.model_entity import ModelFeature
 from ...workflow import Workflow
+from ...workflow.entities.workflow_entity import WORKFLOW_TOKEN_EVENT_KEY
+from ...workflow.utils.state_serializer import serialize_node_result
 
 
 class FunctionCallAgent(BaseAgent):
@@ -295,11 +297,36 @@ class FunctionCallAgent(BaseAgent):
                 if isinstance(tool, Workflow):
                     """workflow 采用流式请求，输出处理过程"""
                     last_chunk = ''
-                    async for chunk in tool.astream(tool_call["args"]):
+                    token_event_ids = {}
+                    async for chunk in tool.astream(tool_call["args"], stream_tokens=True):
+                        # 大模型类节点的增量token事件，同一个节点使用相同的事件id，前端按事件id叠加展示
+                        if WORKFLOW_TOKEN_EVENT_KEY in chunk:
+                            token_event = chunk[WORKFLOW_TOKEN_EVENT_KEY]
+                            self.agent_queue_manager.publish(state["task_id"], AgentThought(
+                                id=token_event_ids.setdefault(token_event.node_id, uuid.uuid4()),
+                                task_id=state["task_id"],
+                                event=QueueEvent.WORKFLOW_NODE_TOKEN,
+                                observation=json.dumps({
+                                    **token_event.model_dump(mode="json"),
+                                    "wf_cn_name": tool.get_workflow_config().cn_name
+                                }),
+                                tool=tool_call["name"],
+                                tool_input=tool_call["args"],
+                            ))
+                            continue
                         chunk_value = list(chunk.values())[0]
                         latency = chunk_value.get('node_results')[0].latency
                         chunk_dic = {
-                            "value": convert_model_to_dict(chunk_value),
+                            # 节点输出索引与node_results中的输出重复，无需推送，节点结果使用精简格式
+                            "value": {
+                                **convert_model_to_dict({
+                                    key: value for key, value in chunk_value.items()
+                                    if key not in ("node_outputs", "node_results")
+                                }),
+                                "node_results": [
+                                    serialize_node_result(node_result) for node_result in chunk_value["node_results"]
+                                ],
+                            },
                             "wf_cn_name": tool.get_workflow_config().cn_name
                         }
                         self.agent_queue_manager.publish(state["task_id"], AgentThought(
@@ -22,6 +22,7 @@ class QueueEvent(str, Enum):
     PING = "ping"  # ping联通事件
     AGENT_THINK = "agent_think"  # 智能体思考事件
     WORKFLOW_NODE_MESSAGE = "workflow_node_message"  # 工作流节点执行消息
+    WORKFLOW_NODE_TOKEN = "workflow_node_token"  # 工作流大模型类节点增量token消息，只用于流式展示不做存储
 
 
 class AgentThought(BaseModel):
@@ -8,11 +8,13 @@ import requests
 from injector import inject
 from langchain_community.document_loaders import UnstructuredExcelLoader, UnstructuredMarkdownLoader, \
     UnstructuredPDFLoader, UnstructuredHTMLLoader, UnstructuredCSVLoader, UnstructuredPowerPointLoader, \
-    UnstructuredXMLLoader, UnstructuredFileLoader, TextLoader
+    UnstructuredXMLLoader, UnstructuredFileLoader
 from langchain_core.documents import Document as LCDocument
 
 from internal.model import UploadFile
 from internal.service import CosLocalService
+from .pdf_loader import ParallelPDFLoader
+from .text_loaders import FastTextLoader, FastCSVLoader, FastJSONLoader, FastHTMLLoader
 
 
 @inject
@@ -23,15 +25,11 @@ class FileExtractor:
     def load(self,
              upload_file: UploadFile,
              return_text: bool = False,
-             is_unstructured: bool = True) -> Union[list[LCDocument], str]:
+             is_unstructured: bool = False) -> Union[list[LCDocument], str]:
         """加载传入的upload_file记录，返回langchain文档列表"""
-        # 1. 创建临时文件夹
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # 2. 构建一个临时文件路径
-            file_path = os.path.join(temp_dir, os.path.basename(upload_file.key))
-            # 3. 将对象下载到本地
-            self.cos_service.download_file(upload_file.key, file_path)
-            # 4. 从指定路径加载文件
+        # 1. 获取对象的本地路径，本地存储直接使用磁盘文件，远程存储才会下载到临时目录
+        with self.cos_service.open_local_file(upload_file.key) as file_path:
+            # 2. 从指定路径加载文件
             return self.load_from_file(file_path, return_text, is_unstructured)
 
     @classmethod
@@ -48,26 +46,30 @@ class FileExtractor:
     @classmethod
     def load_from_file(cls, file_path: str,
                        return_text: bool = False,
-                       is_unstructured: bool = True):
-        """从文件中加载数据，返回langchain文档列表"""
+                       is_unstructured: bool = False):
+        """从文件中加载数据，返回langchain文档列表，纯文本类文件默认使用轻量加载器，is_unstructured为True时统一使用Unstructured解析"""
         delimiter = "\n\n"
         file_extension = Path(file_path).suffix.lower()
 
-        if file_extension in [".xlsx", "xls"]:
+        if file_extension in [".xlsx", ".xls"]:
             loader = UnstructuredExcelLoader(file_path)
         elif file_extension in [".md", ".markdown"]:
-            loader = UnstructuredMarkdownLoader(file_path)
+            loader = UnstructuredMarkdownLoader(file_path) if is_unstructured else FastTextLoader(file_path)
         elif file_extension == ".pdf":
-            loader = UnstructuredPDFLoader(file_path)
+            loader = UnstructuredPDFLoader(file_path) if is_unstructured else ParallelPDFLoader(file_path)
         elif file_extension in [".html", ".htm"]:
-            loader = UnstructuredHTMLLoader(file_path)
+            loader = UnstructuredHTMLLoader(file_path) if is_unstructured else FastHTMLLoader(file_path)
         elif file_extension == ".csv":
-            loader = UnstructuredCSVLoader(file_path)
+            loader = UnstructuredCSVLoader(file_path) if is_unstructured else FastCSVLoader(file_path)
+        elif file_extension == ".json":
+            loader = FastJSONLoader(file_path)
         elif file_extension in [".ppt", ".pptx"]:
             loader = UnstructuredPowerPointLoader(file_path)
         elif file_extension == ".xml":
             loader = UnstructuredXMLLoader(file_path)
+        elif file_extension in [".doc", ".docx"]:
+            loader = UnstructuredFileLoader(file_path)
         else:
-            loader = UnstructuredFileLoader(file_path) if is_unstructured else TextLoader(file_path)
+            loader = UnstructuredFileLoader(file_path) if is_unstructured else FastTextLoader(file_path)
 
         return delimiter.join([doc.page_content for doc in loader.load()]) if return_text else loader.load()
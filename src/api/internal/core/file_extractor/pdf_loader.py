@@ -0,0 +1,74 @@
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, Optional
+
+from flask import current_app, has_app_context
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document as LCDocument
+
+from internal.lib.pdf_helper import get_pdf_page_count, split_page_ranges, partition_pdf_pages
+
+
+class ParallelPDFLoader(BaseLoader):
+    """pdf并行加载器，将pdf按页拆分为多个区间并使用进程池并行解析，按原始顺序合并并保留页码元数据"""
+
+    def __init__(
+            self,
+            file_path: str,
+            max_workers: Optional[int] = None,
+            pages_per_chunk: Optional[int] = None,
+            use_process_pool: Optional[bool] = None,
+    ):
+        self.file_path = file_path
+        self.use_process_pool = use_process_pool if use_process_pool is not None \
+            else self._get_config("PDF_PARSE_PROCESS_POOL", True)
+        self.max_workers = max_workers if max_workers is not None else self._get_default_max_workers()
+        self.pages_per_chunk = max(1, pages_per_chunk or self._get_config("PDF_PARSE_PAGES_PER_CHUNK", 20))
+
+    def lazy_load(self) -> Iterator[LCDocument]:
+        # 1. 拆分页面区间，页数较少、只允许单进程或配置关闭了进程池(运行环境不允许创建子进程)时直接顺序解析
+        page_ranges = split_page_ranges(get_pdf_page_count(self.file_path), self.pages_per_chunk)
+        max_workers = min(self.max_workers, len(page_ranges))
+        if max_workers <= 1 or not self.use_process_pool:
+            for start, end in page_ranges:
+                yield from self._to_documents(partition_pdf_pages(self.file_path, start, end))
+            return
+
+        # 2. 使用spawn启动子进程，避免在多线程的父进程中fork导致死锁
+        logging.info("并行解析pdf文件: %(path)s, 区间数: %(ranges)d, 进程数: %(workers)d", {
+            "path": self.file_path,
+            "ranges": len(page_ranges),
+            "workers": max_workers,
+        })
+        with ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            # 3. map会按照提交顺序返回结果，保证文档顺序与页面顺序一致
+            for results in executor.map(
+                    partition_pdf_pages,
+                    [self.file_path] * len(page_ranges),
+                    [start for start, _ in page_ranges],
+                    [end for _, end in page_ranges],
+            ):
+                yield from self._to_documents(results)
+
+    @classmethod
+    def _to_documents(cls, results: list[tuple[str, dict]]) -> Iterator[LCDocument]:
+        for page_content, metadata in results:
+            yield LCDocument(page_content=page_content, metadata=metadata)
+
+    @classmethod
+    def _get_default_max_workers(cls) -> int:
+        """获取默认的进程数，未配置时按CPU核数平摊到每个Celery并发进程上，避免多个任务同时解析时超额占用CPU"""
+        max_workers = int(cls._get_config("PDF_PARSE_WORKERS", 0))
+        if max_workers > 0:
+            return max_workers
+        celery_worker_amount = max(1, int(cls._get_config("CELERY_WORKER_AMOUNT", 1)))
+        return max(1, (os.cpu_count() or 1) // celery_worker_amount)
+
+    @classmethod
+    def _get_config(cls, key: str, default):
+        return current_app.config.get(key, default) if has_app_context() else default
@@ -0,0 +1,124 @@
+import csv
+import json
+from typing import Iterator
+
+from charset_normalizer import from_bytes
+from langchain_core.document_loaders import BaseLoader
+from langchain_core.documents import Document as LCDocument
+from lxml import html as lxml_html
+
+# csv文件每批次合并的行数
+CSV_ROWS_PER_BATCH = 200
+
+# 检测文件编码时读取的字节数
+ENCODING_DETECT_SIZE = 64 * 1024
+
+# html中需要剔除的非正文标签
+HTML_IGNORE_TAGS = ["script", "style", "noscript", "template", "svg", "head"]
+
+
+def read_text(file_path: str) -> str:
+    """读取文本文件内容，优先按utf-8解码，失败后再检测文件编码"""
+    with open(file_path, "rb") as file:
+        content = file.read()
+    try:
+        return content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        best = from_bytes(content).best()
+        return str(best) if best is not None else content.decode("utf-8", errors="ignore")
+
+
+class FastTextLoader(BaseLoader):
+    """纯文本加载器，适用于txt/markdown等无需版面分析的文件"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def lazy_load(self) -> Iterator[LCDocument]:
+        yield LCDocument(page_content=read_text(self.file_path), metadata={"source": self.file_path})
+
+
+class FastCSVLoader(BaseLoader):
+    """csv加载器，逐行流式读取并按批次合并为文档，避免一次性解析整张表格"""
+
+    def __init__(self, file_path: str, rows_per_batch: int = CSV_ROWS_PER_BATCH):
+        self.file_path = file_path
+        self.rows_per_batch = rows_per_batch
+
+    def lazy_load(self) -> Iterator[LCDocument]:
+        with open(self.file_path, "r", encoding=self._detect_encoding(), newline="") as file:
+            reader = csv.reader(file)
+            header = next(reader, None)
+            if not header:
+                return
+
+            lines = []
+            start_row = 1
+            for row_index, row in enumerate(reader, start=1):
+                lines.append("\n".join(
+                    f"{column.strip()}: {value.strip()}" for column, value in zip(header, row) if value.strip()
+                ))
+                if len(lines) >= self.rows_per_batch:
+                    yield self._build_document(lines, start_row, row_index)
+                    lines = []
+                    start_row = row_index + 1
+            if lines:
+                yield self._build_document(lines, start_row, start_row + len(lines) - 1)
+
+    def _detect_encoding(self) -> str:
+        """检测csv文件编码，只读取文件头部的数据"""
+        with open(self.file_path, "rb") as file:
+            head = file.read(ENCODING_DETECT_SIZE)
+        try:
+            head.decode("utf-8-sig")
+            return "utf-8-sig"
+        except UnicodeDecodeError as e:
+            # 头部末尾被截断的多字节字符不代表编码错误
+            if len(head) == ENCODING_DETECT_SIZE and e.start >= len(head) - 4:
+                return "utf-8-sig"
+        best = from_bytes(head).best()
+        return best.encoding if best is not None else "utf-8"
+
+    def _build_document(self, lines: list[str], start_row: int, end_row: int) -> LCDocument:
+        return LCDocument(
+            page_content="\n\n".join(lines),
+            metadata={"source": self.file_path, "start_row": start_row, "end_row": end_row},
+        )
+
+
+class FastJSONLoader(BaseLoader):
+    """json加载器，将json数据格式化为可读的文本"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def lazy_load(self) -> Iterator[LCDocument]:
+        data = json.loads(read_text(self.file_path))
+        yield LCDocument(
+            page_content=json.dumps(data, ensure_ascii=False, indent=2),
+            metadata={"source": self.file_path},
+        )
+
+
+class FastHTMLLoader(BaseLoader):
+    """html加载器，使用lxml直接提取正文文本"""
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def lazy_load(self) -> Iterator[LCDocument]:
+        content = read_text(self.file_path)
+        if not content.strip():
+            yield LCDocument(page_content="", metadata={"source": self.file_path})
+            return
+
+        tree = lxml_html.fromstring(content)
+        title = tree.findtext(".//title") or ""
+        for element in tree.xpath("|".join(f"//{tag}" for tag in HTML_IGNORE_TAGS)):
+            element.drop_tree()
+
+        lines = [line.strip() for line in tree.text_content().splitlines()]
+        yield LCDocument(
+            page_content="\n".join(line for line in lines if line),
+            metadata={"source": self.file_path, "title": title.strip()},
+        )
@@ -0,0 +1,3 @@
+from .text_cleaner import TextCleaner, get_text_cleaner, BASE_TEXT_CLEANER
+
+__all__ = ["TextCleaner", "get_text_cleaner", "BASE_TEXT_CLEANER"]
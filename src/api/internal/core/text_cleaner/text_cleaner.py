@@ -0,0 +1,112 @@
+import hashlib
+import json
+import re
+from functools import lru_cache, partial
+from typing import Callable, Iterable, Iterator
+
+# 大文本按块清洗时每个块的字符数
+CLEAN_CHUNK_SIZE = 256 * 1024
+
+# 缓存的清洗器数量，每个不同的预处理规则对应一个清洗器
+CLEANER_CACHE_SIZE = 128
+
+# 多余空白字符
+EXTRA_NEWLINE_PATTERN = re.compile(r'\n{3,}')
+EXTRA_SPACE_PATTERN = re.compile(r'[\t\f\r\x20\u00a0\u1680\u180e\u2000-\u200a\u202f\u205f\u3000]{2,}')
+
+# 邮箱及URL链接
+EMAIL_PATTERN = re.compile(r'([a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+)')
+URL_PATTERN = re.compile(r'https?://[^\s]+')
+
+# 特殊token标记及不可见的控制字符
+SPECIAL_TOKEN_PATTERN = re.compile(r'<\||\|>')
+INVISIBLE_CHARS_TABLE = str.maketrans("", "", "".join(
+    [chr(code) for code in [*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20), 0x7F, 0xEF, 0xBF, 0xBE, 0xFFFE]]
+))
+
+
+class TextCleaner:
+    """文本清洗器，将清洗规则预编译为一条处理链，大文本按换行边界分块后依次执行整条处理链"""
+
+    def __init__(self, steps: list[Callable[[str], str]], chunkable: bool = True):
+        self._steps = steps
+        # 删除链接/邮箱后可能产生新的连续空白，这类规则排在删除空白之前时不能分块处理
+        self._chunkable = chunkable
+
+    @classmethod
+    def from_pre_process_rules(cls, pre_process_rules: list[dict]) -> "TextCleaner":
+        """根据处理规则中的预处理规则列表构建清洗器"""
+        steps = []
+        chunkable = True
+        removed_url = False
+        for pre_process_rule in pre_process_rules:
+            if pre_process_rule["enabled"] is not True:
+                continue
+            if pre_process_rule["id"] == "remove_extra_space":
+                steps.append(partial(EXTRA_NEWLINE_PATTERN.sub, '\n\n'))
+                steps.append(partial(EXTRA_SPACE_PATTERN.sub, ' '))
+                chunkable = chunkable and not removed_url
+            elif pre_process_rule["id"] == "remove_url_and_email":
+                steps.append(partial(EMAIL_PATTERN.sub, ''))
+                steps.append(partial(URL_PATTERN.sub, ''))
+                removed_url = True
+        return cls(steps, chunkable)
+
+    def clean(self, text: str) -> str:
+        """清洗文本，返回清洗后的文本"""
+        if not self._steps:
+            return text
+        if not self._chunkable or len(text) <= CLEAN_CHUNK_SIZE:
+            return self._clean_chunk(text)
+        return "".join(self.clean_iter(
+            text[start:start + CLEAN_CHUNK_SIZE] for start in range(0, len(text), CLEAN_CHUNK_SIZE)
+        ))
+
+    def clean_iter(self, chunks: Iterable[str]) -> Iterator[str]:
+        """流式清洗文本块，只在不会被任何规则跨越的换行边界处切分，保证结果与整体清洗一致"""
+        if not self._chunkable:
+            yield self._clean_chunk("".join(chunks))
+            return
+
+        buffer = ""
+        for chunk in chunks:
+            buffer += chunk
+            if len(buffer) < CLEAN_CHUNK_SIZE:
+                continue
+            cut = self._find_cut(buffer)
+            if cut > 0:
+                yield self._clean_chunk(buffer[:cut])
+                buffer = buffer[cut:]
+        if buffer:
+            yield self._clean_chunk(buffer)
+
+    def _clean_chunk(self, text: str) -> str:
+        for step in self._steps:
+            text = step(text)
+        return text
+
+    @classmethod
+    def _find_cut(cls, buffer: str) -> int:
+        """查找最后一个后面不再紧跟换行符的换行位置，在其之后切分，未找到时返回0"""
+        position = buffer.rfind("\n", 0, len(buffer) - 1)
+        while position >= 0 and buffer[position + 1] == "\n":
+            position = buffer.rfind("\n", 0, position)
+        return position + 1
+
+
+# 文档解析后的基础清洗：还原特殊token标记并删除不可见的控制字符
+BASE_TEXT_CLEANER = TextCleaner([
+    partial(SPECIAL_TOKEN_PATTERN.sub, lambda match: "<" if match.group() == "<|" else ">"),
+    lambda text: text.translate(INVISIBLE_CHARS_TABLE),
+])
+
+
+@lru_cache(maxsize=CLEANER_CACHE_SIZE)
+def _get_text_cleaner_by_hash(rules_hash: str, rules_json: str) -> TextCleaner:
+    return TextCleaner.from_pre_process_rules(json.loads(rules_json))
+
+
+def get_text_cleaner(pre_process_rules: list[dict]) -> TextCleaner:
+    """获取预处理规则对应的清洗器，相同规则只编译一次"""
+    rules_json = json.dumps(pre_process_rules, sort_keys=True, ensure_ascii=False)
+    return _get_text_cleaner_by_hash(hashlib.md5(rules_json.encode("utf-8")).hexdigest(), rules_json)
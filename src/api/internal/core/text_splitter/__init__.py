@@ -0,0 +1,3 @@
+from .token_text_splitter import TokenOffsetTextSplitter
+
+__all__ = ["TokenOffsetTextSplitter"]
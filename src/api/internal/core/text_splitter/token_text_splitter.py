@@ -0,0 +1,115 @@
+import re
+from bisect import bisect_left
+from collections import deque
+from typing import Any, Optional
+
+import tiktoken
+from langchain_text_splitters import TextSplitter
+
+
+class TokenOffsetTextSplitter(TextSplitter):
+    """基于token偏移的递归文本分割器
+    每个文本只编码一次并记录每个token在原文中的起始字符偏移，分隔符层级与chunk_size/chunk_overlap均在token下标上计算，
+    分割结果与使用token数作为长度函数的RecursiveCharacterTextSplitter等价(仅在token边界处存在差异：跨越切分位置的token
+    只计入起始位置所在的区间，而RecursiveCharacterTextSplitter对每个子串单独编码会高估长度)，且无需对重叠的子串反复编码
+    """
+
+    def __init__(
+            self,
+            encoding: tiktoken.Encoding,
+            separators: Optional[list[str]] = None,
+            is_separator_regex: bool = False,
+            **kwargs: Any,
+    ):
+        super().__init__(**kwargs)
+        self._encoding = encoding
+        self._separators = separators or ["\n\n", "\n", " ", ""]
+        # 预先编译分隔符，空字符串分隔符代表按字符拆分
+        self._separator_patterns = [
+            re.compile(separator if is_separator_regex else re.escape(separator)) if separator else None
+            for separator in self._separators
+        ]
+
+    def split_text(self, text: str) -> list[str]:
+        """分割文本，返回分割后的文本块列表"""
+        # 1. 整个文本只编码一次，offsets[i]为第i个token在原文中的起始字符位置
+        tokens = self._encoding.encode(text, disallowed_special=())
+        _, offsets = self._encoding.decode_with_offsets(tokens)
+
+        # 2. 从第一层分隔符开始在字符区间上递归拆分
+        return self._split_span(text, offsets, 0, len(text), 0)
+
+    @classmethod
+    def _span_length(cls, offsets: list[int], start: int, end: int) -> int:
+        """计算[start, end)字符区间的token数，即起始位置落在区间内的token数量"""
+        return bisect_left(offsets, end) - bisect_left(offsets, start)
+
+    def _split_span(self, text: str, offsets: list[int], start: int, end: int, separator_index: int) -> list[str]:
+        """使用separator_index及之后的分隔符递归拆分[start, end)字符区间"""
+        # 1. 查找区间内第一个出现的分隔符，空字符串分隔符或都未出现时不再继续向下拆分
+        segment = text[start:end]
+        pattern = self._separator_patterns[-1]
+        next_index = None
+        for index in range(separator_index, len(self._separator_patterns)):
+            if self._separator_patterns[index] is None:
+                pattern = None
+                break
+            if self._separator_patterns[index].search(segment):
+                pattern = self._separator_patterns[index]
+                next_index = index + 1 if index + 1 < len(self._separator_patterns) else None
+                break
+
+        # 2. 按分隔符拆分为多个区间，分隔符保留在下一个区间的开头
+        if pattern is None:
+            cuts = list(range(start + 1, end))
+        else:
+            cuts = [start + match.start() for match in pattern.finditer(segment)]
+        spans = [(s, e) for s, e in zip([start, *cuts], [*cuts, end]) if e > s]
+
+        # 3. 长度小于chunk_size的区间参与合并，过长的区间使用下一层分隔符继续拆分
+        chunks = []
+        good_spans = []
+        for span_start, span_end in spans:
+            length = self._span_length(offsets, span_start, span_end)
+            if length < self._chunk_size:
+                good_spans.append((span_start, span_end, length))
+                continue
+            if good_spans:
+                chunks.extend(self._merge_spans(text, good_spans))
+                good_spans = []
+            if next_index is None:
+                chunks.append(text[span_start:span_end])
+            else:
+                chunks.extend(self._split_span(text, offsets, span_start, span_end, next_index))
+        if good_spans:
+            chunks.extend(self._merge_spans(text, good_spans))
+
+        return chunks
+
+    def _merge_spans(self, text: str, spans: list[tuple[int, int, int]]) -> list[str]:
+        """将相邻的小区间合并为不超过chunk_size的文本块，并按chunk_overlap保留重叠部分"""
+        chunks = []
+        current_spans = deque()
+        total = 0
+        for span in spans:
+            length = span[2]
+            if total + length > self._chunk_size and current_spans:
+                self._append_chunk(chunks, text[current_spans[0][0]:current_spans[-1][1]])
+                # 从头部移除区间，直到剩余长度满足重叠大小并能容纳当前区间
+                while total > self._chunk_overlap or (total + length > self._chunk_size and total > 0):
+                    total -= current_spans.popleft()[2]
+                # 头部长度为0的区间位于已移除token的中间，一并移除，避免在下一个文本块中重复出现
+                while current_spans and current_spans[0][2] == 0:
+                    current_spans.popleft()
+            current_spans.append(span)
+            total += length
+        if current_spans:
+            self._append_chunk(chunks, text[current_spans[0][0]:current_spans[-1][1]])
+
+        return chunks
+
+    def _append_chunk(self, chunks: list[str], chunk: str):
+        if self._strip_whitespace:
+            chunk = chunk.strip()
+        if chunk:
+            chunks.append(chunk)
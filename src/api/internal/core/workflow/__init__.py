@@ -1,3 +1,12 @@
 from .workflow import Workflow
+from .workflow_cache import CompiledWorkflowCache
+from .workflow_compiler import compile_workflow_graph, load_workflow_config
+from .workflow_optimizer import optimize_workflow_config
 
-__all__ = ["Workflow"]
+__all__ = [
+    "Workflow",
+    "CompiledWorkflowCache",
+    "compile_workflow_graph",
+    "load_workflow_config",
+    "optimize_workflow_config",
+]
@@ -22,6 +22,12 @@ class NodeType(str, Enum):
     END = "end"
 
 
+class NodeCacheConfig(BaseModel):
+    """节点结果缓存配置，开启后相同节点配置+相同输入的运行结果会缓存到Redis中"""
+    enabled: bool = False  # 是否开启结果缓存
+    ttl: int = Field(default=3600, ge=1, le=7 * 24 * 3600)  # 缓存过期时间，单位为秒
+
+
 class BaseNodeData(BaseModel):
     """基础节点数据"""
 
@@ -54,3 +60,12 @@ class NodeResult(BaseModel):
     outputs: dict[str, Any] = Field(default_factory=dict)  # 节点的输出数据
     latency: float = 0  # 节点响应耗时
     error: str = ""  # 节点运行错误信息
+    metadata: dict[str, Any] = Field(default_factory=dict)  # 节点运行附加信息
+
+
+class NodeTokenEvent(BaseModel):
+    """节点增量token事件，大模型类节点生成内容时实时发布，最终结果仍以NodeResult为准"""
+    node_id: str  # 节点id
+    node_type: NodeType  # 节点类型
+    title: str = ""  # 节点标题
+    delta: str = ""  # 本次新增的内容
@@ -1,6 +1,10 @@
+import hashlib
+import json
 import re
-from collections import defaultdict, deque
-from typing import Any, TypedDict, Annotated
+import threading
+from collections import defaultdict, deque, OrderedDict
+from collections.abc import Iterator, Mapping, Sequence
+from typing import Any, TypedDict, Annotated, Optional
 from uuid import UUID
 
 from pydantic import Field, BaseModel, model_validator
@@ -14,29 +18,116 @@ from internal.exception import ValidateErrorException
 WORKFLOW_CONFIG_NAME_PATTERN = r'^[A-Za-z_][A-Za-z0-9_]*$'
 WORKFLOW_CONFIG_DESCRIPTION_MAX_LENGTH = 1024
 
+# 节点输入/输出序列化后超过该字节数时，单独存储并在运行结果中只保留引用
+WORKFLOW_STATE_INLINE_VALUE_SIZE = 32 * 1024
+
+# 开启token流式输出时，节点token事件在工作流astream输出中的key
+WORKFLOW_TOKEN_EVENT_KEY = "__node_token__"
+
+# 校验通过的工作流图结构缓存，key为图结构哈希，value为校验后的节点与边列表，缓存中的实例不会被外部持有
+WORKFLOW_VALIDATED_GRAPH_CACHE_SIZE = 256
+_validated_graph_cache: OrderedDict[str, tuple[list[BaseNodeData], list[BaseEdgeData]]] = OrderedDict()
+_validated_graph_lock = threading.Lock()
+
+
+class NodeResultChain(Sequence):
+    """
+    不可变的节点结果序列，追加时只创建新的链表节点并引用之前的序列，
+    既不修改也不复制已有的序列，LangGraph持有的旧状态始终保持不变
+    """
+    __slots__ = ("_items", "_parent", "_length")
+
+    def __init__(self, items: Sequence[NodeResult] = (), parent: Optional["NodeResultChain"] = None):
+        self._items = tuple(items)
+        self._parent = parent
+        self._length = len(self._items) + (len(parent) if parent is not None else 0)
+
+    def extend(self, items: Sequence[NodeResult]) -> "NodeResultChain":
+        """返回追加节点结果后的新序列"""
+        return NodeResultChain(items, self) if items else self
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __iter__(self) -> Iterator[NodeResult]:
+        chunks = []
+        chain = self
+        while chain is not None:
+            chunks.append(chain._items)
+            chain = chain._parent
+        for chunk in reversed(chunks):
+            yield from chunk
+
+    def __getitem__(self, index):
+        return list(self)[index]
+
+
+class NodeOutputsMap(Mapping):
+    """
+    不可变的节点输出索引，每次写入作为新的一层，新层不小于上一层时与其合并为新的字典(类似LSM树)，
+    合并只生成新对象而不修改已有的层，每个输出的均摊复制次数为O(log n)，查询最多遍历O(log n)层
+    """
+    __slots__ = ("_layers",)
+
+    def __init__(self, layers: tuple[dict[str, Any], ...] = ()):
+        self._layers = layers
+
+    def merge(self, values: Mapping[str, Any]) -> "NodeOutputsMap":
+        """返回合并写入数据后的新索引"""
+        if not values:
+            return self
+        layers = list(self._layers)
+        layer = dict(values)
+        while layers and len(layers[-1]) <= len(layer):
+            layer = {**layers.pop(), **layer}
+        layers.append(layer)
+        return NodeOutputsMap(tuple(layers))
+
+    def __getitem__(self, key: str) -> Any:
+        for layer in reversed(self._layers):
+            if key in layer:
+                return layer[key]
+        raise KeyError(key)
+
+    def __iter__(self) -> Iterator[str]:
+        merged = {}
+        for layer in self._layers:
+            merged.update(layer)
+        return iter(merged)
+
+    def __len__(self) -> int:
+        return len(set().union(*self._layers))
+
 
 def _process_dict(left: dict[str, Any], right: dict[str, Any]) -> dict[str, Any]:
-    """工作流状态字典归纳函数"""
-    left = left or {}
-    right = right or {}
-    return {**left, **right}
+    """工作流输入/输出字典归纳函数，只在开始/结束节点写入，合并为新字典，不修改LangGraph持有的旧值"""
+    return {**(left or {}), **(right or {})}
+
 
+def _process_node_outputs(left: Mapping[str, Any], right: Mapping[str, Any]) -> NodeOutputsMap:
+    """工作流状态节点输出索引归纳函数，返回共享旧数据的新索引，不修改也不整体复制旧索引"""
+    if not isinstance(left, NodeOutputsMap):
+        left = NodeOutputsMap().merge(left or {})
+    return left.merge(right or {})
 
-def _process_node_result(left: list[NodeResult], right: list[NodeResult]) -> list[NodeResult]:
-    """工作流状态节点结果列表归纳函数"""
-    left = left or []
-    right = right or []
-    return left + right
+
+def _process_node_result(left: Sequence[NodeResult], right: Sequence[NodeResult]) -> NodeResultChain:
+    """工作流状态节点结果列表归纳函数，返回共享旧结果的新序列，不修改也不整体复制旧序列"""
+    if not isinstance(left, NodeResultChain):
+        left = NodeResultChain(left or ())
+    return left.extend(right or ())
 
 
 class WorkflowConfig(BaseModel):
     """工作流配置信息"""
     account_id: UUID  # 用户的唯一标识
+    workflow_id: Optional[UUID] = None  # 工作流唯一标识，用于运行追踪及延迟统计
     name: str = ""  # 工作流名称，必须是英文
     cn_name: str = ""  # 工作流中文名称
     description: str = ""  # 描述信息，用于告知LLM什么时候需要调用工作流
     nodes: list[BaseNodeData] = Field(default_factory=list)  # 工作流对应的节点列表信息
     edges: list[BaseEdgeData] = Field(default_factory=list)  # 工作流对应的边列表信息
+    execution_plan: Optional[dict[str, Any]] = None  # 发布时生成的执行计划，为空时构建图时根据边信息重新计算
 
     @model_validator(mode="before")
     def validate_workflow_config(cls, values: dict[str, Any]):
@@ -60,26 +151,16 @@ class WorkflowConfig(BaseModel):
         if not isinstance(edges, list) or len(edges) <= 0:
             raise ValidateErrorException("工作流边列表信息错误，请核实后重试")
 
-        from internal.core.workflow.nodes import (StartNodeData, EndNodeData,
-                                                  LLMNodeData, DatasetRetrievalNodeData,
-                                                  TemplateTransformNodeData, HttpRequestNodeData,
-                                                  CodeNodeData, ToolNodeData, QuestionClassifierNodeData,
-                                                  IterationNodeData, ToolLLMNodeData)
-        node_data_classes = {
-            NodeType.START: StartNodeData,
-            NodeType.END: EndNodeData,
-            NodeType.LLM: LLMNodeData,
-            NodeType.DATASET_RETRIEVAL: DatasetRetrievalNodeData,
-            NodeType.TEMPLATE_TRANSFORM: TemplateTransformNodeData,
-            NodeType.HTTP_REQUEST: HttpRequestNodeData,
-            NodeType.TOOL: ToolNodeData,
-            NodeType.CODE: CodeNodeData,
-            # 意图识别
-            NodeType.QUESTION_CLASSIFIER: QuestionClassifierNodeData,
-            NodeType.ITERATION: IterationNodeData,
-            NodeType.TOOL_LLM: ToolLLMNodeData
-        }
+        # 5.相同的图结构只校验一次，命中缓存时直接使用校验后的节点与边数据副本
+        graph_hash = cls._get_graph_hash(nodes, edges)
+        validated_graph = cls._get_validated_graph(graph_hash)
+        if validated_graph is not None:
+            values["nodes"], values["edges"] = validated_graph
+            return values
+
+        node_data_classes = cls.get_node_data_classes()
         node_data_dict: dict[UUID, BaseNodeData] = {}
+        node_titles = set()
         start_nodes = 0
         end_nodes = 0
         for node in nodes:
@@ -110,14 +191,16 @@ class WorkflowConfig(BaseModel):
                 raise ValidateErrorException("工作流节点id必须唯一，请核实后重试")
 
             # 11 判断nodes节点数据title是否唯一
-            if any(item.title.strip() == node_data.title.strip() for item in node_data_dict.values()):
+            if node_data.title.strip() in node_titles:
                 raise ValidateErrorException("工作流节点title必须唯一，请核实后重试")
 
             # 12 将灵气添加到node_data_dict中
             node_data_dict[node_data.id] = node_data
+            node_titles.add(node_data.title.strip())
 
         # 13. 循环遍历edges数据
         edge_data_dict: dict[UUID, BaseEdgeData] = {}
+        edge_keys = set()
         for edge in edges:
             # 14 判断边数据类型为字典
             if not isinstance(edge, dict):
@@ -140,16 +223,13 @@ class WorkflowConfig(BaseModel):
 
             # 18 校验边edges里面的边必须唯一(source+target必须唯一)
             # 18 2024-04-18 sam 校验条件变更为：source+target+source_handle_id
-            if any(
-                    (item.source == edge_data.source
-                     and item.target == edge_data.target
-                     and item.source_handle_id == edge_data.source_handle_id)
-                    for item in edge_data_dict.values()
-            ):
+            edge_key = (edge_data.source, edge_data.target, edge_data.source_handle_id)
+            if edge_key in edge_keys:
                 raise ValidateErrorException("工作流边数据不能重复添加")
 
             # 19 将校验通过后的数据添加到edge_data_dict中
             edge_data_dict[edge_data.id] = edge_data
+            edge_keys.add(edge_key)
 
         # 20 构建邻接表、逆邻接表、入度以及出度
         adj_list = cls._build_adj_list(edge_data_dict.values())
@@ -174,19 +254,45 @@ class WorkflowConfig(BaseModel):
         if not cls._is_connected(adj_list, start_node_data.id):
             raise ValidateErrorException("工作流中存在不可到达的节点，图不连通，请核实后重试")
 
-        # 24 校验edges中是否存在环路(即循环边结构)
-        if cls._is_cycle(node_data_dict.values(), adj_list, in_degree):
+        # 24 使用拓扑排序校验edges中是否存在环路(即循环边结构)
+        topological_order = cls._get_topological_order(node_data_dict.values(), adj_list, in_degree)
+        if len(topological_order) != len(node_data_dict):
             raise ValidateErrorException("工作流中存在环路，请核实后重试")
 
-        # 25 校验nodes+edges中的数据引用是否正确，即inputs/outputs对应的数据
-        cls._validate_inputs_ref(node_data_dict, reverse_adj_list)
+        # 25 沿拓扑序一次性计算所有节点的前置节点集合，并校验nodes+edges中的数据引用是否正确
+        index, ancestors = cls._build_ancestors(topological_order, reverse_adj_list)
+        cls._validate_inputs_ref(node_data_dict, index, ancestors)
 
-        # 26 更新values值
+        # 26 更新values值并缓存校验结果
         values["nodes"] = list(node_data_dict.values())
         values["edges"] = list(edge_data_dict.values())
+        cls._set_validated_graph(graph_hash, values["nodes"], values["edges"])
 
         return values
 
+    @classmethod
+    def get_node_data_classes(cls) -> dict[NodeType, type[BaseNodeData]]:
+        """获取节点类型与节点数据类的映射"""
+        from internal.core.workflow.nodes import (StartNodeData, EndNodeData,
+                                                  LLMNodeData, DatasetRetrievalNodeData,
+                                                  TemplateTransformNodeData, HttpRequestNodeData,
+                                                  CodeNodeData, ToolNodeData, QuestionClassifierNodeData,
+                                                  IterationNodeData, ToolLLMNodeData)
+        return {
+            NodeType.START: StartNodeData,
+            NodeType.END: EndNodeData,
+            NodeType.LLM: LLMNodeData,
+            NodeType.DATASET_RETRIEVAL: DatasetRetrievalNodeData,
+            NodeType.TEMPLATE_TRANSFORM: TemplateTransformNodeData,
+            NodeType.HTTP_REQUEST: HttpRequestNodeData,
+            NodeType.TOOL: ToolNodeData,
+            NodeType.CODE: CodeNodeData,
+            # 意图识别
+            NodeType.QUESTION_CLASSIFIER: QuestionClassifierNodeData,
+            NodeType.ITERATION: IterationNodeData,
+            NodeType.TOOL_LLM: ToolLLMNodeData
+        }
+
     @classmethod
     def _is_connected(cls, adj_list: defaultdict[Any, list], start_node_id: UUID) -> bool:
         """使用BFS广度搜索遍历，检查图是否流通"""
@@ -209,42 +315,63 @@ class WorkflowConfig(BaseModel):
         return len(visited) == len(adj_list)
 
     @classmethod
-    def _is_cycle(cls,
-                  nodes: list[BaseNodeData],
-                  adj_list: defaultdict[Any, list],
-                  in_degree: defaultdict[Any, int]) -> bool:
-        """根据节点列表，邻接表，入度数据，使用拓扑排序(Kahn算法)检测图中是否存在环，如果存在则返回Ture，否则False"""
-        # 1. 存储所有入度为0的节点Id，即开始节点
+    def _get_topological_order(cls,
+                               nodes: list[BaseNodeData],
+                               adj_list: defaultdict[Any, list],
+                               in_degree: defaultdict[Any, int]) -> list[UUID]:
+        """根据节点列表，邻接表，入度数据，使用拓扑排序(Kahn算法)获取节点的拓扑序，存在环时返回的节点数少于总节点数"""
+        # 1. 复制入度数据，避免修改调用方的数据，并存储所有入度为0的节点Id，即开始节点
+        in_degree = defaultdict(int, in_degree)
         zero_in_degree_nodes = deque([node.id for node in nodes if in_degree[node.id] == 0])
 
-        # 2. 记录已访问的节点数
-        visited_count = 0
+        # 2. 记录已访问节点的顺序
+        topological_order = []
 
         # 3. 循环遍历入度为0的节点信息
         while zero_in_degree_nodes:
-            # 4. 从队列左侧取出一个入度为0的节点，并记录访问+1
+            # 4. 从队列左侧取出一个入度为0的节点并记录
             node_id = zero_in_degree_nodes.popleft()
-            visited_count += 1
+            topological_order.append(node_id)
             for neighbor in adj_list[node_id]:
-                # 6.将子节点的入度-1，并判断是否为0，如果是则添加到队列中
+                # 5.将子节点的入度-1，并判断是否为0，如果是则添加到队列中
                 in_degree[neighbor] -= 1
-                # 7.Kahn算法的核心是，如果存在环，那么至少有一个非结束节点的入度大于等于2，并且该入度无法消减到0
+                # 6.Kahn算法的核心是，如果存在环，那么至少有一个非结束节点的入度大于等于2，并且该入度无法消减到0
                 #   这就会导致该节点后续的所有子节点在该算法下都无法浏览，那么访问次数肯定小于总节点数
                 if in_degree[neighbor] == 0:
                     zero_in_degree_nodes.append(neighbor)
 
-        # 8.判断访问次数和总结点数是否相等，如果不等/小于则说明存在环
-        return visited_count != len(nodes)
+        return topological_order
+
+    @classmethod
+    def _build_ancestors(cls,
+                         topological_order: list[UUID],
+                         reverse_adj_list: defaultdict[Any, list]) -> tuple[dict[UUID, int], dict[UUID, int]]:
+        """沿拓扑序计算每个节点的所有前置节点，使用整数位图合并父节点的前置节点，整体只遍历一次图
+        返回节点在位图中的下标，以及每个节点的前置节点位图
+        """
+        # 1. 为每个节点分配位图中的下标
+        index = {node_id: position for position, node_id in enumerate(topological_order)}
+
+        # 2. 按拓扑序处理，父节点的位图一定先于子节点计算完成
+        ancestors: dict[UUID, int] = {}
+        for node_id in topological_order:
+            bitset = 0
+            for parent_id in reverse_adj_list[node_id]:
+                bitset |= ancestors[parent_id] | (1 << index[parent_id])
+            ancestors[node_id] = bitset
+
+        return index, ancestors
 
     @classmethod
     def _validate_inputs_ref(cls,
                              node_data_dict: dict[UUID, BaseNodeData],
-                             reverse_adj_list: defaultdict[Any, list]) -> None:
+                             index: dict[UUID, int],
+                             ancestors: dict[UUID, int]) -> None:
         """校验输入数据引用是否正确，如果出错直接抛出异常"""
         # 1. 循环遍历所有节点数据逐个处理
         for node_data in node_data_dict.values():
-            # 2. 提取该节点的甩的前置节点
-            predecessors = cls._get_predecessors(reverse_adj_list, node_data.id)
+            # 2. 提取该节点的所有前置节点位图
+            predecessors = ancestors.get(node_data.id, 0)
 
             # 3. 如果节点数据类型不是START则校验输入数据引用（因为开始节点不需要校验）
             if node_data.node_type != NodeType.START:
@@ -257,11 +384,9 @@ class WorkflowConfig(BaseModel):
                 for variable in variables:
                     # 6. 如果变量类型为引用，则需要校验
                     if variable.value.type == VariableValueType.REF:
-                        # 7. 判断前置节点是否为空，或者引用id不在前置节点内，则直接招聘错误
-                        if (
-                                len(predecessors) <= 0
-                                or variable.value.content.ref_node_id not in predecessors
-                        ):
+                        # 7. 判断引用id不在前置节点内，则直接抛出错误
+                        ref_node_index = index.get(variable.value.content.ref_node_id)
+                        if ref_node_index is None or not predecessors >> ref_node_index & 1:
                             raise ValidateErrorException(f"工作流节点[{node_data.title}]引用数据出错，请核实后重试")
 
                         # 8. 提取数据引用的前置节点数据
@@ -314,22 +439,36 @@ class WorkflowConfig(BaseModel):
         return in_degree, out_degree
 
     @classmethod
-    def _get_predecessors(cls, reverse_adj_list: defaultdict[Any, list], target_node_id: UUID) -> list[UUID]:
-        """根据逆邻接表+目标节点id，获取该节点的所有前置节点"""
-        visited = set()
-        predecessors = []
+    def _get_graph_hash(cls, nodes: list[dict], edges: list[dict]) -> str:
+        """计算工作流图结构的哈希值"""
+        graph = json.dumps({"nodes": nodes, "edges": edges}, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha3_256(graph.encode("utf-8")).hexdigest()
 
-        def dfs(node_id):
-            if node_id not in visited:
-                visited.add(node_id)
-                if node_id != target_node_id:
-                    predecessors.append(node_id)
-                for neighbor in reverse_adj_list[node_id]:
-                    dfs(neighbor)
-
-        dfs(target_node_id)
+    @classmethod
+    def _get_validated_graph(cls, graph_hash: str) -> Optional[tuple[list[BaseNodeData], list[BaseEdgeData]]]:
+        """获取已校验通过的图结构，返回节点与边的深拷贝，调用方修改节点数据不会影响缓存及其他工作流配置"""
+        with _validated_graph_lock:
+            validated_graph = _validated_graph_cache.get(graph_hash)
+            if validated_graph is None:
+                return None
+            _validated_graph_cache.move_to_end(graph_hash)
+        return (
+            [node.model_copy(deep=True) for node in validated_graph[0]],
+            [edge.model_copy(deep=True) for edge in validated_graph[1]],
+        )
 
-        return predecessors
+    @classmethod
+    def _set_validated_graph(cls, graph_hash: str, nodes: list[BaseNodeData], edges: list[BaseEdgeData]):
+        """缓存校验通过的图结构的深拷贝，调用方继续持有的实例与缓存互不影响，超出数量时淘汰最久未使用的数据"""
+        validated_graph = (
+            [node.model_copy(deep=True) for node in nodes],
+            [edge.model_copy(deep=True) for edge in edges],
+        )
+        with _validated_graph_lock:
+            _validated_graph_cache[graph_hash] = validated_graph
+            _validated_graph_cache.move_to_end(graph_hash)
+            while len(_validated_graph_cache) > WORKFLOW_VALIDATED_GRAPH_CACHE_SIZE:
+                _validated_graph_cache.popitem(last=False)
 
 
 class WorkflowState(TypedDict):
@@ -337,3 +476,4 @@ class WorkflowState(TypedDict):
     inputs: Annotated[dict[str, Any], _process_dict]  # 工具输入，也是最初输入
     outputs: Annotated[dict[str, Any], _process_dict]  # 输出结果，也是工具输出
     node_results: Annotated[list[NodeResult], _process_node_result]
+    node_outputs: Annotated[dict[str, dict[str, Any]], _process_node_outputs]  # 节点id->节点输出的索引，用于快速提取引用变量
@@ -1,17 +1,29 @@
+import hashlib
+import json
+import logging
+import threading
+import time
 from abc import ABC, abstractmethod
 from typing import Optional, Any
 
 from langchain_core.runnables import RunnableSerializable, RunnableConfig
 from langchain_core.runnables.config import run_in_executor
+from pydantic import PrivateAttr
 
-from internal.core.workflow.entities.node_entity import BaseNodeData
+from internal.core.workflow.entities.node_entity import BaseNodeData, NodeCacheConfig, NodeResult, NodeStatus
 from internal.core.workflow.entities.workflow_entity import WorkflowState
+from internal.core.workflow.tracing import start_node_span, get_current_span
+from internal.core.workflow.tracing.tracer import record_node_result
+from internal.entity.cache_entity import CACHE_WORKFLOW_NODE_RESULT
 
 
 class BaseNode(RunnableSerializable, ABC):
     """工作流基类"""
     node_data: BaseNodeData
     _node_listen: Any
+    _flask_app: Any = PrivateAttr(None)
+    _initialized: bool = PrivateAttr(False)
+    _initialize_lock: Any = PrivateAttr(default_factory=threading.Lock)
 
     def __init__(self, *args, **kwargs: Any):
         super().__init__(*args, **kwargs)
@@ -19,23 +31,138 @@ class BaseNode(RunnableSerializable, ABC):
             self._node_listen = kwargs.get("listen")
         else:
             self._node_listen = self._default_node_listen
+        self._flask_app = kwargs.get("flask_app")
 
     def _default_node_listen(self, info):
         pass
 
+    def _initialize(self) -> None:
+        """初始化节点运行所需的资源(构建工具、查询数据库、编译子工作流等)，子类按需重写，节点首次运行时才会调用"""
+        pass
+
+    def _ensure_initialized(self) -> None:
+        """
+        节点资源延迟到首次运行时初始化，结果保存在节点实例上，随编译后的工作流一起缓存，
+        未执行到的分支不会产生初始化开销，初始化失败时下次运行会重新初始化
+        """
+        if self._initialized:
+            return
+        with self._initialize_lock:
+            if self._initialized:
+                return
+            # 节点可能在没有应用上下文的线程中首次运行，使用构建工作流时的应用推送上下文
+            from flask import has_app_context
+            if self._flask_app is not None and not has_app_context():
+                with self._flask_app.app_context():
+                    self._initialize()
+            else:
+                self._initialize()
+            self._initialized = True
+
     def invoke(self, state: WorkflowState, config: Optional[RunnableConfig] = None) -> WorkflowState:
-        result = self.invoke_inner(state, config)
+        with start_node_span(self.node_data) as span:
+            self._ensure_initialized()
+            result = self.invoke_inner(state, config)
+            record_node_result(span, result)
         self._node_listen(result)
-        return result
+        return self._index_node_outputs(result)
 
     @abstractmethod
     def invoke_inner(self, state: WorkflowState, config: Optional[RunnableConfig] = None) -> WorkflowState:
         pass
 
     async def ainvoke(self, state: WorkflowState, config: Optional[RunnableConfig] = None) -> WorkflowState:
-        result = await self.ainvoke_inner(state, config)
+        with start_node_span(self.node_data) as span:
+            if not self._initialized:
+                # 初始化过程可能查询数据库或者检测网络服务，放到线程池中执行避免阻塞事件循环
+                await run_in_executor(config, self._ensure_initialized)
+            result = await self.ainvoke_inner(state, config)
+            record_node_result(span, result)
         self._node_listen(result)
-        return result
+        return self._index_node_outputs(result)
 
     async def ainvoke_inner(self, state: WorkflowState, config: Optional[RunnableConfig] = None) -> WorkflowState:
-        return await run_in_executor(config, self.invoke_inner, state, config)
+        submitted_at = time.perf_counter()
+
+        def _invoke_inner() -> WorkflowState:
+            # 记录同步节点在线程池中的排队等待时间，线程池会复制当前上下文，所以可以直接获取到节点span
+            span = get_current_span()
+            if span is not None:
+                span.executor_wait = time.perf_counter() - submitted_at
+            return self.invoke_inner(state, config)
+
+        return await run_in_executor(config, _invoke_inner)
+
+    @classmethod
+    def _index_node_outputs(cls, result: Any) -> Any:
+        """将节点运行结果的输出同步写入节点输出索引，条件边节点返回的是下一个节点名称，无需处理"""
+        if isinstance(result, dict) and result.get("node_results"):
+            result["node_outputs"] = {
+                str(node_result.node_data.id): node_result.outputs for node_result in result["node_results"]
+            }
+        return result
+
+    def _is_cache_enabled(self) -> bool:
+        """判断节点是否开启了结果缓存，子类可以根据节点配置进一步限制"""
+        cache_config: Optional[NodeCacheConfig] = getattr(self.node_data, "cache_config", None)
+        return cache_config is not None and cache_config.enabled
+
+    def _get_cache_key(self, inputs: dict[str, Any]) -> str:
+        """根据节点id、节点配置版本以及规范化后的输入计算缓存键，节点配置变更后缓存自动失效"""
+        node_config = self.node_data.model_dump(mode="json", exclude={"title", "description", "position"})
+        node_version = hashlib.md5(
+            json.dumps(node_config, sort_keys=True, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        inputs_hash = hashlib.sha3_256(
+            json.dumps(inputs, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+        ).hexdigest()
+        return CACHE_WORKFLOW_NODE_RESULT.format(
+            node_id=self.node_data.id,
+            node_version=node_version,
+            inputs_hash=inputs_hash,
+        )
+
+    def _get_cached_outputs(self, inputs: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """获取节点缓存的输出结果，未开启缓存、未命中或者读取出错时返回None"""
+        if not self._is_cache_enabled():
+            return None
+        try:
+            from app.http.module import injector
+            from redis import Redis
+
+            cached_outputs = injector.get(Redis).get(self._get_cache_key(inputs))
+            return json.loads(cached_outputs) if cached_outputs is not None else None
+        except Exception as error:
+            logging.warning("读取工作流节点缓存失败: %(error)s", {"error": error})
+            return None
+
+    def _set_cached_outputs(self, inputs: dict[str, Any], outputs: dict[str, Any]) -> None:
+        """开启缓存时将节点的输出结果写入缓存"""
+        if not self._is_cache_enabled():
+            return
+        try:
+            from app.http.module import injector
+            from redis import Redis
+
+            injector.get(Redis).setex(
+                self._get_cache_key(inputs),
+                self.node_data.cache_config.ttl,
+                json.dumps(outputs, ensure_ascii=False),
+            )
+        except Exception as error:
+            logging.warning("写入工作流节点缓存失败: %(error)s", {"error": error})
+
+    def _build_cached_result(self, inputs: dict[str, Any], outputs: dict[str, Any], start_at: float) -> WorkflowState:
+        """使用缓存的输出构建节点运行结果，并标记为缓存命中"""
+        return {
+            "node_results": [
+                NodeResult(
+                    node_data=self.node_data,
+                    status=NodeStatus.SUCCEEDED,
+                    inputs=inputs,
+                    outputs=outputs,
+                    latency=(time.perf_counter() - start_at),
+                    metadata={"cache_hit": True},
+                )
+            ]
+        }
@@ -1,5 +1,6 @@
 from pydantic import Field
 
+from internal.core.workflow.entities.node_entity import NodeCacheConfig
 from internal.core.workflow.entities.variable_entity import VariableEntity
 from internal.core.workflow.nodes.base_node import BaseNodeData
 
@@ -13,5 +14,6 @@ def main(params):
 class CodeNodeData(BaseNodeData):
     """py代码执行节点数据"""
     code: str = DEFAULT_CODE  # 需要执行的py代码
+    cache_config: NodeCacheConfig = Field(default_factory=NodeCacheConfig)  # 结果缓存配置
     inputs: list[VariableEntity] = Field(default_factory=dict)  # 输入变量列表
     outputs: list[VariableEntity] = Field(default_factory=dict)  # 输出变量列表
@@ -1,4 +1,3 @@
-import ast
 import time
 from typing import Optional
 
@@ -11,6 +10,7 @@ from internal.core.workflow.nodes.base_node import BaseNode
 from internal.core.workflow.utils.helper import extract_variables_from_state
 from internal.exception import FailException
 from .code_entity import CodeNodeData
+from .code_sandbox import get_code_sandbox_pool
 
 
 class CodeNode(BaseNode):
@@ -22,8 +22,13 @@ class CodeNode(BaseNode):
         start_at = time.perf_counter()
         inputs_dict = extract_variables_from_state(self.node_data.inputs, state)
 
-        # 2. todo: 执行py代码，后期需要单独迁移到水箱中或者指定的容器中运行，需与项目分离
-        result = self._execute_function(self.node_data.code, params=inputs_dict)
+        # 1.开启结果缓存且命中时直接返回缓存的输出
+        cached_outputs = self._get_cached_outputs(inputs_dict)
+        if cached_outputs is not None:
+            return self._build_cached_result(inputs_dict, cached_outputs, start_at)
+
+        # 2. 在沙箱进程池中执行py代码，与API进程隔离并限制CPU时间、内存及运行时长
+        result = get_code_sandbox_pool().execute(self.node_data.code, inputs_dict)
 
         # 3.检测函数的返回值是否为字典
         if not isinstance(result, dict):
@@ -39,7 +44,8 @@ class CodeNode(BaseNode):
                 VARIABLE_TYPE_DEFAULT_VALUE_MAP.get(output.type),
             )
 
-        # 6.构建状态数据并返回
+        # 6.写入结果缓存，构建状态数据并返回
+        self._set_cached_outputs(inputs_dict, outputs_dict)
         return {
             "node_results": [
                 NodeResult(
@@ -51,36 +57,3 @@ class CodeNode(BaseNode):
                 )
             ]
         }
-
-    @classmethod
-    def _execute_function(cls, code: str, *args, **kwargs):
-        """执行py代码"""
-        try:
-            # 1. 解析代码
-            tree = ast.parse(code)
-            main_func = None
-            for node in tree.body:
-                if isinstance(node, ast.FunctionDef):
-                    if node.name == "main":
-                        if main_func:
-                            raise FailException("代码中只能有一个main函数")
-                        if len(node.args.args) != 1 or node.args.args[0].arg != "params":
-                            raise FailException("main函数必须只有一个参数，且参数为params")
-                        main_func = node
-                    else:
-                        raise FailException("代码中不能包含其他函数，只能有main函数")
-                else:
-                    raise FailException("代码中只能包含函数定义，不允许其他语句存在")
-
-            if not main_func:
-                raise FailException("代码中必须包含名为main的函数")
-
-            local_vars = {}
-            exec(code, {}, local_vars)
-
-            if "main" in local_vars and callable(local_vars["main"]):
-                return local_vars["main"](*args, **kwargs)
-            else:
-                raise FailException("main函数必须是一个可调用的函数")
-        except:
-            raise FailException("py代码执行出错")
@@ -0,0 +1,268 @@
+import ast
+import atexit
+import base64
+import hashlib
+import json
+import logging
+import marshal
+import os
+import queue
+import select
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Optional
+
+from internal.exception import FailException
+from internal.lib import sandbox_worker
+from internal.lib.sandbox_worker import HEADER
+
+# 进程内缓存的已校验并编译的代码数量
+COMPILED_CODE_CACHE_SIZE = 256
+
+# 复制到进程池临时目录中的工作进程脚本名称
+SANDBOX_WORKER_SCRIPT = "sandbox_worker.py"
+
+
+@dataclass(frozen=True)
+class CodeSandboxSettings:
+    """代码沙箱进程池配置"""
+    workers: int = 0  # 沙箱进程数，为0时使用CPU核数
+    cpu_time: int = 10  # 单次执行的CPU时间限制，单位为秒
+    memory_limit: int = 512 * 1024 * 1024  # 沙箱进程的内存限制，单位为字节
+    timeout: float = 30  # 单次执行的超时时间，单位为秒
+
+
+class _SandboxWorkerError(Exception):
+    """沙箱进程超时或异常退出"""
+
+
+class _SandboxWorker:
+    """单个常驻的沙箱进程，通过标准输入/输出与父进程通信"""
+
+    def __init__(self, settings: CodeSandboxSettings, work_dir: str):
+        # 1. 沙箱进程不继承父进程的环境变量，避免用户代码读取到密钥等配置
+        env = {
+            "PATH": os.environ.get("PATH", ""),
+            "CODE_SANDBOX_CPU_TIME": str(settings.cpu_time),
+            "CODE_SANDBOX_MEMORY_LIMIT": str(settings.memory_limit),
+        }
+
+        # 2. 使用隔离模式运行进程池临时目录中的工作进程脚本，工作目录及sys.path中都不包含项目目录，用户代码无法通过相对路径读取.env等文件
+        self.process = subprocess.Popen(
+            [sys.executable, "-I", os.path.join(work_dir, SANDBOX_WORKER_SCRIPT)],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            cwd=work_dir,
+            env=env,
+            start_new_session=True,
+        )
+        self._buffer = bytearray()
+
+        # 3. 等待沙箱进程就绪，启动失败时销毁进程
+        try:
+            self.read_message(time.monotonic() + settings.timeout)
+        except Exception:
+            self.kill()
+            raise
+
+    def request(self, message: dict[str, Any], deadline: float) -> dict[str, Any]:
+        body = json.dumps(message, ensure_ascii=False, default=str).encode("utf-8")
+        try:
+            self.process.stdin.write(HEADER.pack(len(body)) + body)
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError) as error:
+            raise _SandboxWorkerError("沙箱进程已退出") from error
+        return self.read_message(deadline)
+
+    def read_message(self, deadline: float) -> dict[str, Any]:
+        header = self._read_exactly(HEADER.size, deadline)
+        return json.loads(self._read_exactly(HEADER.unpack(header)[0], deadline))
+
+    def _read_exactly(self, size: int, deadline: float) -> bytes:
+        """带超时地从管道中读取指定长度的数据"""
+        fd = self.process.stdout.fileno()
+        while len(self._buffer) < size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise _SandboxWorkerError("代码执行超时")
+            readable, _, _ = select.select([fd], [], [], remaining)
+            if not readable:
+                raise _SandboxWorkerError("代码执行超时")
+            chunk = os.read(fd, 64 * 1024)
+            if not chunk:
+                raise _SandboxWorkerError("代码执行超出资源限制，沙箱进程已退出")
+            self._buffer.extend(chunk)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def kill(self):
+        try:
+            self.process.kill()
+            self.process.wait(timeout=1)
+        except Exception:
+            pass
+
+
+class CodeSandboxPool:
+    """代码沙箱进程池，沙箱进程常驻复用并按代码哈希缓存已加载的main函数，超时或超出资源限制的进程会被销毁重建"""
+
+    def __init__(self, settings: CodeSandboxSettings):
+        self.settings = settings
+        self.size = settings.workers if settings.workers > 0 else (os.cpu_count() or 1)
+        self.pid = os.getpid()
+        self._idle: queue.LifoQueue[_SandboxWorker] = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._workers: set[_SandboxWorker] = set()
+        self._work_dir: Optional[str] = None
+
+    def execute(self, code: str, params: dict[str, Any]) -> Any:
+        """在沙箱进程中执行代码的main函数并返回结果"""
+        # 1. 校验并编译代码，同一份代码只编译一次
+        code_hash, code_data = compile_code(code)
+
+        # 2. 获取空闲的沙箱进程，优先只传递代码哈希，沙箱进程未缓存时再传递编译后的代码
+        worker = self._acquire()
+        deadline = time.monotonic() + self.settings.timeout
+        try:
+            response = worker.request({"code_hash": code_hash, "params": params}, deadline)
+            if response.get("status") == "miss":
+                response = worker.request({"code_hash": code_hash, "code": code_data, "params": params}, deadline)
+        except _SandboxWorkerError as error:
+            self._discard(worker)
+            raise FailException(f"py代码执行出错: {error}")
+        except Exception:
+            self._discard(worker)
+            raise
+        self._idle.put(worker)
+
+        # 3. 检测执行结果
+        if response.get("status") != "ok":
+            raise FailException(f"py代码执行出错: {response.get('error', '')}")
+        return response.get("result")
+
+    def shutdown(self):
+        with self._lock:
+            for worker in list(self._workers):
+                worker.kill()
+            self._workers.clear()
+            if self._work_dir:
+                shutil.rmtree(self._work_dir, ignore_errors=True)
+                self._work_dir = None
+
+    def _get_work_dir(self) -> str:
+        """创建进程池专属的空临时目录，只存放工作进程脚本，作为沙箱进程的工作目录"""
+        with self._lock:
+            if self._work_dir is None:
+                work_dir = tempfile.mkdtemp(prefix="code_sandbox_")
+                shutil.copyfile(sandbox_worker.__file__, os.path.join(work_dir, SANDBOX_WORKER_SCRIPT))
+                self._work_dir = work_dir
+            return self._work_dir
+
+    def _acquire(self) -> _SandboxWorker:
+        """获取空闲的沙箱进程，未达到进程数上限时创建新进程，否则等待其他执行完成"""
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+
+        with self._lock:
+            can_create = self._created < self.size
+            if can_create:
+                self._created += 1
+        if can_create:
+            try:
+                worker = _SandboxWorker(self.settings, self._get_work_dir())
+            except Exception as error:
+                with self._lock:
+                    self._created -= 1
+                logging.error("代码沙箱进程启动失败: %(error)s", {"error": error})
+                raise FailException("代码沙箱启动失败，请稍后重试")
+            with self._lock:
+                self._workers.add(worker)
+            return worker
+
+        try:
+            return self._idle.get(timeout=self.settings.timeout)
+        except queue.Empty:
+            raise FailException("代码沙箱繁忙，请稍后重试")
+
+    def _discard(self, worker: _SandboxWorker):
+        """销毁超时或异常的沙箱进程，下次获取时会重新创建"""
+        worker.kill()
+        with self._lock:
+            self._workers.discard(worker)
+            self._created -= 1
+
+
+@lru_cache(maxsize=COMPILED_CODE_CACHE_SIZE)
+def compile_code(code: str) -> tuple[str, str]:
+    """校验代码结构并编译，返回代码哈希以及序列化后的代码对象，执行的代码有且只有一个名为main且参数为params的函数"""
+    # 1. 解析代码
+    try:
+        tree = ast.parse(code)
+    except SyntaxError:
+        raise FailException("py代码执行出错: 代码语法错误")
+
+    # 2. 校验代码结构
+    main_func = None
+    for node in tree.body:
+        if isinstance(node, ast.FunctionDef):
+            if node.name == "main":
+                if main_func:
+                    raise FailException("代码中只能有一个main函数")
+                if len(node.args.args) != 1 or node.args.args[0].arg != "params":
+                    raise FailException("main函数必须只有一个参数，且参数为params")
+                main_func = node
+            else:
+                raise FailException("代码中不能包含其他函数，只能有main函数")
+        else:
+            raise FailException("代码中只能包含函数定义，不允许其他语句存在")
+
+    if not main_func:
+        raise FailException("代码中必须包含名为main的函数")
+
+    # 3. 编译代码，沙箱进程使用同一个解释器，所以可以直接传递marshal序列化后的代码对象
+    code_object = compile(tree, "<code_node>", "exec")
+    code_hash = hashlib.sha3_256(code.encode("utf-8")).hexdigest()
+    return code_hash, base64.b64encode(marshal.dumps(code_object)).decode("ascii")
+
+
+_pool: Optional[CodeSandboxPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_code_sandbox_pool() -> CodeSandboxPool:
+    """获取当前进程的沙箱进程池，fork出的子进程不能复用父进程的管道，需要重新创建"""
+    global _pool
+    if _pool is None or _pool.pid != os.getpid():
+        with _pool_lock:
+            if _pool is None or _pool.pid != os.getpid():
+                _pool = CodeSandboxPool(_get_code_sandbox_settings())
+                atexit.register(_pool.shutdown)
+    return _pool
+
+
+def _get_code_sandbox_settings() -> CodeSandboxSettings:
+    """从应用配置中读取沙箱配置，读取失败时使用默认配置"""
+    try:
+        from app.http.module import injector
+        from config import Config
+
+        conf = injector.get(Config)
+        return CodeSandboxSettings(
+            workers=conf.CODE_SANDBOX_WORKERS,
+            cpu_time=conf.CODE_SANDBOX_CPU_TIME,
+            memory_limit=conf.CODE_SANDBOX_MEMORY_LIMIT,
+            timeout=conf.CODE_SANDBOX_TIMEOUT,
+        )
+    except Exception:
+        return CodeSandboxSettings()
@@ -2,6 +2,7 @@ from uuid import UUID
 
 from pydantic import BaseModel, Field, field_validator
 
+from internal.core.workflow.entities.node_entity import NodeCacheConfig
 from internal.core.workflow.entities.variable_entity import VariableEntity, VariableValueType, VariableType
 from internal.core.workflow.nodes.base_node import BaseNodeData
 from internal.entity.dataset_entity import RetrievalStrategy
@@ -19,6 +20,7 @@ class DatasetRetrievalNodeData(BaseNodeData):
     """知识库检索节点数据"""
     dataset_ids: list[UUID]  # 关联知识库id列表
     retrieval_config: RetrievalConfig = RetrievalConfig()  # 检索配置
+    cache_config: NodeCacheConfig = Field(default_factory=NodeCacheConfig)  # 结果缓存配置
     inputs: list[VariableEntity] = Field(default_factory=dict)  # 输入变量信息
     outputs: list[VariableEntity] = Field(
         default_factory=lambda: [
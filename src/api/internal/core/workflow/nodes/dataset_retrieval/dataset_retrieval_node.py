@@ -19,21 +19,26 @@ class DatasetRetrievalNode(BaseNode):
 
     node_data: DatasetRetrievalNodeData
     _retrieval_tool: BaseTool = PrivateAttr(None)
+    _account_id: UUID = PrivateAttr(None)
 
     def __init__(self,
                  *args: Any,
                  flask_app: Flask,
                  account_id: UUID,
                  **kwargs: Any):
-        super().__init__(*args, **kwargs)
+        super().__init__(*args, flask_app=flask_app, **kwargs)
+        self._account_id = account_id
+
+    def _initialize(self) -> None:
+        """首次运行时构建知识库检索工具"""
         from app.http.module import injector
         from internal.service import RetrievalService
         retrieval_service = injector.get(RetrievalService)
 
         self._retrieval_tool = retrieval_service.create_langchain_tool_from_search(
-            flask_app=flask_app,
+            flask_app=self._flask_app,
             dataset_ids=self.node_data.dataset_ids,
-            account_id=account_id,
+            account_id=self._account_id,
             **self.node_data.retrieval_config.dict()
         )
 
@@ -41,6 +46,9 @@ class DatasetRetrievalNode(BaseNode):
         """知识库检索节点调用函数，执行响应的知识库检索后返回"""
         start_at = time.perf_counter()
         inputs_dict = extract_variables_from_state(self.node_data.inputs, state)
+        cached_outputs = self._get_cached_outputs(inputs_dict)
+        if cached_outputs is not None:
+            return self._build_cached_result(inputs_dict, cached_outputs, start_at)
 
         combine_documents = self._retrieval_tool.invoke(inputs_dict)
 
@@ -49,6 +57,7 @@ class DatasetRetrievalNode(BaseNode):
             outputs[self.node_data.outputs[0].name] = combine_documents
         else:
             outputs["combine_documents"] = combine_documents
+        self._set_cached_outputs(inputs_dict, outputs)
 
         return {
             "node_results": [
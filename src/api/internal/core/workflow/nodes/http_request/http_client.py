@@ -0,0 +1,189 @@
+import asyncio
+import threading
+import weakref
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Optional
+from urllib.parse import urlsplit
+
+import charset_normalizer
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from internal.exception import FailException
+
+
+@dataclass(frozen=True)
+class HttpClientSettings:
+    """Http请求节点客户端配置"""
+    connect_timeout: float = 5  # 建立连接超时时间，单位为秒
+    read_timeout: float = 60  # 读取响应超时时间，单位为秒
+    max_connections: int = 100  # 连接池最大连接数
+    max_connections_per_host: int = 10  # 单个域名最大并发连接数
+    keepalive_expiry: float = 30  # 空闲长连接保留时间，单位为秒
+    max_response_size: int = 10 * 1024 * 1024  # 响应数据最大字节数
+
+
+@dataclass
+class HttpResponse:
+    """Http请求节点使用的响应数据"""
+    status_code: int
+    text: str
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+
+class _AsyncHttpClient:
+    """绑定到单个事件循环的异步客户端，httpx的连接池不能跨事件循环使用"""
+
+    def __init__(self, settings: HttpClientSettings):
+        self.client = httpx.AsyncClient(
+            timeout=httpx.Timeout(settings.read_timeout, connect=settings.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=settings.max_connections,
+                max_keepalive_connections=settings.max_connections,
+                keepalive_expiry=settings.keepalive_expiry,
+            ),
+            follow_redirects=True,
+        )
+        self._host_semaphores: dict[str, asyncio.Semaphore] = {}
+        self._max_connections_per_host = settings.max_connections_per_host
+        self._closer: Optional[AsyncIterator[None]] = None
+
+    async def close_on_loop_shutdown(self):
+        """
+        注册一个挂起的异步生成器，asyncio.run等在关闭事件循环前会调用shutdown_asyncgens关闭所有异步生成器，
+        此时在生成器的finally中关闭客户端，释放连接池中的连接
+        """
+
+        async def closer() -> AsyncIterator[None]:
+            try:
+                yield
+            finally:
+                await self.client.aclose()
+
+        # 生成器被回收时也会触发关闭，所以需要在客户端上保留引用
+        self._closer = closer()
+        await self._closer.__anext__()
+
+    def get_host_semaphore(self, url: str) -> asyncio.Semaphore:
+        """httpx只支持全局连接数限制，按域名使用信号量限制并发连接数"""
+        host = urlsplit(url).netloc
+        if host not in self._host_semaphores:
+            self._host_semaphores[host] = asyncio.Semaphore(self._max_connections_per_host)
+        return self._host_semaphores[host]
+
+
+_settings: Optional[HttpClientSettings] = None
+_session: Optional[requests.Session] = None
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _AsyncHttpClient]" = weakref.WeakKeyDictionary()
+_lock = threading.Lock()
+
+
+def get_http_client_settings() -> HttpClientSettings:
+    """从应用配置中读取客户端配置，读取失败时使用默认配置"""
+    global _settings
+    if _settings is None:
+        try:
+            from app.http.module import injector
+            from config import Config
+
+            conf = injector.get(Config)
+            _settings = HttpClientSettings(
+                connect_timeout=conf.HTTP_REQUEST_NODE_CONNECT_TIMEOUT,
+                read_timeout=conf.HTTP_REQUEST_NODE_READ_TIMEOUT,
+                max_connections=conf.HTTP_REQUEST_NODE_MAX_CONNECTIONS,
+                max_connections_per_host=conf.HTTP_REQUEST_NODE_MAX_CONNECTIONS_PER_HOST,
+                max_response_size=conf.HTTP_REQUEST_NODE_MAX_RESPONSE_SIZE,
+            )
+        except Exception:
+            _settings = HttpClientSettings()
+    return _settings
+
+
+def get_session() -> requests.Session:
+    """获取进程内共享的同步会话，urllib3按域名维护连接池，阻塞等待以限制单个域名的连接数"""
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                settings = get_http_client_settings()
+                adapter = HTTPAdapter(
+                    pool_connections=settings.max_connections,
+                    pool_maxsize=settings.max_connections_per_host,
+                    pool_block=True,
+                )
+                session = requests.Session()
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+async def get_async_client() -> _AsyncHttpClient:
+    """获取当前事件循环共享的异步客户端，事件循环关闭时客户端随之关闭"""
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _AsyncHttpClient(get_http_client_settings())
+        _async_clients[loop] = client
+        await client.close_on_loop_shutdown()
+    return client
+
+
+def send_request(method: str, url: str, **kwargs: Any) -> HttpResponse:
+    """使用共享连接池发起同步请求，流式读取响应并限制响应大小"""
+    settings = get_http_client_settings()
+    with get_session().request(
+            method,
+            url,
+            timeout=(settings.connect_timeout, settings.read_timeout),
+            stream=True,
+            **kwargs,
+    ) as response:
+        _check_content_length(response.headers, settings)
+        content = bytearray()
+        for chunk in response.iter_content(chunk_size=64 * 1024):
+            content.extend(chunk)
+            _check_response_size(len(content), settings)
+        return HttpResponse(
+            status_code=response.status_code,
+            text=content.decode(response.encoding or _detect_encoding(content), errors="replace"),
+        )
+
+
+async def asend_request(method: str, url: str, **kwargs: Any) -> HttpResponse:
+    """使用当前事件循环共享的连接池发起异步请求，流式读取响应并限制响应大小"""
+    settings = get_http_client_settings()
+    client = await get_async_client()
+    async with client.get_host_semaphore(url):
+        async with client.client.stream(method.upper(), url, **kwargs) as response:
+            _check_content_length(response.headers, settings)
+            content = bytearray()
+            async for chunk in response.aiter_bytes():
+                content.extend(chunk)
+                _check_response_size(len(content), settings)
+            return HttpResponse(
+                status_code=response.status_code,
+                text=content.decode(response.encoding or "utf-8", errors="replace"),
+            )
+
+
+def _detect_encoding(content: bytearray) -> str:
+    """响应头中没有声明编码时根据已读取的数据检测编码，流式读取后不能再使用response.apparent_encoding"""
+    match = charset_normalizer.from_bytes(bytes(content)).best()
+    return match.encoding if match is not None else "utf-8"
+
+
+def _check_content_length(headers: Any, settings: HttpClientSettings):
+    """响应头中声明的数据大小超过限制时无需读取响应体"""
+    content_length = headers.get("content-length")
+    if content_length and content_length.isdigit():
+        _check_response_size(int(content_length), settings)
+
+
+def _check_response_size(size: int, settings: HttpClientSettings):
+    if size > settings.max_response_size:
+        raise FailException(f"Http请求响应数据超过{settings.max_response_size}字节限制")
@@ -6,7 +6,7 @@ from typing import Optional
 
 from pydantic import Field, field_validator, HttpUrl
 
-from internal.core.workflow.entities.node_entity import BaseNodeData
+from internal.core.workflow.entities.node_entity import BaseNodeData, NodeCacheConfig
 from internal.core.workflow.entities.variable_entity import VariableEntity, VariableType, VariableValueType
 from internal.exception import ValidateErrorException
 
@@ -33,6 +33,7 @@ class HttpRequestNodeData(BaseNodeData):
     """HTTP请求节点数据"""
     url: Optional[HttpUrl] = None  # 请求URL地址
     method: HttpRequestMethod = HttpRequestMethod.GET  # API请求方法
+    cache_config: NodeCacheConfig = Field(default_factory=NodeCacheConfig)  # 结果缓存配置
     inputs: list[VariableEntity] = Field(default_factory=list)  # 输入变量列表
     outputs: list[VariableEntity] = Field(
         default_factory=lambda: [
@@ -1,11 +1,11 @@
 import time
-from typing import Optional
+from typing import Any, Optional
 
-import requests
 from langchain_core.runnables import RunnableConfig
 
 from internal.core.workflow.entities.workflow_entity import WorkflowState
 from internal.core.workflow.nodes.base_node import BaseNode
+from .http_client import HttpResponse, send_request, asend_request
 from .http_request_entity import HttpRequestNodeData, HttpRequestInputType, HttpRequestMethod
 from ...entities.node_entity import NodeResult, NodeStatus
 from ...utils.helper import extract_variables_from_state
@@ -15,51 +15,67 @@ class HttpRequestNode(BaseNode):
     """Http请求节点"""
     node_data: HttpRequestNodeData
 
+    def _is_cache_enabled(self) -> bool:
+        """只有GET请求是幂等的，其他请求方法不缓存结果"""
+        return self.node_data.method == HttpRequestMethod.GET and super()._is_cache_enabled()
+
     def invoke_inner(self, state: WorkflowState, config: Optional[RunnableConfig] = None) -> WorkflowState:
-        # 1. 提取节点输入变量字典
+        """同步调用时使用进程内共享的连接池发起请求"""
         start_at = time.perf_counter()
-        _input_dict = extract_variables_from_state(self.node_data.inputs, state)
+        inputs_dict = self._extract_inputs(state)
+
+        # 1. 开启结果缓存且命中时直接返回缓存的输出(仅GET请求)
+        cached_outputs = self._get_cached_outputs(inputs_dict)
+        if cached_outputs is not None:
+            return self._build_cached_result(inputs_dict, cached_outputs, start_at)
+
+        # 2. 根据传递的method+url发起请求
+        response = send_request(self.node_data.method.value, str(self.node_data.url), **self._build_request_kwargs(inputs_dict))
+        return self._build_result(inputs_dict, response, start_at)
+
+    async def ainvoke_inner(self, state: WorkflowState, config: Optional[RunnableConfig] = None) -> WorkflowState:
+        """异步调用时直接使用异步连接池发起请求，不占用执行器线程"""
+        start_at = time.perf_counter()
+        inputs_dict = self._extract_inputs(state)
 
-        # 2. 提取数据，包含：params, headers, body
+        # 1. 开启结果缓存且命中时直接返回缓存的输出(仅GET请求)
+        cached_outputs = self._get_cached_outputs(inputs_dict)
+        if cached_outputs is not None:
+            return self._build_cached_result(inputs_dict, cached_outputs, start_at)
+
+        # 2. 根据传递的method+url发起请求
+        response = await asend_request(
+            self.node_data.method.value, str(self.node_data.url), **self._build_request_kwargs(inputs_dict)
+        )
+        return self._build_result(inputs_dict, response, start_at)
+
+    def _extract_inputs(self, state: WorkflowState) -> dict[str, Any]:
+        """提取节点输入变量，并按类型分组为：params, headers, body"""
+        _input_dict = extract_variables_from_state(self.node_data.inputs, state)
         inputs_dict = {
             HttpRequestInputType.PARAMS: {},
             HttpRequestInputType.HEADERS: {},
             HttpRequestInputType.BODY: {}
         }
         for input in self.node_data.inputs:
-            inputs_dict[input.meta.get("type")[input.name]] = _input_dict.get(input.name)
+            inputs_dict[input.meta.get("type")][input.name] = _input_dict.get(input.name)
+        return inputs_dict
 
-        # 3. 请求方法映射
-        request_methods = {
-            HttpRequestMethod.GET: requests.get,
-            HttpRequestMethod.POST: requests.post,
-            HttpRequestMethod.PUT: requests.put,
-            HttpRequestMethod.PATCH: requests.patch,
-            HttpRequestMethod.DELETE: requests.delete,
-            HttpRequestMethod.HEAD: requests.head,
-            HttpRequestMethod.OPTIONS: requests.options
+    def _build_request_kwargs(self, inputs_dict: dict[str, Any]) -> dict[str, Any]:
+        """构建请求参数，GET请求不携带请求体"""
+        kwargs = {
+            "headers": inputs_dict[HttpRequestInputType.HEADERS],
+            "params": inputs_dict[HttpRequestInputType.PARAMS],
         }
+        if self.node_data.method != HttpRequestMethod.GET:
+            kwargs["data"] = inputs_dict[HttpRequestInputType.BODY]
+        return kwargs
 
-        # 4. 根据传递的method+url发起请求
-        request_method = request_methods[self.node_data.method]
-        if self.node_data.method == HttpRequestMethod.GET:
-            response = request_method(
-                self.node_data.url,
-                headers=inputs_dict[HttpRequestInputType.HEADERS],
-                params=inputs_dict[HttpRequestInputType.PARAMS]
-            )
-        else:
-            response = request_method(
-                self.node_data.url,
-                headers=inputs_dict[HttpRequestInputType.HEADERS],
-                params=inputs_dict[HttpRequestInputType.PARAMS],
-                data=inputs_dict[HttpRequestInputType.BODY]
-            )
-
-        text = response.text
-        status_code = response.status_code
-
-        outputs = {"text": text, "status_code": status_code}
+    def _build_result(self, inputs_dict: dict[str, Any], response: HttpResponse, start_at: float) -> WorkflowState:
+        """构建节点运行结果，请求成功时写入结果缓存"""
+        outputs = {"text": response.text, "status_code": response.status_code}
+        if response.ok:
+            self._set_cached_outputs(inputs_dict, outputs)
 
         return {
             "node_results": [
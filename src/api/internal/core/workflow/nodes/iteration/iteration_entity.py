@@ -6,6 +6,9 @@ from internal.core.workflow.entities.node_entity import BaseNodeData
 from internal.core.workflow.entities.variable_entity import VariableEntity, VariableType, VariableValueType
 from internal.exception import FailException
 
+# 迭代节点并行执行的最大并发数上限
+ITERATION_MAX_PARALLEL_NUMS = 50
+
 
 class IterationNodeData(BaseNodeData):
     """迭代节点数据"""
@@ -18,6 +21,8 @@ class IterationNodeData(BaseNodeData):
         )
     ])  # 输入变量列表
     outputs: list[VariableEntity] = Field(default_factory=list)
+    is_parallel: bool = False  # 是否并行迭代
+    parallel_nums: int = 10  # 并行迭代时的最大并发数
 
     @field_validator("workflow_ids")
     def validate_workflow_ids(cls, value: list[UUID]):
@@ -26,6 +31,13 @@ class IterationNodeData(BaseNodeData):
             raise FailException("迭代节点只能绑定一个工作流")
         return value
 
+    @field_validator("parallel_nums")
+    def validate_parallel_nums(cls, value: int):
+        """校验并行迭代的最大并发数"""
+        if value < 1 or value > ITERATION_MAX_PARALLEL_NUMS:
+            raise FailException(f"迭代节点并发数必须在1-{ITERATION_MAX_PARALLEL_NUMS}之间")
+        return value
+
     @field_validator("inputs")
     def validate_inputs(cls, value: list[VariableEntity]):
         """校验输入变量是否正确"""
@@ -1,13 +1,15 @@
+import asyncio
 import json
 import logging
 import time
 from typing import Optional, Any
 
 from langchain_core.runnables import RunnableConfig
-from pydantic.v1 import PrivateAttr
+from langchain_core.runnables.config import ContextThreadPoolExecutor
+from pydantic import PrivateAttr
 
 from internal.core.workflow.entities.node_entity import NodeResult, NodeStatus
-from internal.core.workflow.entities.workflow_entity import WorkflowState, WorkflowConfig
+from internal.core.workflow.entities.workflow_entity import WorkflowState
 from internal.core.workflow.nodes import BaseNode
 from internal.core.workflow.utils.helper import extract_variables_from_state
 from internal.entity.workflow_entity import WorkflowStatus
@@ -22,89 +24,149 @@ class IterationNode(BaseNode):
     _base_model_func: Any = PrivateAttr(None)
 
     def __init__(self, *args: Any, base_model_func, **kwargs: Any):
-        """构造函数，完成数据的初始化"""
-        try:
-            # 1.调用父类构造函数完成数据初始化
-            super().__init__(*args, **kwargs)
+        """构造函数，完成数据的初始化，子工作流延迟到节点首次运行时再加载"""
+        super().__init__(*args, **kwargs)
+        self._base_model_func = base_model_func
 
-            # 2.判断是否传递的工作流id
+    def _initialize(self) -> None:
+        """首次运行时从数据库加载并构建子工作流"""
+        try:
+            # 1.判断是否传递的工作流id
             if len(self.node_data.workflow_ids) != 1:
                 self.workflow = None
             else:
-                # 3.导入依赖注入及相关服务
+                # 2.导入依赖注入及相关服务
                 from app.http.module import injector
                 from pkg.sqlalchemy import SQLAlchemy
 
                 db = injector.get(SQLAlchemy)
                 workflow_record = db.session.query(Workflow).get(self.node_data.workflow_ids[0])
 
-                # 4.判断工作流是否存在并且已发布
+                # 3.判断工作流是否存在并且已发布
                 if not workflow_record or workflow_record.status != WorkflowStatus.PUBLISHED:
                     self.workflow = None
                 else:
-                    # 5.已发布且存在，则构建工作流并存储
-                    from internal.core.workflow import Workflow as WorkflowTool
+                    # 4.已发布且存在，则构建工作流并存储
+                    from internal.core.workflow import Workflow as WorkflowTool, load_workflow_config
                     self.workflow = WorkflowTool(
-                        workflow_config=WorkflowConfig(
+                        workflow_config=load_workflow_config(
+                            workflow_record.graph,
+                            workflow_record.compiled_graph,
                             account_id=workflow_record.account_id,
+                            workflow_id=workflow_record.id,
                             name="iteration_workflow",
                             description=self.node_data.description,
-                            nodes=workflow_record.graph.get("nodes", []),
-                            edges=workflow_record.graph.get("edges", [])
                         ),
-                        base_model_func=base_model_func
+                        base_model_func=self._base_model_func
                     )
         except Exception as error:
-            # 6.出现异常则将工作流重置为空，使用相对宽松的校验范式
+            # 5.出现异常则将工作流重置为空，使用相对宽松的校验范式
             logging.error("迭代节点子工作流构建失败: %(error)s", {"error": error}, exc_info=True)
             self.workflow = None
 
     def invoke_inner(self, state: WorkflowState, config: Optional[RunnableConfig] = None) -> WorkflowState:
-        """迭代节点调用函数，循环遍历将工作流的结果进行输出"""
-        # 1.提取节点输入变量字典映射
+        """迭代节点调用函数，循环遍历将工作流的结果进行输出，并行模式下使用线程池按最大并发数执行"""
+        # 1.提取节点输入变量字典映射并校验
         start_at = time.perf_counter()
         inputs_dict = extract_variables_from_state(self.node_data.inputs, state)
         inputs = inputs_dict.get("inputs", [])
+        if not self._is_runnable(inputs):
+            return self._build_failed_result(inputs_dict, start_at)
 
-        # 2.异常检测，涵盖工作流不存在、工作流输入参数不唯一、数据为非列表、长度为0等
-        if (
-                self.workflow is None
-                or len(self.workflow.args) != 1
-                or not isinstance(inputs, list)
-                or len(inputs) == 0
-        ):
-            return {
-                "node_results": [
-                    NodeResult(
-                        node_data=self.node_data,
-                        status=NodeStatus.FAILED,
-                        inputs=inputs_dict,
-                        outputs={"outputs": []},
-                        latency=(time.perf_counter() - start_at),
-                    )
-                ]
-            }
+        # 2.获取工作流的输入字段结构，并逐项或并行调用迭代工作流获取结果
+        param_key = list(self.workflow.args.keys())[0]
+        if self.node_data.is_parallel:
+            with ContextThreadPoolExecutor(max_workers=self.node_data.parallel_nums) as executor:
+                items = list(executor.map(lambda item: self._invoke_item({param_key: item}), inputs))
+        else:
+            items = [self._invoke_item({param_key: item}) for item in inputs]
 
-        # 3.获取工作流的输入字段结构
+        return self._build_node_result(inputs_dict, items, start_at)
+
+    async def ainvoke_inner(self, state: WorkflowState, config: Optional[RunnableConfig] = None) -> WorkflowState:
+        """迭代节点异步调用函数，并行模式下使用信号量限制最大并发数，结果顺序与输入顺序一致"""
+        # 1.提取节点输入变量字典映射并校验
+        start_at = time.perf_counter()
+        inputs_dict = extract_variables_from_state(self.node_data.inputs, state)
+        inputs = inputs_dict.get("inputs", [])
+        if not self._is_runnable(inputs):
+            return self._build_failed_result(inputs_dict, start_at)
+
+        # 2.获取工作流的输入字段结构，并逐项或并行调用迭代工作流获取结果
         param_key = list(self.workflow.args.keys())[0]
+        if self.node_data.is_parallel:
+            semaphore = asyncio.Semaphore(self.node_data.parallel_nums)
+
+            async def invoke_with_semaphore(item: Any) -> dict[str, Any]:
+                async with semaphore:
+                    return await self._ainvoke_item({param_key: item})
+
+            items = await asyncio.gather(*[invoke_with_semaphore(item) for item in inputs])
+        else:
+            items = [await self._ainvoke_item({param_key: item}) for item in inputs]
+
+        return self._build_node_result(inputs_dict, items, start_at)
 
-        # 4.工作流+数据均存在，则循环遍历输入数据调用迭代工作流获取结果
-        outputs = []
-        for item in inputs:
-            # 5.构建输入字典信息
-            data = {param_key: item}
+    def _is_runnable(self, inputs: Any) -> bool:
+        """异常检测，涵盖工作流不存在、工作流输入参数不唯一、数据为非列表、长度为0等"""
+        return (
+                self.workflow is not None
+                and len(self.workflow.args) == 1
+                and isinstance(inputs, list)
+                and len(inputs) > 0
+        )
 
-            # 6.调用工作流获取结果，这里可以修改为并行执行提升效率，得到的结构转换成字符串
-            iteration_result = self.workflow.invoke(data)
-            outputs.append(json.dumps(iteration_result, ensure_ascii=False))
+    def _invoke_item(self, data: dict[str, Any]) -> dict[str, Any]:
+        """调用工作流处理单个迭代项，单项出错不影响其他迭代项"""
+        start_at = time.perf_counter()
+        try:
+            output = json.dumps(self.workflow.invoke(data), ensure_ascii=False)
+            return {"status": NodeStatus.SUCCEEDED, "output": output, "latency": time.perf_counter() - start_at}
+        except Exception as error:
+            logging.exception("迭代节点子工作流执行失败: %(error)s", {"error": error})
+            return {"status": NodeStatus.FAILED, "error": str(error), "latency": time.perf_counter() - start_at}
+
+    async def _ainvoke_item(self, data: dict[str, Any]) -> dict[str, Any]:
+        """异步调用工作流处理单个迭代项，单项出错不影响其他迭代项"""
+        start_at = time.perf_counter()
+        try:
+            output = json.dumps(await self.workflow.ainvoke(data), ensure_ascii=False)
+            return {"status": NodeStatus.SUCCEEDED, "output": output, "latency": time.perf_counter() - start_at}
+        except Exception as error:
+            logging.exception("迭代节点子工作流执行失败: %(error)s", {"error": error})
+            return {"status": NodeStatus.FAILED, "error": str(error), "latency": time.perf_counter() - start_at}
+
+    def _build_node_result(self, inputs_dict: dict[str, Any], items: list[dict[str, Any]],
+                           start_at: float) -> WorkflowState:
+        """汇总迭代项结果，失败项输出为空字符串以保持与输入一一对应，全部失败时节点失败"""
+        failed_indexes = [index for index, item in enumerate(items) if item["status"] == NodeStatus.FAILED]
+        return {
+            "node_results": [
+                NodeResult(
+                    node_data=self.node_data,
+                    status=NodeStatus.FAILED if len(failed_indexes) == len(items) else NodeStatus.SUCCEEDED,
+                    inputs=inputs_dict,
+                    outputs={"outputs": [item.get("output", "") for item in items]},
+                    latency=(time.perf_counter() - start_at),
+                    error="\n".join(f"第{index + 1}项执行失败: {items[index]['error']}" for index in failed_indexes),
+                    metadata={
+                        "items": [
+                            {"index": index, "status": item["status"], "latency": item["latency"]}
+                            for index, item in enumerate(items)
+                        ],
+                    },
+                )
+            ]
+        }
 
+    def _build_failed_result(self, inputs_dict: dict[str, Any], start_at: float) -> WorkflowState:
         return {
             "node_results": [
                 NodeResult(
                     node_data=self.node_data,
-                    status=NodeStatus.SUCCEEDED,
+                    status=NodeStatus.FAILED,
                     inputs=inputs_dict,
-                    outputs={"outputs": outputs},
+                    outputs={"outputs": []},
                     latency=(time.perf_counter() - start_at),
                 )
             ]
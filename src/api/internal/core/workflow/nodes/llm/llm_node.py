@@ -1,7 +1,6 @@
 import time
 from typing import Optional, Any
 
-from jinja2 import Template
 from langchain_core.runnables import RunnableConfig
 from langchain_core.runnables.utils import Input, Output
 
@@ -10,6 +9,8 @@ from internal.core.workflow.entities.workflow_entity import WorkflowState
 from internal.core.workflow.nodes import BaseNode
 from internal.core.workflow.nodes.llm.llm_entity import LLMNodeData
 from internal.core.workflow.utils.helper import extract_variables_from_state
+from internal.core.workflow.utils.template import render_template
+from internal.core.workflow.utils.token_stream import publish_node_token
 
 
 class LLMNode(BaseNode):
@@ -26,8 +27,7 @@ class LLMNode(BaseNode):
         inputs_dict = extract_variables_from_state(self.node_data.inputs, state)
 
         # 2. 模板处理
-        template = Template(self.node_data.prompt)
-        prompt_value = template.render(**inputs_dict)
+        prompt_value = render_template(self.node_data.prompt, inputs_dict)
 
         # 3. 根据配置创建LLM实例，等待接入多LLM
         from app.http.module import injector
@@ -35,10 +35,11 @@ class LLMNode(BaseNode):
         language_model_service = injector.get(LanguageModelService)
         llm = language_model_service.load_language_model(self.node_data.language_model_config)
 
-        # 4. 使用stream代替invoke，避免接口长时间未响应
+        # 4. 使用异步流式输出代替invoke，避免接口长时间未响应，并实时发布增量token事件
         content = ""
-        for chunk in llm.stream(prompt_value):
+        async for chunk in llm.astream(prompt_value):
             content += chunk.content
+            publish_node_token(self.node_data, chunk.content)
         # 5. 提取并构建输出数据结构
         outputs = {}
         if self.node_data.outputs:
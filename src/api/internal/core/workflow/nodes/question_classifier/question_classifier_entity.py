@@ -26,6 +26,12 @@ QUESTION_CLASSIFIER_SYSTEM_PROMPT = """# 角色
 - 使用预设的分类标准进行判断，不进行主观解释。 
 - 如果预设的分类没有符合条件，请直接返回第一个分类。"""
 
+# 问题分类结果缓存过期时间，单位为秒
+QUESTION_CLASSIFIER_RESULT_CACHE_TTL = 3600
+
+# 向量相似度快速分类时，最相似分类需要领先第二相似分类的最小差值，差值过小说明query存在歧义，交给LLM判断
+QUESTION_CLASSIFIER_EMBEDDING_MIN_MARGIN = 0.05
+
 
 class ClassConfig(BaseModel):
     """问题分类器配置，存储分类query、连接的节点类型/id"""
@@ -40,6 +46,8 @@ class QuestionClassifierNodeData(BaseNodeData):
     inputs: list[VariableEntity] = Field(default_factory=list)  # 输入变量信息
     outputs: list[VariableEntity] = Field(default_factory=lambda: [])
     classes: list[ClassConfig] = Field(default_factory=list)
+    # 向量快速分类的相似度阈值，不同嵌入模型的相似度分布差异较大，默认为1关闭快速分类，需按节点及模型校准后开启
+    embedding_threshold: float = Field(default=1, ge=0, le=1)
 
     @field_validator("inputs")
     def validate_inputs(cls, value: list[VariableEntity]):
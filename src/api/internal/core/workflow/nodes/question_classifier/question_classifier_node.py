@@ -1,4 +1,9 @@
+import hashlib
 import json
+import logging
+import math
+import re
+import unicodedata
 from typing import Optional, Any
 
 from langchain_core.output_parsers import StrOutputParser
@@ -9,14 +14,22 @@ from pydantic import PrivateAttr
 
 from internal.core.workflow.entities.workflow_entity import WorkflowState
 from internal.core.workflow.nodes import BaseNode
+from internal.core.workflow.tracing import get_current_span
 from internal.core.workflow.utils.helper import extract_variables_from_state
-from .question_classifier_entity import QuestionClassifierNodeData, QUESTION_CLASSIFIER_SYSTEM_PROMPT
+from internal.entity.cache_entity import CACHE_WORKFLOW_QUESTION_CLASSIFIER
+from .question_classifier_entity import (
+    QuestionClassifierNodeData,
+    QUESTION_CLASSIFIER_SYSTEM_PROMPT,
+    QUESTION_CLASSIFIER_RESULT_CACHE_TTL,
+    QUESTION_CLASSIFIER_EMBEDDING_MIN_MARGIN,
+)
 
 
 class QuestionClassifierNode(BaseNode):
     """问题分类器节点"""
     node_data: QuestionClassifierNodeData
     _base_model_func: Any = PrivateAttr(None)
+    _class_embeddings: Optional[list[list[float]]] = PrivateAttr(None)
 
     def __init__(self,
                  *args: Any,
@@ -26,24 +39,92 @@ class QuestionClassifierNode(BaseNode):
         self._base_model_func = base_model_func
 
     def invoke_inner(self, state: WorkflowState, config: Optional[RunnableConfig] = None) -> str:
-        """覆盖重写invoke实现问题分类器节点，执行问题分类后返回节点的名称，如果LLM判断错误默认返回第一个节点名称"""
-        # 1.企图节点输入变量字典映射
+        """
+        覆盖重写invoke实现问题分类器节点，执行问题分类后返回节点的名称，如果LLM判断错误默认返回第一个节点名称。
+        分类分为两级：节点配置了embedding_threshold时先比较query与各分类描述的向量相似度，置信度足够时直接路由，
+        存在歧义或未开启时再调用LLM判断，分类结果按规范化后的query缓存。
+        """
+        # 1.获取所有分类信息，没有分类时直接结束
+        all_classes = [f"qc_source_handle_{str(item.source_handle_id)}" for item in self.node_data.classes]
+        if len(all_classes) == 0:
+            return END
+
+        # 2.企图节点输入变量字典映射，并检测分类结果缓存
         inputs_dict = extract_variables_from_state(self.node_data.inputs, state)
+        query = inputs_dict.get("query", "用户没有输入任何内容")
+        cache_key = self._get_classifier_cache_key(query)
+        node_flag = self._get_cached_class(cache_key)
+        if node_flag in all_classes:
+            span = get_current_span()
+            if span is not None:
+                span.cache_hit = True
+            return node_flag
+
+        # 3.使用向量相似度快速分类，置信度不足时调用LLM分类
+        node_flag = self._classify_by_embedding(query, all_classes)
+        if node_flag is None:
+            node_flag = self._classify_by_llm(query)
+
+        # 4.检测获取的分类标识是否在规定列表内，LLM判断错误时不缓存结果
+        if node_flag not in all_classes:
+            return all_classes[0]
+        self._set_cached_class(cache_key, node_flag)
+
+        return node_flag
+
+    def _classify_by_embedding(self, query: str, all_classes: list[str]) -> Optional[str]:
+        """比较query与各分类描述的向量余弦相似度，最相似分类超过阈值且明显领先其他分类时返回分类标识，否则返回None"""
+        if self.node_data.embedding_threshold >= 1 or not query:
+            return None
+        if any(not class_config.query for class_config in self.node_data.classes):
+            return None
+        try:
+            from app.http.module import injector
+            from internal.service import EmbeddingsService
+
+            embeddings_service = injector.get(EmbeddingsService)
+
+            # 1.分类描述的向量在节点实例上缓存，分类描述及query的向量均借助CacheBackedEmbeddings在Redis中缓存
+            if self._class_embeddings is None:
+                self._class_embeddings = embeddings_service.cache_backed_embeddings.embed_documents(
+                    [class_config.query for class_config in self.node_data.classes]
+                )
+            query_embedding = embeddings_service.cache_backed_embeddings.embed_query(query)
+        except Exception as error:
+            logging.warning("问题分类节点计算向量失败，使用LLM分类: %(error)s", {"error": error})
+            return None
+
+        # 2.计算相似度并按从高到低排序
+        scores = sorted(
+            [
+                (_cosine_similarity(query_embedding, class_embedding), node_flag)
+                for class_embedding, node_flag in zip(self._class_embeddings, all_classes)
+            ],
+            reverse=True,
+        )
 
-        # 2.构建问题分类提示prompt模板
+        # 3.最相似分类需要超过阈值，并且领先第二相似分类一定差值，否则认为存在歧义
+        top_score, node_flag = scores[0]
+        second_score = scores[1][0] if len(scores) > 1 else -1
+        if top_score >= self.node_data.embedding_threshold and \
+                top_score - second_score >= QUESTION_CLASSIFIER_EMBEDDING_MIN_MARGIN:
+            return node_flag
+        return None
+
+    def _classify_by_llm(self, query: str) -> str:
+        """调用LLM进行分类，返回LLM输出的分类标识"""
+        # 1.构建问题分类提示prompt模板
         prompt = ChatPromptTemplate.from_messages([
             ("system", QUESTION_CLASSIFIER_SYSTEM_PROMPT),
             ("human", "{query}"),
         ])
 
-        # 3. 调整为系统默认LLM模型 创建LLM实例客户端，使用gpt-4o-mini作为基座模型，并配置温度与最大输出tokens
+        # 2. 调整为系统默认LLM模型 创建LLM实例客户端，使用gpt-4o-mini作为基座模型，并配置温度与最大输出tokens
         llm = self._base_model_func(0, 512)
 
-        # 4.构建分类链
+        # 3.构建分类链并获取分类调用结果
         chain = prompt | llm | StrOutputParser()
-
-        # 5.获取分类调用结果
-        node_flag = chain.invoke({
+        return chain.invoke({
             "preset_classes": json.dumps(
                 [
                     {
@@ -52,16 +133,56 @@ class QuestionClassifierNode(BaseNode):
                     } for class_config in self.node_data.classes
                 ]
             ),
-            "query": inputs_dict.get("query", "用户没有输入任何内容")
+            "query": query,
         })
 
-        # 6.获取所有分类信息
-        all_classes = [f"qc_source_handle_{str(item.source_handle_id)}" for item in self.node_data.classes]
+    def _get_classifier_cache_key(self, query: str) -> str:
+        """根据分类配置及规范化后的query计算缓存键，分类配置变更后缓存自动失效"""
+        classes_config = [
+            [class_config.source_handle_id, class_config.query] for class_config in self.node_data.classes
+        ]
+        classes_version = hashlib.md5(
+            json.dumps(classes_config, ensure_ascii=False).encode("utf-8")
+        ).hexdigest()
+        query_hash = hashlib.sha3_256(_normalize_query(query).encode("utf-8")).hexdigest()
+        return CACHE_WORKFLOW_QUESTION_CLASSIFIER.format(
+            node_id=self.node_data.id,
+            classes_version=classes_version,
+            query_hash=query_hash,
+        )
 
-        # 7.检测获取的分类标识是否在规定列表内，并提取节点标识
-        if len(all_classes) == 0:
-            node_flag = END
-        elif node_flag not in all_classes:
-            node_flag = all_classes[0]
+    @classmethod
+    def _get_cached_class(cls, cache_key: str) -> Optional[str]:
+        """获取缓存的分类标识，未命中或者读取出错时返回None"""
+        try:
+            from app.http.module import injector
+            from redis import Redis
 
-        return node_flag
+            node_flag = injector.get(Redis).get(cache_key)
+            return node_flag.decode("utf-8") if node_flag is not None else None
+        except Exception as error:
+            logging.warning("读取问题分类结果缓存失败: %(error)s", {"error": error})
+            return None
+
+    @classmethod
+    def _set_cached_class(cls, cache_key: str, node_flag: str) -> None:
+        """将分类标识写入缓存"""
+        try:
+            from app.http.module import injector
+            from redis import Redis
+
+            injector.get(Redis).setex(cache_key, QUESTION_CLASSIFIER_RESULT_CACHE_TTL, node_flag)
+        except Exception as error:
+            logging.warning("写入问题分类结果缓存失败: %(error)s", {"error": error})
+
+
+def _normalize_query(query: str) -> str:
+    """规范化query，统一全半角、大小写并合并空白字符，让仅有格式差异的query命中同一个缓存"""
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", str(query))).strip().lower()
+
+
+def _cosine_similarity(left: list[float], right: list[float]) -> float:
+    """计算两个向量的余弦相似度"""
+    dot = sum(x * y for x, y in zip(left, right))
+    norm = math.sqrt(sum(x * x for x in left)) * math.sqrt(sum(y * y for y in right))
+    return dot / norm if norm else 0
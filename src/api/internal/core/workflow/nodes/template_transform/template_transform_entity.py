@@ -1,5 +1,6 @@
 from pydantic import Field, field_validator
 
+from internal.core.workflow.entities.node_entity import NodeCacheConfig
 from internal.core.workflow.entities.variable_entity import VariableEntity, VariableValueType
 from internal.core.workflow.nodes.base_node import BaseNodeData
 
@@ -7,6 +8,7 @@ from internal.core.workflow.nodes.base_node import BaseNodeData
 class TemplateTransformNodeData(BaseNodeData):
     """模板转换节点数据"""
     template: str = ""  # 要需要拼接转换的字符串模板
+    cache_config: NodeCacheConfig = Field(default_factory=NodeCacheConfig)  # 结果缓存配置
     inputs: list[VariableEntity] = Field(default_factory=list)  # 输入列表信息
     outputs: list[VariableEntity] = Field(
         default_factory=lambda: [
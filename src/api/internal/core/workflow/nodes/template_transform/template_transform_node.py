@@ -1,7 +1,6 @@
 import time
 from typing import Optional
 
-from jinja2 import Template
 from langchain_core.runnables import RunnableConfig
 
 from internal.core.workflow.nodes.base_node import BaseNode
@@ -9,6 +8,7 @@ from .template_transform_entity import TemplateTransformNodeData
 from ...entities.node_entity import NodeResult, NodeStatus
 from ...entities.workflow_entity import WorkflowState
 from ...utils.helper import extract_variables_from_state
+from ...utils.template import render_template
 
 
 class TemplateTransformNode(BaseNode):
@@ -18,11 +18,14 @@ class TemplateTransformNode(BaseNode):
     def invoke_inner(self, state: WorkflowState, config: Optional[RunnableConfig] = None) -> WorkflowState:
         start_at = time.perf_counter()
         inputs_dict = extract_variables_from_state(self.node_data.inputs, state)
+        cached_outputs = self._get_cached_outputs(inputs_dict)
+        if cached_outputs is not None:
+            return self._build_cached_result(inputs_dict, cached_outputs, start_at)
 
-        template = Template(self.node_data.template)
-        template_value = template.render(**inputs_dict)
+        template_value = render_template(self.node_data.template, inputs_dict)
 
         outputs = {"output": template_value}
+        self._set_cached_outputs(inputs_dict, outputs)
 
         return {
             "node_results": [
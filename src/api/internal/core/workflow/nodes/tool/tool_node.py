@@ -1,6 +1,6 @@
 import json
 import time
-from typing import Optional, Any
+from typing import Optional
 
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import BaseTool
@@ -21,8 +21,8 @@ class ToolNode(BaseNode):
     node_data: ToolNodeData
     _tool: BaseTool = PrivateAttr(None)
 
-    def __init__(self, *args, **kwargs: Any):
-        super().__init__(*args, **kwargs)
+    def _initialize(self) -> None:
+        """首次运行时根据节点配置构建内置工具或者API工具"""
         from app.http.module import injector
         if self.node_data.tool_type == "builtin_tool":
             from internal.core.tools.builtin_tools.providers import BuiltinProviderManager
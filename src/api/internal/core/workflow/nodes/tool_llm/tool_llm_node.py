@@ -2,7 +2,6 @@ import json
 import time
 from typing import Any, Optional
 
-from jinja2 import Template
 from langchain_core.messages import ToolMessage
 from langchain_core.runnables import RunnableConfig
 from langchain_core.runnables.utils import Input, Output
@@ -15,6 +14,8 @@ from internal.core.workflow.entities.node_entity import NodeResult, NodeStatus
 from internal.core.workflow.entities.workflow_entity import WorkflowState
 from internal.core.workflow.nodes import BaseNode
 from internal.core.workflow.utils.helper import extract_variables_from_state
+from internal.core.workflow.utils.template import render_template
+from internal.core.workflow.utils.token_stream import publish_node_token
 from internal.exception import FailException
 from internal.lib.helper import check_http_server
 from internal.model import ApiTool, McpTool
@@ -36,8 +37,8 @@ class ToolLLMNode(BaseNode):
     _tools: list[BaseTool] = PrivateAttr(None)
     _mcp_tools: list[McpToolInfo] = PrivateAttr(None)
 
-    def __init__(self, *args, **kwargs: Any):
-        super().__init__(*args, **kwargs)
+    def _initialize(self) -> None:
+        """首次运行时构建节点绑定的内置工具、API工具，并检测Mcp服务是否可用"""
         from app.http.module import injector
         from internal.core.tools.builtin_tools.providers import BuiltinProviderManager
         from pkg.sqlalchemy import SQLAlchemy
@@ -99,8 +100,7 @@ class ToolLLMNode(BaseNode):
         inputs_dict = extract_variables_from_state(self.node_data.inputs, state)
 
         # 2. 模板处理
-        template = Template(self.node_data.prompt)
-        prompt_value = template.render(**inputs_dict)
+        prompt_value = render_template(self.node_data.prompt, inputs_dict)
 
         # 3. 根据配置创建LLM实例，等待接入多LLM
         from app.http.module import injector
@@ -121,7 +121,8 @@ class ToolLLMNode(BaseNode):
                 if self._tools and len(self._tools) > 0:
                     all_tool_infos.extend(self._tools)
                 llm_tool = llm.bind_tools(all_tool_infos)
-                for chunk in llm_tool.stream(prompt_value):
+                async for chunk in llm_tool.astream(prompt_value):
+                    publish_node_token(self.node_data, chunk.content)
                     if is_first_chunk:
                         gathered = chunk
                         is_first_chunk = False
@@ -131,7 +132,8 @@ class ToolLLMNode(BaseNode):
             # 处理一般内置工具
             llm_tool = llm.bind_tools(self._tools)
             all_tool_infos = self._tools
-            for chunk in llm_tool.stream(prompt_value):
+            async for chunk in llm_tool.astream(prompt_value):
+                publish_node_token(self.node_data, chunk.content)
                 if is_first_chunk:
                     gathered = chunk
                     is_first_chunk = False
@@ -0,0 +1,19 @@
+from .tracer import (
+    WorkflowSpan,
+    WorkflowTrace,
+    trace_workflow,
+    start_node_span,
+    get_current_span,
+    get_latency_histogram,
+    LATENCY_HISTOGRAM_BUCKETS,
+)
+
+__all__ = [
+    "WorkflowSpan",
+    "WorkflowTrace",
+    "trace_workflow",
+    "start_node_span",
+    "get_current_span",
+    "get_latency_histogram",
+    "LATENCY_HISTOGRAM_BUCKETS",
+]
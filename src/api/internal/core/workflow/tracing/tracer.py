@@ -0,0 +1,310 @@
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Any, Iterator, Optional
+
+import requests
+from pydantic import BaseModel, Field
+
+from internal.core.workflow.entities.node_entity import BaseNodeData, NodeResult, NodeStatus
+from internal.entity.cache_entity import CACHE_WORKFLOW_LATENCY_HISTOGRAM
+from internal.entity.workflow_entity import WorkflowTraceExporter
+
+# 延迟直方图的桶上界，单位为毫秒，最后一个桶为+Inf
+LATENCY_HISTOGRAM_BUCKETS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, 60000]
+
+# 延迟直方图在Redis中的过期时间
+LATENCY_HISTOGRAM_EXPIRE_TIME = 7 * 24 * 3600
+
+# 当前运行的追踪链路及节点span
+_current_trace: ContextVar[Optional["WorkflowTrace"]] = ContextVar("workflow_trace", default=None)
+_current_span: ContextVar[Optional["WorkflowSpan"]] = ContextVar("workflow_span", default=None)
+
+# 导出追踪数据使用单独的线程，避免阻塞工作流的返回
+_export_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="workflow-trace-export")
+
+
+class WorkflowSpan(BaseModel):
+    """工作流运行span，每个节点/子工作流运行一次对应一个span"""
+    span_id: str = Field(default_factory=lambda: uuid.uuid4().hex[:16])
+    parent_span_id: str = ""
+    name: str = ""  # span名称，节点为节点标题，子工作流为工作流名称
+    kind: str = "node"  # span类型，node/workflow
+    node_id: str = ""
+    node_type: str = ""
+    start_time: int = 0  # 开始时间，unix纳秒时间戳
+    end_time: int = 0  # 结束时间，unix纳秒时间戳
+    executor_wait: float = 0  # 在线程池中排队等待的时间，单位为秒
+    input_bytes: int = 0  # 输入数据序列化后的字节数
+    output_bytes: int = 0  # 输出数据序列化后的字节数
+    cache_hit: bool = False  # 是否命中节点结果缓存
+    status: str = NodeStatus.SUCCEEDED.value
+    error: str = ""
+
+    @property
+    def duration(self) -> float:
+        """span耗时，单位为秒"""
+        return max(self.end_time - self.start_time, 0) / 1e9
+
+
+class WorkflowTrace:
+    """工作流单次运行的追踪链路"""
+
+    def __init__(self, workflow_id: str, workflow_name: str, exporter: str):
+        self.trace_id = uuid.uuid4().hex
+        self.workflow_id = workflow_id
+        self.workflow_name = workflow_name
+        self.exporter = exporter
+        self.root_span = WorkflowSpan(name=workflow_name, kind="workflow", start_time=time.time_ns())
+        self.spans: list[WorkflowSpan] = [self.root_span]
+        self._lock = threading.Lock()
+
+    def add_span(self, span: WorkflowSpan):
+        with self._lock:
+            self.spans.append(span)
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "workflow_id": self.workflow_id,
+            "workflow_name": self.workflow_name,
+            "spans": [span.model_dump() for span in self.spans],
+        }
+
+
+def get_current_span() -> Optional[WorkflowSpan]:
+    """获取当前正在运行的节点span，未开启追踪时返回None"""
+    return _current_span.get()
+
+
+@contextmanager
+def trace_workflow(workflow_id: str, workflow_name: str) -> Iterator[Optional[WorkflowTrace]]:
+    """追踪一次工作流运行，嵌套运行的子工作流(如迭代节点)记录为当前链路中的子span"""
+    # 1. 已处于追踪链路中，则将子工作流记录为父节点span下的workflow span
+    parent_trace = _current_trace.get()
+    if parent_trace is not None:
+        parent_span = _current_span.get()
+        span = WorkflowSpan(
+            name=workflow_name,
+            kind="workflow",
+            parent_span_id=parent_span.span_id if parent_span else parent_trace.root_span.span_id,
+            start_time=time.time_ns(),
+        )
+        span_token = _current_span.set(span)
+        try:
+            yield parent_trace
+        except Exception as error:
+            span.status, span.error = NodeStatus.FAILED.value, str(error)
+            raise
+        finally:
+            span.end_time = time.time_ns()
+            parent_trace.add_span(span)
+            _current_span.reset(span_token)
+        return
+
+    # 2. 未开启追踪时不记录任何数据
+    exporter = _get_config("WORKFLOW_TRACE_EXPORTER", WorkflowTraceExporter.NONE)
+    if not exporter or exporter == WorkflowTraceExporter.NONE:
+        yield None
+        return
+
+    # 3. 创建追踪链路并在运行结束后异步导出
+    trace = WorkflowTrace(workflow_id, workflow_name, exporter)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(None)
+    try:
+        yield trace
+    except Exception as error:
+        trace.root_span.status, trace.root_span.error = NodeStatus.FAILED.value, str(error)
+        raise
+    finally:
+        trace.root_span.end_time = time.time_ns()
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        _export_executor.submit(_export_trace, trace)
+
+
+@contextmanager
+def start_node_span(node_data: BaseNodeData) -> Iterator[Optional[WorkflowSpan]]:
+    """记录节点运行span，未开启追踪时返回None"""
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    parent_span = _current_span.get()
+    span = WorkflowSpan(
+        name=node_data.title,
+        node_id=str(node_data.id),
+        node_type=node_data.node_type.value,
+        parent_span_id=parent_span.span_id if parent_span else trace.root_span.span_id,
+        start_time=time.time_ns(),
+    )
+    token = _current_span.set(span)
+    try:
+        yield span
+    except Exception as error:
+        span.status, span.error = NodeStatus.FAILED.value, str(error)
+        raise
+    finally:
+        span.end_time = time.time_ns()
+        _current_span.reset(token)
+        trace.add_span(span)
+
+
+def record_node_result(span: Optional[WorkflowSpan], result: Any):
+    """将节点运行结果中的状态、数据大小以及缓存命中信息记录到span中"""
+    if span is None or not isinstance(result, dict):
+        return
+    for node_result in result.get("node_results") or []:
+        if not isinstance(node_result, NodeResult):
+            continue
+        span.status = node_result.status.value
+        span.error = node_result.error
+        span.cache_hit = bool(node_result.metadata.get("cache_hit", False))
+        span.input_bytes = _get_payload_size(node_result.inputs)
+        span.output_bytes = _get_payload_size(node_result.outputs)
+
+
+def get_latency_histogram(workflow_id: str) -> dict[str, Any]:
+    """获取工作流各节点的延迟直方图，数据来源于所有进程写入Redis的聚合结果"""
+    from app.http.module import injector
+    from redis import Redis
+
+    # 1. 字段格式为: 节点名称|桶上界，值为次数；另外记录总耗时和总次数
+    raw = injector.get(Redis).hgetall(CACHE_WORKFLOW_LATENCY_HISTOGRAM.format(workflow_id=workflow_id))
+    histogram: dict[str, dict[str, Any]] = {}
+    for field, value in raw.items():
+        name, metric = field.decode("utf-8").rsplit("|", 1)
+        item = histogram.setdefault(name, {
+            "buckets": {str(bucket): 0 for bucket in [*LATENCY_HISTOGRAM_BUCKETS, "+Inf"]},
+            "count": 0,
+            "sum_ms": 0.0,
+        })
+        if metric == "count":
+            item["count"] = int(value)
+        elif metric == "sum_ms":
+            item["sum_ms"] = float(value)
+        else:
+            item["buckets"][metric] = int(value)
+
+    # 2. 计算平均耗时，并按总耗时倒序，便于找出耗时占比最高的节点
+    for item in histogram.values():
+        item["avg_ms"] = item["sum_ms"] / item["count"] if item["count"] else 0
+    return dict(sorted(histogram.items(), key=lambda kv: kv[1]["sum_ms"], reverse=True))
+
+
+def _export_trace(trace: WorkflowTrace):
+    """导出追踪数据并聚合延迟直方图，导出失败只记录日志"""
+    try:
+        if trace.exporter == WorkflowTraceExporter.JSON:
+            _export_json_file(trace)
+        elif trace.exporter == WorkflowTraceExporter.OTLP:
+            _export_otlp(trace)
+        if trace.workflow_id:
+            _record_latency_histogram(trace)
+    except Exception as error:
+        logging.warning("导出工作流追踪数据失败: %(error)s", {"error": error})
+
+
+def _export_json_file(trace: WorkflowTrace):
+    """按天追加写入JSON Lines格式的追踪文件，每行为一次工作流运行"""
+    trace_dir = _get_config("WORKFLOW_TRACE_FILE_DIR", "")
+    if not trace_dir:
+        # 未配置时写入项目下的storage/workflow_trace，不依赖进程的工作目录
+        current_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+            os.path.abspath(__file__)
+        )))))
+        trace_dir = os.path.join(current_path, "storage", "workflow_trace")
+    os.makedirs(trace_dir, exist_ok=True)
+    file_path = os.path.join(trace_dir, f"{datetime.now().strftime('%Y%m%d')}.jsonl")
+    with open(file_path, "a", encoding="utf-8") as file:
+        file.write(json.dumps(trace.to_dict(), ensure_ascii=False) + "\n")
+
+
+def _export_otlp(trace: WorkflowTrace):
+    """使用OTLP/HTTP JSON协议将追踪数据发送到本地的OpenTelemetry Collector"""
+    endpoint = _get_config("WORKFLOW_TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    spans = []
+    for span in trace.spans:
+        attributes = {
+            "workflow.id": trace.workflow_id,
+            "workflow.span_kind": span.kind,
+            "node.id": span.node_id,
+            "node.type": span.node_type,
+            "node.executor_wait_ms": span.executor_wait * 1000,
+            "node.input_bytes": span.input_bytes,
+            "node.output_bytes": span.output_bytes,
+            "node.cache_hit": span.cache_hit,
+        }
+        spans.append({
+            "traceId": trace.trace_id,
+            "spanId": span.span_id,
+            "parentSpanId": span.parent_span_id,
+            "name": span.name,
+            "kind": 1,
+            "startTimeUnixNano": str(span.start_time),
+            "endTimeUnixNano": str(span.end_time),
+            "attributes": [{"key": key, "value": _to_otlp_value(value)} for key, value in attributes.items()],
+            "status": {"code": 2, "message": span.error} if span.status == NodeStatus.FAILED else {"code": 1},
+        })
+    payload = {"resourceSpans": [{
+        "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": "aiagent-workflow"}}]},
+        "scopeSpans": [{"scope": {"name": "internal.core.workflow"}, "spans": spans}],
+    }]}
+    requests.post(endpoint, json=payload, timeout=5).raise_for_status()
+
+
+def _record_latency_histogram(trace: WorkflowTrace):
+    """将本次运行中工作流及各节点的耗时累加到Redis直方图中"""
+    from app.http.module import injector
+    from redis import Redis
+
+    cache_key = CACHE_WORKFLOW_LATENCY_HISTOGRAM.format(workflow_id=trace.workflow_id)
+    pipeline = injector.get(Redis).pipeline(transaction=False)
+    for span in trace.spans:
+        if span.kind == "workflow" and span is not trace.root_span:
+            continue
+        name = "__workflow__" if span is trace.root_span else span.name
+        duration_ms = span.duration * 1000
+        bucket = next((str(b) for b in LATENCY_HISTOGRAM_BUCKETS if duration_ms <= b), "+Inf")
+        pipeline.hincrby(cache_key, f"{name}|{bucket}", 1)
+        pipeline.hincrby(cache_key, f"{name}|count", 1)
+        pipeline.hincrbyfloat(cache_key, f"{name}|sum_ms", duration_ms)
+    pipeline.expire(cache_key, LATENCY_HISTOGRAM_EXPIRE_TIME)
+    pipeline.execute()
+
+
+def _to_otlp_value(value: Any) -> dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _get_payload_size(payload: Any) -> int:
+    try:
+        return len(json.dumps(payload, ensure_ascii=False, default=str).encode("utf-8"))
+    except Exception:
+        return 0
+
+
+def _get_config(key: str, default: Any) -> Any:
+    """读取应用配置，工作流可能运行在没有应用上下文的线程中，所以直接从依赖注入中获取配置"""
+    try:
+        from app.http.module import injector
+        from config import Config
+
+        return getattr(injector.get(Config), key, default)
+    except Exception:
+        return default
@@ -5,9 +5,20 @@ from internal.core.workflow.entities.variable_entity import VariableEntity, VARI
 from internal.core.workflow.entities.workflow_entity import WorkflowState
 
 
+def get_node_outputs(state: WorkflowState) -> dict[str, dict[str, Any]]:
+    """获取状态中节点id->节点输出的索引，状态中没有索引时根据节点结果列表构建"""
+    node_outputs = state.get("node_outputs")
+    if node_outputs is None:
+        node_outputs = {
+            str(node_result.node_data.id): node_result.outputs for node_result in state.get("node_results") or []
+        }
+    return node_outputs
+
+
 def extract_variables_from_state(variables: list[VariableEntity], state: WorkflowState) -> dict[str, Any]:
     """从状态中提取变量映射值信息"""
     variables_dict = {}
+    node_outputs = get_node_outputs(state)
 
     for variable in variables:
         variable_type_cls = VARIABLE_TYPE_MAP.get(variable.type)
@@ -16,13 +27,13 @@ def extract_variables_from_state(variables: list[VariableEntity], state: Workflo
             """直接输入，直接输入"""
             variables_dict[variable.name] = variable_type_cls(variable.value.content)
         else:
-            """引用or生成，遍历点获取数据"""
-            for node_result in state["node_results"]:
-                if node_result.node_data.id == variable.value.content.ref_node_id:
-                    # 提取数据并完成数据强制转换
-                    variables_dict[variable.name] = variable_type_cls(node_result.outputs.get(
-                        variable.value.content.ref_var_name,
-                        VARIABLE_TYPE_DEFAULT_VALUE_MAP.get(variable.type)
-                    ))
+            """引用or生成，从节点输出索引中获取数据"""
+            outputs = node_outputs.get(str(variable.value.content.ref_node_id))
+            if outputs is not None:
+                # 提取数据并完成数据强制转换
+                variables_dict[variable.name] = variable_type_cls(outputs.get(
+                    variable.value.content.ref_var_name,
+                    VARIABLE_TYPE_DEFAULT_VALUE_MAP.get(variable.type)
+                ))
 
     return variables_dict
@@ -0,0 +1,129 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+from typing import Any
+
+from internal.core.workflow.entities.node_entity import NodeResult
+from internal.core.workflow.entities.workflow_entity import WORKFLOW_STATE_INLINE_VALUE_SIZE
+from internal.exception import NotFoundException
+from internal.lib.helper import convert_model_to_dict
+
+# 单独存储的节点输入/输出在运行结果中的引用标识
+STATE_VALUE_REF_KEY = "$ref"
+
+# 节点运行结果中记录所有单独存储数据引用哈希的字段，读取数据时只信任该字段
+STATE_VALUE_REFS_KEY = "value_refs"
+
+# 引用中保留的数据预览长度
+STATE_VALUE_PREVIEW_SIZE = 200
+
+_VALUE_HASH_PATTERN = re.compile(r"^[0-9a-f]{64}$")
+
+
+def serialize_node_result(node_result: NodeResult) -> dict[str, Any]:
+    """
+    将节点运行结果序列化为精简格式，节点配置只保留id/类型/标题，不再携带提示词、代码、工具参数等完整配置，
+    超过大小限制的输入/输出单独存储，结果中只保留引用，序列化成本只与节点输出相关
+    """
+    node_data = node_result.node_data
+    value_refs = []
+    return {
+        "node_data": {
+            "id": str(node_data.id),
+            "node_type": node_data.node_type.value,
+            "title": node_data.title,
+        },
+        "status": node_result.status.value,
+        "inputs": _externalize_values(convert_model_to_dict(node_result.inputs), value_refs),
+        "outputs": _externalize_values(convert_model_to_dict(node_result.outputs), value_refs),
+        "latency": node_result.latency,
+        "error": node_result.error,
+        "metadata": convert_model_to_dict(node_result.metadata),
+        STATE_VALUE_REFS_KEY: value_refs,
+    }
+
+
+def collect_state_value_refs(state: Any) -> set[str]:
+    """
+    收集运行结果中所有单独存储的数据引用哈希，只读取序列化时记录的引用列表，
+    不解析输入/输出本身，避免节点输出中伪造的引用结构被当作合法引用
+    """
+    value_refs = set()
+    for node_result in state if isinstance(state, list) else []:
+        if not isinstance(node_result, dict):
+            continue
+        refs = node_result.get(STATE_VALUE_REFS_KEY)
+        if isinstance(refs, list):
+            value_refs.update(ref for ref in refs if isinstance(ref, str))
+    return value_refs
+
+
+def load_state_value(value_hash: str) -> Any:
+    """根据引用哈希读取单独存储的节点输入/输出"""
+    if not _VALUE_HASH_PATTERN.match(value_hash or ""):
+        raise NotFoundException("该节点数据不存在或已被清理")
+    file_path = _get_value_path(value_hash)
+    if not os.path.exists(file_path):
+        raise NotFoundException("该节点数据不存在或已被清理")
+    with open(file_path, "r", encoding="utf-8") as file:
+        return json.load(file)
+
+
+def _externalize_values(values: dict[str, Any], value_refs: list[str]) -> dict[str, Any]:
+    """逐个变量检测序列化后的大小，超过限制的变量写入存储并替换为引用，引用哈希同时记录到value_refs中"""
+    externalized = {}
+    for name, value in values.items():
+        data = json.dumps(value, ensure_ascii=False, default=str)
+        size = len(data.encode("utf-8"))
+        if size <= WORKFLOW_STATE_INLINE_VALUE_SIZE:
+            externalized[name] = value
+            continue
+        value_hash = _store_value(data)
+        value_refs.append(value_hash)
+        externalized[name] = {
+            STATE_VALUE_REF_KEY: value_hash,
+            "size": size,
+            "preview": data[:STATE_VALUE_PREVIEW_SIZE],
+        }
+    return externalized
+
+
+def _store_value(data: str) -> str:
+    """按内容哈希存储数据，相同内容只存储一份，先写临时文件再重命名，避免读取到写了一半的数据"""
+    value_hash = hashlib.sha3_256(data.encode("utf-8")).hexdigest()
+    file_path = _get_value_path(value_hash)
+    if os.path.exists(file_path):
+        return value_hash
+
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as file:
+            file.write(data)
+        os.replace(tmp_path, file_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return value_hash
+
+
+def _get_value_path(value_hash: str) -> str:
+    """数据按哈希前两位分目录存储，避免单个目录下文件过多"""
+    return os.path.join(_get_storage_dir(), value_hash[:2], f"{value_hash}.json")
+
+
+def _get_storage_dir() -> str:
+    """读取单独存储目录，未配置时写入项目下的storage/workflow_state，不依赖进程的工作目录"""
+    from app.http.module import injector
+    from config import Config
+
+    storage_dir = injector.get(Config).WORKFLOW_STATE_VALUE_DIR
+    if storage_dir:
+        return storage_dir
+    current_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(
+        os.path.abspath(__file__)
+    )))))
+    return os.path.join(current_path, "storage", "workflow_state")
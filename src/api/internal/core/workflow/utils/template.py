@@ -0,0 +1,47 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from jinja2 import Template, TemplateError
+from jinja2.sandbox import SandboxedEnvironment
+
+from internal.entity.workflow_entity import COMPILED_TEMPLATE_CACHE_SIZE
+from internal.exception import FailException
+
+# 所有节点共享的沙箱模板环境，模板中无法访问对象的私有属性及不安全的方法
+_environment = SandboxedEnvironment(autoescape=False)
+
+# 已编译的模板缓存，key为模板内容的哈希值
+_template_cache: OrderedDict[str, Template] = OrderedDict()
+_template_cache_lock = threading.Lock()
+
+
+def get_template(source: str) -> Template:
+    """获取编译后的模板，相同内容的模板只编译一次，超出缓存数量时淘汰最久未使用的模板"""
+    template_hash = hashlib.sha3_256(source.encode("utf-8")).hexdigest()
+    with _template_cache_lock:
+        template = _template_cache.get(template_hash)
+        if template is not None:
+            _template_cache.move_to_end(template_hash)
+            return template
+
+    # 编译模板不加锁，并发编译同一个模板时结果一致，后写入的覆盖先写入的即可
+    try:
+        template = _environment.from_string(source)
+    except TemplateError as error:
+        raise FailException(f"模板语法错误: {error}")
+
+    with _template_cache_lock:
+        _template_cache[template_hash] = template
+        if len(_template_cache) > COMPILED_TEMPLATE_CACHE_SIZE:
+            _template_cache.popitem(last=False)
+    return template
+
+
+def render_template(source: str, variables: dict[str, Any]) -> str:
+    """使用沙箱环境渲染模板"""
+    try:
+        return get_template(source).render(**variables)
+    except TemplateError as error:
+        raise FailException(f"模板渲染出错: {error}")
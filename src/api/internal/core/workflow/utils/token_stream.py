@@ -0,0 +1,37 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+from internal.core.workflow.entities.node_entity import BaseNodeData, NodeTokenEvent
+
+# 当前工作流运行的token事件监听器，未开启token流式输出时为None
+_token_listener: ContextVar[Optional[Callable[[NodeTokenEvent], None]]] = ContextVar(
+    "workflow_token_listener",
+    default=None,
+)
+
+
+@contextmanager
+def listen_node_tokens(listener: Optional[Callable[[NodeTokenEvent], None]]) -> Iterator[None]:
+    """
+    在上下文中注册token事件监听器，节点在线程池中运行时会继承当前上下文，传递None时屏蔽上层的监听器，
+    必须在同一个上下文中进入和退出，不能跨越异步生成器的yield使用
+    """
+    token = _token_listener.set(listener)
+    try:
+        yield
+    finally:
+        _token_listener.reset(token)
+
+
+def publish_node_token(node_data: BaseNodeData, delta: str):
+    """发布节点增量token事件，没有监听器或者内容为空时直接忽略"""
+    listener = _token_listener.get()
+    if listener is None or not isinstance(delta, str) or not delta:
+        return
+    listener(NodeTokenEvent(
+        node_id=str(node_data.id),
+        node_type=node_data.node_type,
+        title=node_data.title,
+        delta=delta,
+    ))
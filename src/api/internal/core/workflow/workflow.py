@@ -1,6 +1,7 @@
+import asyncio
 from typing import Any, Optional, AsyncIterator
 
-from flask import current_app
+from flask import current_app, has_app_context
 from langchain_core.runnables import RunnableConfig
 from langchain_core.runnables.utils import Input, Output
 from langchain_core.tools import BaseTool
@@ -9,9 +10,12 @@ from langgraph.graph.state import CompiledStateGraph
 from pydantic import PrivateAttr, Field, create_model, BaseModel
 
 from internal.exception import ValidateErrorException
-from .entities.node_entity import NodeType
+from .entities.node_entity import NodeType, NodeTokenEvent
 from .entities.variable_entity import VARIABLE_TYPE_MAP
-from .entities.workflow_entity import WorkflowConfig, WorkflowState
+from .entities.workflow_entity import WorkflowConfig, WorkflowState, WORKFLOW_TOKEN_EVENT_KEY
+from .tracing import trace_workflow
+from .utils.token_stream import listen_node_tokens
+from .workflow_compiler import build_execution_plan
 from .nodes import (StartNode,
                     EndNode,
                     TemplateTransformNode,
@@ -85,7 +89,9 @@ class Workflow(BaseTool):
 
         nodes = self._workflow_config.nodes
         edges = self._workflow_config.edges
-        _kwargs = {"listen": self._on_node_exec}
+        # 节点只在构建时创建实例，工具、子工作流等资源在节点首次运行时才初始化，需要传递应用用于推送上下文
+        flask_app = current_app._get_current_object() if has_app_context() else None
+        _kwargs = {"listen": self._on_node_exec, "flask_app": flask_app}
         for node in nodes:
             node_flag = f"{node.node_type.value}_{node.id}"
             if node.node_type == NodeType.START:
@@ -107,7 +113,6 @@ class Workflow(BaseTool):
                 graph.add_node(
                     node_flag,
                     NodeClasses[NodeType.DATASET_RETRIEVAL](
-                        flask_app=current_app._get_current_object(),
                         account_id=self._workflow_config.account_id,
                         node_data=node, **_kwargs)
                 )
@@ -158,29 +163,12 @@ class Workflow(BaseTool):
                 )
             else:
                 raise ValidateErrorException(f"{node.node_type} 工作流节点类型错误，请核实后重试")
-        start_node = ""
-        end_node = ""
-        parallel_edges = {}  # key:终点；value:起点列表
-        non_parallel_nodes = []  # 用于存储不能并行执行的节点列表信息(主要用来处理意图节点的虚拟起点和终点)
-        for edge in edges:
-            source_node = f"{edge.source_type.value}_{edge.source}"
-            target_node = f"{edge.target_type.value}_{edge.target}"
-
-            # 特殊处理意图识别节点
-            if edge.source_type == NodeType.QUESTION_CLASSIFIER:
-                # 更新意图识别的起点，使用虚拟节点进行拼接
-                source_node = f"qc_source_handle_{str(edge.source_handle_id)}"
-                non_parallel_nodes.extend([source_node, target_node])
-
-            if target_node not in parallel_edges:
-                parallel_edges[target_node] = [source_node]
-            else:
-                parallel_edges[target_node].append(source_node)
-
-            if edge.source_type == NodeType.START:
-                start_node = f"{edge.source_type.value}_{edge.source}"
-            if edge.target_type == NodeType.END:
-                end_node = f"{edge.target_type.value}_{edge.target}"
+        # 发布的工作流直接使用编译产物中的执行计划，否则根据边信息计算
+        execution_plan = self._workflow_config.execution_plan or build_execution_plan(edges)
+        start_node = execution_plan["start_node"]
+        end_node = execution_plan["end_node"]
+        parallel_edges = execution_plan["parallel_edges"]  # key:终点；value:起点列表
+        non_parallel_nodes = execution_plan["non_parallel_nodes"]  # 意图节点的虚拟起点和终点，不能合并汇聚
 
         graph.set_entry_point(start_node)
         graph.set_finish_point(end_node)
@@ -200,21 +188,63 @@ class Workflow(BaseTool):
     def _on_node_exec(self, node_result):
         pass
 
+    def _get_trace_id(self) -> str:
+        workflow_id = self._workflow_config.workflow_id
+        return str(workflow_id) if workflow_id else ""
+
     def _run(self, *args: Any, **kwargs: Any) -> Any:
-        result = self._workflow.invoke({"inputs": kwargs})
+        # 作为迭代等节点的子工作流运行时，屏蔽上层工作流的token监听器，避免以上层不认识的节点id推送token
+        with trace_workflow(self._get_trace_id(), self.name), listen_node_tokens(None):
+            result = self._workflow.invoke({"inputs": kwargs})
         return result.get("outputs", {})
 
     async def _arun(self, *args: Any, **kwargs: Any) -> Any:
-        result = await self._workflow.ainvoke({"inputs": kwargs})
+        with trace_workflow(self._get_trace_id(), self.name), listen_node_tokens(None):
+            result = await self._workflow.ainvoke({"inputs": kwargs})
         return result.get("outputs", {})
 
     async def astream(
             self,
             input: Input,
             config: Optional[RunnableConfig] = None,
+            stream_tokens: bool = False,
             **kwargs: Optional[Any],
     ) -> AsyncIterator[Output]:
-        """流式输出每个节点对应的结果"""
+        """流式输出每个节点对应的结果，开启stream_tokens后会穿插输出大模型类节点的增量token事件"""
         wf_state = {"inputs": input}
-        async for chunk in self._workflow.astream(wf_state):
-            yield chunk
+
+        # 1. 节点可能在事件循环或者线程池中发布token事件，统一转发到当前事件循环的队列中
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stream_end = object()
+
+        def on_node_token(event: NodeTokenEvent):
+            item = {WORKFLOW_TOKEN_EVENT_KEY: event}
+            try:
+                running_loop = asyncio.get_running_loop()
+            except RuntimeError:
+                running_loop = None
+            if running_loop is loop:
+                queue.put_nowait(item)
+            else:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+
+        async def run_graph():
+            # 追踪链路及token监听器只在任务自身的上下文中设置，不会泄漏到消费生成器的上下文中
+            try:
+                with trace_workflow(self._get_trace_id(), self.name), \
+                        listen_node_tokens(on_node_token if stream_tokens else None):
+                    async for graph_chunk in self._workflow.astream(wf_state):
+                        await queue.put(graph_chunk)
+            finally:
+                await queue.put(stream_end)
+
+        # 2. 在后台任务中运行工作流，生成器只负责转发队列中的数据
+        task = asyncio.create_task(run_graph())
+        try:
+            while (chunk := await queue.get()) is not stream_end:
+                yield chunk
+            await task
+        finally:
+            if not task.done():
+                task.cancel()
@@ -0,0 +1,60 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable
+
+from injector import singleton
+
+from internal.entity.workflow_entity import COMPILED_WORKFLOW_CACHE_SIZE, COMPILED_WORKFLOW_CACHE_TTL
+from .workflow import Workflow
+
+
+@singleton
+class CompiledWorkflowCache:
+    """进程级已编译工作流缓存，使用工作流id+发布图哈希作为键，按LRU淘汰并支持过期时间"""
+
+    def __init__(self, max_size: int = COMPILED_WORKFLOW_CACHE_SIZE, ttl: int = COMPILED_WORKFLOW_CACHE_TTL):
+        self._max_size = max_size
+        self._ttl = ttl
+        self._lock = threading.Lock()
+        # key:(工作流id, 图哈希)，value:(创建时间, 依赖的子工作流id集合, 已编译工作流)
+        self._items: OrderedDict[tuple[str, str], tuple[float, set[str], Workflow]] = OrderedDict()
+
+    def get_or_create(
+            self,
+            workflow_id: str,
+            graph_hash: str,
+            dependency_ids: set[str],
+            factory: Callable[[], Workflow],
+    ) -> Workflow:
+        """获取已编译的工作流，不存在或已过期时调用factory构建并缓存"""
+        # 1. 命中未过期的缓存则移动到队尾并直接返回
+        key = (workflow_id, graph_hash)
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None and time.monotonic() - item[0] < self._ttl:
+                self._items.move_to_end(key)
+                return item[2]
+
+        # 2. 在锁外构建工作流，避免编译耗时阻塞其他请求
+        workflow = factory()
+
+        # 3. 写入缓存，同时剔除同一工作流的旧版本并按LRU淘汰超出数量的缓存
+        with self._lock:
+            for stale_key in [k for k in self._items if k[0] == workflow_id and k != key]:
+                del self._items[stale_key]
+            self._items[key] = (time.monotonic(), dependency_ids, workflow)
+            self._items.move_to_end(key)
+            while len(self._items) > self._max_size:
+                self._items.popitem(last=False)
+
+        return workflow
+
+    def invalidate(self, workflow_id: str):
+        """清除工作流及引用了该工作流(迭代节点)的已编译缓存"""
+        with self._lock:
+            for key in [
+                k for k, (_, dependency_ids, _) in self._items.items()
+                if k[0] == workflow_id or workflow_id in dependency_ids
+            ]:
+                del self._items[key]
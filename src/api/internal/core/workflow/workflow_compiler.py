@@ -0,0 +1,92 @@
+import logging
+from typing import Any, Optional
+
+from internal.core.workflow.entities.edge_entity import BaseEdgeData
+from internal.core.workflow.entities.node_entity import NodeType
+from internal.core.workflow.entities.workflow_entity import WorkflowConfig
+
+# 编译产物格式版本，格式变更后旧版本的编译产物会被忽略并回退到完整校验
+WORKFLOW_COMPILED_GRAPH_VERSION = 1
+
+
+def compile_workflow_graph(
+        workflow_config: WorkflowConfig,
+        graph: dict[str, Any],
+        optimization: Optional[dict[str, Any]] = None,
+) -> dict[str, Any]:
+    """
+    发布时将校验通过的工作流配置编译为可直接加载的产物，只保存运行时会用到的数据：校验后的节点与边以及执行计划，
+    运行时加载产物即可跳过图结构校验，传递的工作流配置可以是静态优化后的配置，
+    graph为发布的原始图配置，用于在加载时校验产物是否与发布图一致
+    """
+    return {
+        "version": WORKFLOW_COMPILED_GRAPH_VERSION,
+        "graph_hash": WorkflowConfig._get_graph_hash(graph.get("nodes", []), graph.get("edges", [])),
+        "nodes": [node.model_dump(mode="json", by_alias=True) for node in workflow_config.nodes],
+        "edges": [edge.model_dump(mode="json", by_alias=True) for edge in workflow_config.edges],
+        "execution_plan": build_execution_plan(workflow_config.edges),
+        "optimization": optimization or {},
+    }
+
+
+def load_workflow_config(graph: dict[str, Any], compiled_graph: dict[str, Any], **kwargs: Any) -> WorkflowConfig:
+    """
+    根据已发布的图配置构建工作流配置，编译产物与发布图一致时直接加载校验后的节点与边，跳过图结构校验
+    (连通性、环路及变量引用)，节点与边自身的字段仍会实例化校验，编译产物缺失、版本不一致或者加载出错时回退为完整校验
+    """
+    graph = graph or {}
+    compiled_graph = compiled_graph or {}
+    nodes = graph.get("nodes", [])
+    edges = graph.get("edges", [])
+
+    if (
+            compiled_graph.get("version") == WORKFLOW_COMPILED_GRAPH_VERSION
+            and compiled_graph.get("graph_hash") == WorkflowConfig._get_graph_hash(nodes, edges)
+    ):
+        try:
+            node_data_classes = WorkflowConfig.get_node_data_classes()
+            return WorkflowConfig.model_construct(
+                nodes=[node_data_classes[node["node_type"]](**node) for node in compiled_graph["nodes"]],
+                edges=[BaseEdgeData(**edge) for edge in compiled_graph["edges"]],
+                execution_plan=compiled_graph["execution_plan"],
+                **kwargs,
+            )
+        except Exception as error:
+            logging.warning("加载工作流编译产物失败，回退为完整校验: %(error)s", {"error": error})
+
+    return WorkflowConfig(nodes=nodes, edges=edges, **kwargs)
+
+
+def build_execution_plan(edges: list[BaseEdgeData]) -> dict[str, Any]:
+    """根据边信息计算图的执行计划，涵盖起点/终点节点标识、汇聚边分组(终点->起点列表)以及不能合并汇聚的意图识别虚拟节点"""
+    start_node = ""
+    end_node = ""
+    parallel_edges = {}  # key:终点；value:起点列表
+    non_parallel_nodes = []  # 用于存储不能并行执行的节点列表信息(主要用来处理意图节点的虚拟起点和终点)
+    for edge in edges:
+        source_node = f"{edge.source_type.value}_{edge.source}"
+        target_node = f"{edge.target_type.value}_{edge.target}"
+
+        # 特殊处理意图识别节点
+        if edge.source_type == NodeType.QUESTION_CLASSIFIER:
+            # 更新意图识别的起点，使用虚拟节点进行拼接
+            source_node = f"qc_source_handle_{str(edge.source_handle_id)}"
+            non_parallel_nodes.extend([source_node, target_node])
+
+        if target_node not in parallel_edges:
+            parallel_edges[target_node] = [source_node]
+        else:
+            parallel_edges[target_node].append(source_node)
+
+        if edge.source_type == NodeType.START:
+            start_node = f"{edge.source_type.value}_{edge.source}"
+        if edge.target_type == NodeType.END:
+            end_node = f"{edge.target_type.value}_{edge.target}"
+
+    return {
+        "start_node": start_node,
+        "end_node": end_node,
+        "parallel_edges": parallel_edges,
+        "non_parallel_nodes": non_parallel_nodes,
+    }
+
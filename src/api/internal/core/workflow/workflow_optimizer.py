@@ -0,0 +1,236 @@
+import logging
+import uuid
+from collections import defaultdict
+from typing import Any
+from uuid import UUID
+
+from internal.core.workflow.entities.edge_entity import BaseEdgeData
+from internal.core.workflow.entities.node_entity import NodeType, BaseNodeData
+from internal.core.workflow.entities.variable_entity import VariableEntity, VariableValueType
+from internal.core.workflow.entities.workflow_entity import WorkflowConfig
+from internal.core.workflow.utils.helper import extract_variables_from_state
+from internal.core.workflow.utils.template import render_template
+
+# 没有外部副作用的节点类型，输出未被使用时可以安全剔除，其他类型的节点(Http请求、插件、代码、迭代等)即使输出未被使用也会保留，
+# 代码节点运行任意用户代码，可能发送网络请求或写入数据，与Http请求/插件节点一样视为有副作用
+PRUNABLE_NODE_TYPES = {
+    NodeType.LLM,
+    NodeType.TEMPLATE_TRANSFORM,
+    NodeType.DATASET_RETRIEVAL,
+}
+
+
+def optimize_workflow_config(workflow_config: WorkflowConfig) -> tuple[WorkflowConfig, dict[str, Any]]:
+    """
+    发布时对校验通过的工作流配置执行静态优化：常量折叠只有直接输入的模板转换节点、剔除输出无法到达结束节点的无用节点，
+    并标注可以并行执行的节点分组，返回优化后的工作流配置以及优化报告，优化后的配置校验失败时返回原配置
+    """
+    nodes = list(workflow_config.nodes)
+    edges = list(workflow_config.edges)
+
+    # 1. 常量折叠，引用折叠节点输出的变量替换为直接输入，折叠后的节点不再被引用，会在下一步被剔除
+    nodes, folded_nodes = _fold_constant_templates(nodes)
+
+    # 2. 从结束节点以及有副作用的节点出发，沿变量引用反向标记所有需要执行的节点，其余节点剔除并重连边
+    live_node_ids = _get_live_node_ids(nodes)
+    pruned_nodes = [node for node in nodes if node.id not in live_node_ids]
+    edges, added_edges, removed_edges = _prune_nodes(pruned_nodes, edges)
+    nodes = [node for node in nodes if node.id in live_node_ids]
+
+    # 3. 使用完整规则校验优化后的配置，校验失败则放弃优化
+    report = {
+        "pruned_nodes": [_describe_node(node) for node in pruned_nodes],
+        "folded_nodes": folded_nodes,
+        "added_edges": added_edges,
+        "removed_edges": removed_edges,
+        "before": {"node_count": len(workflow_config.nodes), "edge_count": len(workflow_config.edges)},
+        "after": {"node_count": len(nodes), "edge_count": len(edges)},
+    }
+    if pruned_nodes or folded_nodes:
+        try:
+            workflow_config = WorkflowConfig(
+                account_id=workflow_config.account_id,
+                workflow_id=workflow_config.workflow_id,
+                name=workflow_config.name,
+                cn_name=workflow_config.cn_name,
+                description=workflow_config.description,
+                nodes=[node.model_dump(mode="json", by_alias=True) for node in nodes],
+                edges=[edge.model_dump(mode="json", by_alias=True) for edge in edges],
+            )
+        except Exception as error:
+            # 自定义异常的错误信息记录在message中，str(error)为空
+            error_message = getattr(error, "message", None) or str(error)
+            logging.warning("工作流静态优化结果校验失败，使用原配置: %(error)s", {"error": error_message})
+            report = {
+                "pruned_nodes": [],
+                "folded_nodes": [],
+                "added_edges": 0,
+                "removed_edges": 0,
+                "before": report["before"],
+                "after": report["before"],
+                "error": error_message,
+            }
+
+    # 4. 标注可以并行执行的节点分组，以及只因为边的先后顺序而被串行执行的节点
+    report.update(_annotate_parallelism(workflow_config.nodes, workflow_config.edges))
+
+    return workflow_config, report
+
+
+def _fold_constant_templates(nodes: list[BaseNodeData]) -> tuple[list[BaseNodeData], list[dict[str, Any]]]:
+    """在发布时渲染只有直接输入的模板转换节点，并将引用其输出的变量替换为渲染结果"""
+    # 1. 渲染所有输入均为直接输入的模板转换节点，渲染出错的节点保持原样
+    folded_outputs: dict[UUID, str] = {}
+    folded_nodes = []
+    for node in nodes:
+        if node.node_type != NodeType.TEMPLATE_TRANSFORM:
+            continue
+        if any(variable.value.type != VariableValueType.LITERAL for variable in node.inputs):
+            continue
+        try:
+            folded_outputs[node.id] = render_template(node.template, extract_variables_from_state(node.inputs, {}))
+        except Exception as error:
+            logging.info("模板转换节点[%(title)s]常量折叠失败: %(error)s", {"title": node.title, "error": error})
+            continue
+        folded_nodes.append({**_describe_node(node), "output": folded_outputs[node.id]})
+
+    if not folded_outputs:
+        return nodes, folded_nodes
+
+    # 2. 将引用折叠节点输出的变量替换为直接输入，只复制需要修改的节点
+    optimized_nodes = []
+    for node in nodes:
+        variables = _get_node_variables(node)
+        if not any(_is_folded_ref(variable, folded_outputs) for variable in variables):
+            optimized_nodes.append(node)
+            continue
+        node = node.model_copy(deep=True)
+        for variable in _get_node_variables(node):
+            if _is_folded_ref(variable, folded_outputs):
+                variable.value = VariableEntity.Value(
+                    type=VariableValueType.LITERAL,
+                    content=folded_outputs[variable.value.content.ref_node_id],
+                )
+        optimized_nodes.append(node)
+
+    return optimized_nodes, folded_nodes
+
+
+def _get_live_node_ids(nodes: list[BaseNodeData]) -> set[UUID]:
+    """从结束节点及所有不可剔除的节点出发，沿变量引用标记所有输出会被使用的节点"""
+    node_dict = {node.id: node for node in nodes}
+    stack = [node.id for node in nodes if node.node_type not in PRUNABLE_NODE_TYPES]
+    live_node_ids = set(stack)
+    while stack:
+        node = node_dict[stack.pop()]
+        for variable in _get_node_variables(node):
+            if variable.value.type != VariableValueType.REF:
+                continue
+            ref_node_id = variable.value.content.ref_node_id
+            if ref_node_id in node_dict and ref_node_id not in live_node_ids:
+                live_node_ids.add(ref_node_id)
+                stack.append(ref_node_id)
+    return live_node_ids
+
+
+def _prune_nodes(pruned_nodes: list[BaseNodeData], edges: list[BaseEdgeData]) -> tuple[list[BaseEdgeData], int, int]:
+    """剔除节点并将其所有前置节点连接到所有后续节点，保留前置节点的起点句柄，保证原有的执行先后顺序不变"""
+    added_edges = 0
+    removed_edges = 0
+    for node in pruned_nodes:
+        incoming = [edge for edge in edges if edge.target == node.id]
+        outgoing = [edge for edge in edges if edge.source == node.id]
+        edges = [edge for edge in edges if edge.source != node.id and edge.target != node.id]
+        removed_edges += len(incoming) + len(outgoing)
+
+        edge_keys = {(edge.source, edge.target, edge.source_handle_id) for edge in edges}
+        for in_edge in incoming:
+            for out_edge in outgoing:
+                edge_key = (in_edge.source, out_edge.target, in_edge.source_handle_id)
+                if edge_key in edge_keys:
+                    continue
+                edges.append(BaseEdgeData(
+                    id=uuid.uuid4(),
+                    source=in_edge.source,
+                    source_type=in_edge.source_type,
+                    source_handle_id=in_edge.source_handle_id,
+                    target=out_edge.target,
+                    target_type=out_edge.target_type,
+                ))
+                edge_keys.add(edge_key)
+                added_edges += 1
+
+    return edges, added_edges, removed_edges
+
+
+def _annotate_parallelism(nodes: list[BaseNodeData], edges: list[BaseEdgeData]) -> dict[str, Any]:
+    """
+    按边计算每个节点的执行层级，同一层级的节点互不依赖可以并行执行，
+    同时按变量引用计算数据依赖层级，执行层级大于数据依赖层级的节点只是被边串行化，可以调整连线提前执行，
+    位于问题分类分支内的节点是否执行取决于分类结果，不做提前执行的提示
+    """
+    # 1. 计算拓扑序，配置已校验通过，所以图中一定无环
+    adj_list = WorkflowConfig._build_adj_list(edges)
+    reverse_adj_list = WorkflowConfig._build_reverse_adj_list(edges)
+    in_degree, _ = WorkflowConfig._build_degrees(edges)
+    topological_order = WorkflowConfig._get_topological_order(nodes, adj_list, in_degree)
+
+    # 2. 沿拓扑序计算执行层级以及数据依赖层级
+    node_dict = {node.id: node for node in nodes}
+    levels: dict[UUID, int] = {}
+    data_levels: dict[UUID, int] = {}
+    branch_node_ids: set[UUID] = set()
+    for node_id in topological_order:
+        levels[node_id] = max((levels[parent_id] + 1 for parent_id in reverse_adj_list[node_id]), default=0)
+        if any(
+                parent_id in branch_node_ids or node_dict[parent_id].node_type == NodeType.QUESTION_CLASSIFIER
+                for parent_id in reverse_adj_list[node_id]
+        ):
+            branch_node_ids.add(node_id)
+        ref_node_ids = {
+            variable.value.content.ref_node_id
+            for variable in _get_node_variables(node_dict[node_id])
+            if variable.value.type == VariableValueType.REF
+        }
+        data_levels[node_id] = max(
+            (data_levels[ref_node_id] + 1 for ref_node_id in ref_node_ids if ref_node_id in data_levels),
+            default=1 if node_dict[node_id].node_type != NodeType.START else 0,
+        )
+
+    # 3. 汇总并行分组，以及可以提前执行的节点，条件分支与结束节点的位置由图结构决定，不做提示
+    parallel_groups = defaultdict(list)
+    for node_id in topological_order:
+        parallel_groups[levels[node_id]].append(_describe_node(node_dict[node_id]))
+    serialized_nodes = [
+        {**_describe_node(node_dict[node_id]), "level": levels[node_id], "data_level": data_levels[node_id]}
+        for node_id in topological_order
+        if node_dict[node_id].node_type in PRUNABLE_NODE_TYPES
+           and node_id not in branch_node_ids
+           and levels[node_id] > data_levels[node_id]
+    ]
+
+    return {
+        "parallel_groups": [
+            parallel_groups[level] for level in sorted(parallel_groups) if len(parallel_groups[level]) > 1
+        ],
+        "serialized_nodes": serialized_nodes,
+    }
+
+
+def _get_node_variables(node: BaseNodeData) -> list[VariableEntity]:
+    """获取节点引用其他节点的变量列表，结束节点为输出变量，开始节点没有引用"""
+    if node.node_type == NodeType.START:
+        return []
+    return getattr(node, "outputs" if node.node_type == NodeType.END else "inputs", None) or []
+
+
+def _is_folded_ref(variable: VariableEntity, folded_outputs: dict[UUID, str]) -> bool:
+    return (
+            variable.value.type == VariableValueType.REF
+            and variable.value.content.ref_node_id in folded_outputs
+            and variable.value.content.ref_var_name == "output"
+    )
+
+
+def _describe_node(node: BaseNodeData) -> dict[str, Any]:
+    return {"id": str(node.id), "title": node.title, "node_type": node.node_type.value}
@@ -9,3 +9,24 @@ LOCK_KEYWORD_TABLE_UPDATE_KEYWORD_TABLE = "lock:keyword_table:update:keyword_tab
 
 # 更新片段启用状态缓存锁
 LOCK_SEGMENT_UPDATE_ENABLED = "lock:segment:update:enabled_{segment_id}"
+
+# 工作流节点运行结果缓存
+CACHE_WORKFLOW_NODE_RESULT = "cache:workflow:node_result:{node_id}:{node_version}:{inputs_hash}"
+
+# 工作流问题分类节点分类结果缓存，按分类配置版本+规范化后的query缓存
+CACHE_WORKFLOW_QUESTION_CLASSIFIER = "cache:workflow:question_classifier:{node_id}:{classes_version}:{query_hash}"
+
+# 工作流批量运行信息及进度
+CACHE_WORKFLOW_BATCH_RUN = "cache:workflow:batch_run:{batch_run_id}"
+
+# 工作流运行延迟直方图，按工作流统计整体及各节点的延迟分布
+CACHE_WORKFLOW_LATENCY_HISTOGRAM = "cache:workflow:latency_histogram:{workflow_id}"
+
+# 工作流后台运行事件流
+CACHE_WORKFLOW_RESULT_EVENTS = "cache:workflow:result_events:{workflow_result_id}"
+
+# 文本嵌入查询向量缓存的命名空间，与文档向量缓存分开存储
+CACHE_QUERY_EMBEDDINGS_NAMESPACE = "cache:query_embeddings"
+
+# 文本嵌入查询向量缓存的过期时间，单位为秒
+CACHE_QUERY_EMBEDDINGS_EXPIRE_TIME = 24 * 3600
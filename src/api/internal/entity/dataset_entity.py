@@ -10,10 +10,20 @@ class ProcessType(str, Enum):
     CUSTOM = "custom"
 
 
+class ParseMode(str, Enum):
+    """文档解析模式枚举"""
+    FAST = "fast"  # 纯文本类文件使用轻量加载器
+    UNSTRUCTURED = "unstructured"  # 统一使用Unstructured解析，适用于复杂版面
+
+
+# 文件解析器版本，加载器的解析逻辑变更后需要递增，使历史解析缓存失效
+FILE_EXTRACTOR_VERSION = "2"
+
 # 默认的处理规则
 DEFAULT_PROCESS_RULE = {
     "mode": "custom",
     "rule": {
+        "parse_mode": ParseMode.FAST,
         "pre_process_rules": [
             {"id": "remove_extra_space", "enabled": True},
             {"id": "remove_url_and_email", "enabled": True},
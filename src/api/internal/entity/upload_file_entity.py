@@ -1,3 +1,18 @@
+from enum import Enum
+
 # 允许上传的文件类型
 ALLOWED_IMAGE_EXTENSION = ["jpg", "jpeg", "png", "webp", "gif", "svg"]
-ALLOWED_DOCUMENT_EXTENSION = ["txt", "markdown", "md", "pdf", "html", "htm", "xlsx", "xls", "doc", "docx", "csv"]
+ALLOWED_DOCUMENT_EXTENSION = ["txt", "markdown", "md", "pdf", "html", "htm", "xlsx", "xls", "doc", "docx", "csv", "json", "jsonl"]
+
+# 上传文件流式读取时每次读取的字节数
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+# 静态文件按内容寻址存储时的key格式，文件名即为文件哈希
+CONTENT_ADDRESSED_KEY_PATTERN = r"^[0-9a-f]{2}/[0-9a-f]{2}/(?P<hash>[0-9a-f]{64})\.\w+$"
+
+
+class StaticDeliveryMode(str, Enum):
+    """静态文件发送方式"""
+    FLASK = "flask"  # 由Flask直接读取并发送文件
+    X_ACCEL = "x-accel"  # 返回X-Accel-Redirect，交由nginx发送文件
+    X_SENDFILE = "x-sendfile"  # 返回X-Sendfile，交由Apache/lighttpd等服务器发送文件
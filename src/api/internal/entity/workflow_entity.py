@@ -15,6 +15,13 @@ class WorkflowResultStatus(str, Enum):
     FAILED = "failed"
 
 
+class WorkflowTraceExporter(str, Enum):
+    """工作流运行追踪数据导出方式"""
+    NONE = "none"
+    JSON = "json"
+    OTLP = "otlp"
+
+
 # 工作流默认配置信息，默认添加一个空的工作流
 DEFAULT_WORKFLOW_CONFIG = {
     "graph": {},
@@ -33,3 +40,52 @@ class WorkflowDebugGeneratorItemInfo:
     def __init__(self, _stage: str, _chunk: Any):
         self.chunk = _chunk
         self.stage = _stage
+
+
+# 进程级已编译工作流缓存的最大数量
+COMPILED_WORKFLOW_CACHE_SIZE = 128
+
+# 已编译工作流缓存的过期时间，单位为秒，用于兜底其他进程发布子工作流后的更新
+COMPILED_WORKFLOW_CACHE_TTL = 600
+
+# 进程级已编译节点模板缓存的最大数量
+COMPILED_TEMPLATE_CACHE_SIZE = 512
+
+
+class WorkflowBatchRunStatus(str, Enum):
+    """工作流批量运行状态"""
+    WAITING = "waiting"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+# 工作流批量运行支持的输入文件类型，jsonl每行一个输入对象，csv首行为输入变量名
+WORKFLOW_BATCH_ALLOWED_EXTENSION = ["jsonl", "csv"]
+
+# 工作流批量运行的默认及最大并发数
+WORKFLOW_BATCH_DEFAULT_CONCURRENCY = 5
+WORKFLOW_BATCH_MAX_CONCURRENCY = 50
+
+# 工作流批量运行进度的上报间隔，单位为秒
+WORKFLOW_BATCH_PROGRESS_INTERVAL = 1
+
+# 工作流批量运行信息的保留时间，单位为秒
+WORKFLOW_BATCH_RUN_EXPIRE_TIME = 7 * 24 * 3600
+
+
+class WorkflowRunMode(str, Enum):
+    """工作流调试运行方式"""
+    THREAD = "thread"  # 在API进程中使用线程运行，客户端断开后运行结果丢失
+    CELERY = "celery"  # 投递到Celery工作进程中运行，运行事件通过Redis转发，任意API实例均可订阅
+
+
+# 工作流后台运行使用的Celery队列，可以启动只消费该队列的工作进程与其他异步任务隔离
+WORKFLOW_CELERY_QUEUE = "workflow"
+
+# 工作流运行事件流的最大长度及过期时间，单位为秒
+WORKFLOW_RESULT_EVENTS_MAXLEN = 10000
+WORKFLOW_RESULT_EVENTS_EXPIRE_TIME = 24 * 3600
+
+# 订阅工作流运行事件时，超过该时间没有新事件则结束订阅，单位为秒
+WORKFLOW_RESULT_STREAM_IDLE_TIMEOUT = 600
@@ -1,8 +1,15 @@
+import mimetypes
+import os
 from dataclasses import dataclass
+from datetime import datetime, timezone
+from urllib.parse import quote
 
+from flask import current_app, request, send_file, Response
 from flask_login import login_required, current_user
 from injector import inject
 
+from internal.entity.upload_file_entity import StaticDeliveryMode
+
 from internal.schema.upload_file_schema import UploadFileReq, UploadFileResp, UploadImageReq
 from internal.service import CosLocalService
 from pkg.reponse import validate_error_json, success_json
@@ -38,3 +45,35 @@ class UploadFileHandler:
         return success_json({
             "image_url": image_url
         })
+
+    def get_static_file(self, filename: str):
+        """获取本地存储的静态文件，支持协商缓存与Range请求，并可交由前置web服务器直接发送文件"""
+        # 1. 获取文件路径，按内容寻址的文件使用文件哈希作为强ETag且内容永不变化
+        file_path = self.cos_service.get_local_file_path(filename)
+        file_hash = self.cos_service.get_content_hash(filename)
+        max_age = 365 * 24 * 3600 if file_hash else current_app.config.get("STATIC_MAX_AGE", 3600)
+
+        # 2. 默认由Flask发送文件，send_file会处理If-None-Match/If-Modified-Since与Range请求
+        delivery_mode = current_app.config.get("STATIC_DELIVERY_MODE", StaticDeliveryMode.FLASK)
+        if delivery_mode == StaticDeliveryMode.FLASK:
+            response = send_file(file_path, conditional=True, etag=file_hash or True, max_age=max_age)
+        else:
+            # 3. 卸载模式下只返回响应头，协商缓存命中时直接返回304，Range请求由web服务器处理
+            stat = os.stat(file_path)
+            response = Response(mimetype=mimetypes.guess_type(file_path)[0] or "application/octet-stream")
+            response.set_etag(file_hash or f"{int(stat.st_mtime)}-{stat.st_size}")
+            response.last_modified = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc)
+            response.cache_control.public = True
+            response.cache_control.max_age = max_age
+            response = response.make_conditional(request)
+            if response.status_code != 304:
+                if delivery_mode == StaticDeliveryMode.X_ACCEL:
+                    accel_prefix = current_app.config.get("STATIC_ACCEL_PREFIX", "/_protected_storage/")
+                    response.headers["X-Accel-Redirect"] = f"{accel_prefix.rstrip('/')}/{quote(filename)}"
+                else:
+                    response.headers["X-Sendfile"] = file_path
+                response.headers["Accept-Ranges"] = "bytes"
+
+        if file_hash:
+            response.cache_control.immutable = True
+        return response
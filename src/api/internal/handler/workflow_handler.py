@@ -11,8 +11,9 @@ from internal.schema.workflow_schema import (
     GetWorkflowResp,
     GetWorkflowsWithPageReq,
     GetWorkflowsWithPageResp,
+    CreateWorkflowBatchRunReq,
 )
-from internal.service import WorkflowService
+from internal.service import WorkflowService, WorkflowBatchService
 from pkg.paginator import PageModel
 from pkg.reponse import validate_error_json, success_json, success_message, compact_generate_response
 
@@ -22,6 +23,7 @@ from pkg.reponse import validate_error_json, success_json, success_message, comp
 class WorkflowHandler:
     """工作流处理器"""
     workflow_service: WorkflowService
+    workflow_batch_service: WorkflowBatchService
 
     @login_required
     def create_workflow(self):
@@ -109,6 +111,19 @@ class WorkflowHandler:
 
         return compact_generate_response(response)
 
+    @login_required
+    def stream_workflow_result(self, workflow_result_id: UUID):
+        """根据传递的运行结果id订阅后台运行的工作流事件，支持通过Last-Event-ID断线续传"""
+        last_event_id = request.headers.get("Last-Event-ID", "")
+        response = self.workflow_service.stream_workflow_result(workflow_result_id, current_user, last_event_id)
+        return compact_generate_response(response)
+
+    @login_required
+    def get_workflow_result_value(self, workflow_result_id: UUID, value_hash: str):
+        """根据传递的运行结果id+数据哈希获取单独存储的节点输入/输出"""
+        value = self.workflow_service.get_workflow_result_value(workflow_result_id, value_hash, current_user)
+        return success_json({"value": value})
+
     @login_required
     def publish_workflow(self, workflow_id: UUID):
         """根据传递的工作流id发布指定的工作流"""
@@ -120,3 +135,34 @@ class WorkflowHandler:
         """根据传递的工作流id取消发布指定的工作流"""
         self.workflow_service.cancel_publish_workflow(workflow_id, current_user)
         return success_message("取消发布工作流成功")
+
+    @login_required
+    def get_workflow_latency_histogram(self, workflow_id: UUID):
+        """根据传递的工作流id获取该工作流各节点的运行延迟直方图"""
+        histogram = self.workflow_service.get_workflow_latency_histogram(workflow_id, current_user)
+        return success_json(histogram)
+
+    @login_required
+    def get_workflow_optimization_report(self, workflow_id: UUID):
+        """根据传递的工作流id获取发布时生成的静态优化报告"""
+        report = self.workflow_service.get_workflow_optimization_report(workflow_id, current_user)
+        return success_json(report)
+
+    @login_required
+    def create_workflow_batch_run(self, workflow_id: UUID):
+        """根据传递的工作流id+jsonl/csv输入文件创建批量运行任务"""
+        # 1.提取请求并校验
+        req = CreateWorkflowBatchRunReq()
+        if not req.validate():
+            return validate_error_json(req.errors)
+
+        # 2.调用服务创建批量运行任务
+        batch_run = self.workflow_batch_service.create_batch_run(workflow_id, req, current_user)
+
+        return success_json(batch_run)
+
+    @login_required
+    def get_workflow_batch_run(self, batch_run_id: UUID):
+        """根据传递的批量运行id获取运行进度及结果文件"""
+        batch_run = self.workflow_batch_service.get_batch_run(batch_run_id, current_user)
+        return success_json(batch_run)
@@ -0,0 +1,45 @@
+import os
+import tempfile
+
+from pypdf import PdfReader, PdfWriter
+
+
+def get_pdf_page_count(file_path: str) -> int:
+    """获取pdf文件的总页数"""
+    return len(PdfReader(file_path).pages)
+
+
+def split_page_ranges(page_count: int, pages_per_chunk: int) -> list[tuple[int, int]]:
+    """将pdf总页数按固定页数拆分为多个[start, end)区间"""
+    return [(start, min(start + pages_per_chunk, page_count)) for start in range(0, page_count, pages_per_chunk)]
+
+
+def partition_pdf_pages(file_path: str, start: int, end: int) -> list[tuple[str, dict]]:
+    """解析pdf中[start, end)区间的页面，返回按页划分的(文本, 元数据)列表，页码为原始文件中的页码
+    该函数会在子进程中执行，为了降低子进程的导入开销，模块只依赖pypdf与unstructured
+    """
+    from langchain_community.document_loaders import UnstructuredPDFLoader
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # 1. 将指定区间的页面写入临时pdf文件
+        reader = PdfReader(file_path)
+        writer = PdfWriter()
+        for page in reader.pages[start:end]:
+            writer.add_page(page)
+        part_path = os.path.join(temp_dir, f"pages_{start}_{end}.pdf")
+        with open(part_path, "wb") as file:
+            writer.write(file)
+
+        # 2. 按页解析临时文件，并将页码还原为原始文件中的页码
+        results = []
+        for lc_document in UnstructuredPDFLoader(part_path, mode="paged").load():
+            metadata = {
+                **lc_document.metadata,
+                "source": file_path,
+                "page_number": start + int(lc_document.metadata.get("page_number", 1)),
+            }
+            metadata.pop("filename", None)
+            metadata.pop("file_directory", None)
+            results.append((lc_document.page_content, metadata))
+
+        return results
@@ -0,0 +1,108 @@
+"""
+代码沙箱工作进程，由工作流代码节点的进程池复制到专属的空临时目录中，并以隔离模式(`python -I`)运行该脚本启动。
+工作进程只依赖标准库，通过标准输入/输出使用长度前缀的JSON消息与父进程通信，父进程不会反序列化任何pickle数据。
+"""
+import base64
+import json
+import marshal
+import os
+import resource
+import struct
+import sys
+from collections import OrderedDict
+from typing import Any, BinaryIO, Optional
+
+# 消息头为4字节大端无符号整数，表示消息体长度
+HEADER = struct.Struct(">I")
+
+# 工作进程缓存的已加载代码数量
+FUNCTION_CACHE_SIZE = 256
+
+
+def read_message(stream: BinaryIO) -> Optional[dict[str, Any]]:
+    """读取一条消息，流被关闭时返回None"""
+    header = _read_exactly(stream, HEADER.size)
+    if header is None:
+        return None
+    body = _read_exactly(stream, HEADER.unpack(header)[0])
+    return json.loads(body) if body is not None else None
+
+
+def write_message(stream: BinaryIO, message: dict[str, Any]):
+    """写入一条消息"""
+    body = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    stream.write(HEADER.pack(len(body)) + body)
+    stream.flush()
+
+
+def _read_exactly(stream: BinaryIO, size: int) -> Optional[bytes]:
+    data = bytearray()
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            return None
+        data.extend(chunk)
+    return bytes(data)
+
+
+def _set_cpu_limit(cpu_time: int):
+    """RLIMIT_CPU限制的是进程累计CPU时间，所以每次执行前都在已使用时间的基础上重新设置软限制"""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime)
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    soft = used + cpu_time
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def main():
+    # 1. 保留原始的标准输入/输出作为通信管道，用户代码的print输出重定向到标准错误，避免破坏消息格式
+    stdin = os.fdopen(os.dup(sys.stdin.fileno()), "rb")
+    stdout = os.fdopen(os.dup(sys.stdout.fileno()), "wb")
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    os.dup2(devnull, sys.stdin.fileno())
+    os.dup2(sys.stderr.fileno(), sys.stdout.fileno())
+
+    # 2. 设置内存限制，超出时用户代码会抛出MemoryError
+    cpu_time = int(os.environ.get("CODE_SANDBOX_CPU_TIME", "10"))
+    memory_limit = int(os.environ.get("CODE_SANDBOX_MEMORY_LIMIT", "0"))
+    if memory_limit > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+
+    # 3. 循环接收执行请求，已加载的main函数按代码哈希缓存
+    functions: OrderedDict[str, Any] = OrderedDict()
+    write_message(stdout, {"status": "ready"})
+    while True:
+        message = read_message(stdin)
+        if message is None:
+            break
+
+        code_hash = message["code_hash"]
+        if code_hash not in functions and not message.get("code"):
+            write_message(stdout, {"status": "miss"})
+            continue
+
+        try:
+            if code_hash not in functions:
+                local_vars = {}
+                exec(marshal.loads(base64.b64decode(message["code"])), {}, local_vars)
+                functions[code_hash] = local_vars["main"]
+                if len(functions) > FUNCTION_CACHE_SIZE:
+                    functions.popitem(last=False)
+            functions.move_to_end(code_hash)
+
+            _set_cpu_limit(cpu_time)
+            body = json.dumps({"status": "ok", "result": functions[code_hash](message["params"])}, ensure_ascii=False)
+        except MemoryError:
+            body = json.dumps({"status": "error", "error": "代码执行超出内存限制"}, ensure_ascii=False)
+        except Exception as error:
+            body = json.dumps({"status": "error", "error": f"{type(error).__name__}: {error}"}, ensure_ascii=False)
+
+        body_bytes = body.encode("utf-8")
+        stdout.write(HEADER.pack(len(body_bytes)) + body_bytes)
+        stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
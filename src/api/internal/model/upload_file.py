@@ -19,7 +19,8 @@ class UploadFile(db.Model):
     __tablename__ = "upload_file"
     __table_args__ = (
         PrimaryKeyConstraint("id", name="pk_upload_file_id"),
-        Index("upload_file_account_id_idx", "account_id")
+        Index("upload_file_account_id_idx", "account_id"),
+        Index("upload_file_hash_idx", "hash"),
     )
 
     id = Column(UUID, nullable=False, server_default=text('uuid_generate_v4()'))
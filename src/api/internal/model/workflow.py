@@ -36,6 +36,7 @@ class Workflow(db.Model):
     description = Column(Text, nullable=False, server_default=text("''::text"))  # 应用描述
     graph = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))  # 运行时配置
     draft_graph = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))  # 草稿图配置
+    compiled_graph = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))  # 发布时生成的编译产物
     is_debug_passed = Column(Boolean, nullable=False, server_default=text("false"))  # 是否调试通过
     status = Column(String(255), nullable=False, server_default=text("''::character varying"))  # 工作流状态
     published_at = Column(DateTime, nullable=True)  # 发布时间
@@ -152,6 +152,7 @@ class Router:
         # 上传文件和图片
         bp.add_url_rule("/upload-files/file", methods=["POST"], view_func=self.upload_file_handler.upload_file)
         bp.add_url_rule("/upload-files/image", methods=["POST"], view_func=self.upload_file_handler.upload_image)
+        bp.add_url_rule("/static/<path:filename>", view_func=self.upload_file_handler.get_static_file)
 
         # 知识库模型
         bp.add_url_rule("/datasets", view_func=self.dataset_handler.get_datasets_with_page)
@@ -304,6 +305,14 @@ class Router:
             methods=["POST"],
             view_func=self.workflow_handler.debug_workflow,
         )
+        bp.add_url_rule(
+            "/workflows/results/<uuid:workflow_result_id>/events",
+            view_func=self.workflow_handler.stream_workflow_result,
+        )
+        bp.add_url_rule(
+            "/workflows/results/<uuid:workflow_result_id>/values/<string:value_hash>",
+            view_func=self.workflow_handler.get_workflow_result_value,
+        )
         bp.add_url_rule(
             "/workflows/<uuid:workflow_id>/publish",
             methods=["POST"],
@@ -314,6 +323,23 @@ class Router:
             methods=["POST"],
             view_func=self.workflow_handler.cancel_publish_workflow,
         )
+        bp.add_url_rule(
+            "/workflows/<uuid:workflow_id>/latency-histogram",
+            view_func=self.workflow_handler.get_workflow_latency_histogram,
+        )
+        bp.add_url_rule(
+            "/workflows/<uuid:workflow_id>/optimization-report",
+            view_func=self.workflow_handler.get_workflow_optimization_report,
+        )
+        bp.add_url_rule(
+            "/workflows/<uuid:workflow_id>/batch-runs",
+            methods=["POST"],
+            view_func=self.workflow_handler.create_workflow_batch_run,
+        )
+        bp.add_url_rule(
+            "/workflows/batch-runs/<uuid:batch_run_id>",
+            view_func=self.workflow_handler.get_workflow_batch_run,
+        )
 
         # 大语言模型模块
         bp.add_url_rule(
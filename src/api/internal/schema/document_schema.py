@@ -6,7 +6,7 @@ from wtforms import StringField
 from wtforms.fields.simple import BooleanField
 from wtforms.validators import DataRequired, AnyOf, ValidationError, Optional, Length
 
-from internal.entity.dataset_entity import ProcessType, DEFAULT_PROCESS_RULE
+from internal.entity.dataset_entity import ProcessType, DEFAULT_PROCESS_RULE, ParseMode
 from internal.lib.helper import datetime_to_timestamp
 from internal.model import Document
 from internal.schema import ListField
@@ -101,8 +101,14 @@ class CreateDocumentsReq(FlaskForm):
             if not (0 <= field.data["segment"]["chunk_overlap"] <= field.data["segment"]["chunk_size"] * 0.5):
                 raise ValidationError(f"块重叠大小在0-{int(field.data['segment']['chunk_size'] * 0.5)}")
 
-                # 14.更新并提出多余数据
+            # 14.校验解析模式parse_mode，未传递时使用轻量解析
+            parse_mode = field.data.get("parse_mode", ParseMode.FAST)
+            if parse_mode not in ParseMode.__members__.values():
+                raise ValidationError("文档解析模式格式错误")
+
+            # 15.更新并提出多余数据
             field.data = {
+                "parse_mode": parse_mode,
                 "pre_process_rules": field.data["pre_process_rules"],
                 "segment": {
                     "separators": field.data["segment"]["separators"],
@@ -2,10 +2,14 @@
 # -*- coding: utf-8 -*-
 
 from flask_wtf import FlaskForm
-from internal.entity.workflow_entity import WorkflowStatus
+from internal.entity.workflow_entity import (
+    WorkflowStatus,
+    WORKFLOW_BATCH_DEFAULT_CONCURRENCY,
+    WORKFLOW_BATCH_MAX_CONCURRENCY,
+)
 from marshmallow import Schema, fields, pre_dump
-from wtforms import StringField
-from wtforms.validators import DataRequired, Length, Regexp, URL, Optional, AnyOf
+from wtforms import StringField, IntegerField
+from wtforms.validators import DataRequired, Length, Regexp, URL, Optional, AnyOf, UUID, NumberRange
 
 from internal.core.workflow.entities.workflow_entity import WORKFLOW_CONFIG_NAME_PATTERN
 from internal.lib.helper import datetime_to_timestamp
@@ -124,3 +128,15 @@ class GetWorkflowsWithPageResp(Schema):
             "updated_at": datetime_to_timestamp(data.updated_at),
             "created_at": datetime_to_timestamp(data.created_at),
         }
+
+
+class CreateWorkflowBatchRunReq(FlaskForm):
+    """创建工作流批量运行请求"""
+    upload_file_id = StringField("upload_file_id", validators=[
+        DataRequired("输入文件id不能为空"),
+        UUID(message="输入文件id格式必须为uuid"),
+    ])
+    concurrency = IntegerField("concurrency", default=WORKFLOW_BATCH_DEFAULT_CONCURRENCY, validators=[
+        Optional(),
+        NumberRange(min=1, max=WORKFLOW_BATCH_MAX_CONCURRENCY, message="并发数范围为1-50"),
+    ])
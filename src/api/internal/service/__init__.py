@@ -26,6 +26,7 @@ from .keyword_table_service import KeywordTableService
 from .language_model_service import LanguageModelService
 from .mcp_tool_service import McpToolService
 from .openapi_service import OpenapiService
+from .parse_cache_service import ParseCacheService
 from .platform_service import PlatformService
 from .process_rule_service import ProcessRuleService
 from .retrieval_service import RetrievalService
@@ -34,6 +35,7 @@ from .upload_file_service import UploadFileService
 from .vector_db_service import VectorDatabaseService
 from .web_app_service import WebAppService
 from .wechat_service import WechatService
+from .workflow_batch_service import WorkflowBatchService
 from .workflow_service import WorkflowService
 
 __all__ = ["AppService", "VectorDatabaseService", "BuiltinToolService", "ApiToolService", "CosService",
@@ -43,4 +45,4 @@ __all__ = ["AppService", "VectorDatabaseService", "BuiltinToolService", "ApiTool
            "AIService", "ApiKeyService", "OpenapiService", "BuiltinAppService",
            "CosLocalService", "RetrievalService", "WorkflowService", "LanguageModelService",
            "FaissService", "AssistantAgentService", "AnalysisService", "WebAppService", "AudioService",
-           "PlatformService", "WechatService", "McpToolService"]
+           "PlatformService", "WechatService", "McpToolService", "ParseCacheService", "WorkflowBatchService"]
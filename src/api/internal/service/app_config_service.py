@@ -1,3 +1,4 @@
+import json
 from dataclasses import dataclass
 from typing import Any, Union
 from uuid import UUID
@@ -10,11 +11,11 @@ from internal.core.language_model.language_model_manager import LanguageModelMan
 from internal.core.tools.api_tools.entities import ToolEntity
 from internal.core.tools.api_tools.providers import ApiProviderManager
 from internal.core.tools.builtin_tools.providers import BuiltinProviderManager
-from internal.core.workflow import Workflow as WorkflowTool
-from internal.core.workflow.entities.workflow_entity import WorkflowConfig
+from internal.core.workflow import Workflow as WorkflowTool, CompiledWorkflowCache, load_workflow_config
+from internal.core.workflow.entities.node_entity import NodeType
 from internal.entity.app_entity import DEFAULT_APP_CONFIG
 from internal.entity.workflow_entity import WorkflowStatus
-from internal.lib.helper import datetime_to_timestamp, get_value_type
+from internal.lib.helper import datetime_to_timestamp, get_value_type, generate_text_hash
 from internal.model import ApiTool, Dataset, AppConfig, AppConfigVersion, App, AppDatasetJoin, Workflow, McpTool
 from pkg.sqlalchemy import SQLAlchemy
 from .base_service import BaseService
@@ -30,6 +31,7 @@ class AppConfigService(BaseService):
     api_provider_manager: ApiProviderManager
     language_model_manager: LanguageModelManager
     language_model_service: LanguageModelService
+    compiled_workflow_cache: CompiledWorkflowCache
 
     def get_draft_app_config(self, app: App) -> dict[str, Any]:
         """获取应用的草稿配置信息"""
@@ -152,15 +154,22 @@ class AppConfigService(BaseService):
         workflows = []
         for workflow_record in workflow_records:
             try:
-                workflow_tool = WorkflowTool(
-                    workflow_config=WorkflowConfig(
-                        account_id=workflow_record.account_id,
-                        name=f"wf_{workflow_record.tool_call_name}",
-                        cn_name=workflow_record.name,
-                        description=workflow_record.description,
-                        nodes=workflow_record.graph.get("nodes", []),
-                        edges=workflow_record.graph.get("edges", [])
-                    ), base_model_func=self.language_model_service.load_default_language_model_with_config)
+                # 已发布的工作流按工作流id+发布图哈希缓存编译结果，避免每次对话都重新校验、实例化节点并编译
+                workflow_tool = self.compiled_workflow_cache.get_or_create(
+                    str(workflow_record.id),
+                    self._get_workflow_graph_hash(workflow_record),
+                    self._get_workflow_dependency_ids(workflow_record),
+                    lambda record=workflow_record: WorkflowTool(
+                        workflow_config=load_workflow_config(
+                            record.graph,
+                            record.compiled_graph,
+                            account_id=record.account_id,
+                            workflow_id=record.id,
+                            name=f"wf_{record.tool_call_name}",
+                            cn_name=record.name,
+                            description=record.description,
+                        ), base_model_func=self.language_model_service.load_default_language_model_with_config),
+                )
                 workflows.append(workflow_tool)
             except Exception as e:
                 print(e)
@@ -168,6 +177,27 @@ class AppConfigService(BaseService):
 
         return workflows
 
+    @classmethod
+    def _get_workflow_graph_hash(cls, workflow_record: Workflow) -> str:
+        """计算已发布工作流的哈希，涵盖发布图以及会影响工具定义的名称、描述信息"""
+        return generate_text_hash(json.dumps({
+            "account_id": str(workflow_record.account_id),
+            "tool_call_name": workflow_record.tool_call_name,
+            "name": workflow_record.name,
+            "description": workflow_record.description,
+            "graph": workflow_record.graph,
+        }, sort_keys=True, ensure_ascii=False, default=str))
+
+    @classmethod
+    def _get_workflow_dependency_ids(cls, workflow_record: Workflow) -> set[str]:
+        """获取工作流中迭代节点引用的子工作流id集合，子工作流发布状态变化时同步失效缓存"""
+        return {
+            str(workflow_id)
+            for node in workflow_record.graph.get("nodes", [])
+            if node.get("node_type") == NodeType.ITERATION
+            for workflow_id in node.get("workflow_ids", [])
+        }
+
     def get_mcps_by_mcp_ids(self, mcp_ids: list[UUID]) -> list[dict]:
         """根据Id返回Mcp配置列表"""
         mcp_records = self.db.session.query(McpTool).filter(
@@ -1,4 +1,8 @@
+import os.path
+import tempfile
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Iterator
 
 from werkzeug.datastructures.file_storage import FileStorage
 
@@ -15,3 +19,11 @@ class CosAbcService(ABC):
     @abstractmethod
     def download_file(self, key: str, target_file_path: str):
         pass
+
+    @contextmanager
+    def open_local_file(self, key: str) -> Iterator[str]:
+        """获取对象在本地可读取的文件路径，远程存储默认下载到临时目录，退出上下文后自动清理"""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, os.path.basename(key))
+            self.download_file(key, file_path)
+            yield file_path
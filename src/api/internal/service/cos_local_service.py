@@ -1,15 +1,25 @@
 import hashlib
+import logging
 import os.path
+import re
 import shutil
+import tempfile
 import uuid
+from contextlib import contextmanager
 from dataclasses import dataclass
-from datetime import datetime
+from typing import BinaryIO, Iterator, Optional
 
 from injector import inject
 from werkzeug.datastructures.file_storage import FileStorage
+from werkzeug.security import safe_join
 
-from internal.entity.upload_file_entity import ALLOWED_IMAGE_EXTENSION, ALLOWED_DOCUMENT_EXTENSION
-from internal.exception import FailException
+from internal.entity.upload_file_entity import (
+    ALLOWED_IMAGE_EXTENSION,
+    ALLOWED_DOCUMENT_EXTENSION,
+    UPLOAD_CHUNK_SIZE,
+    CONTENT_ADDRESSED_KEY_PATTERN,
+)
+from internal.exception import FailException, NotFoundException
 from internal.model import Account, UploadFile
 from .cos_abc_service import CosAbcService
 from .upload_file_service import UploadFileService
@@ -33,47 +43,127 @@ class CosLocalService(CosAbcService):
         elif only_image and extension not in ALLOWED_IMAGE_EXTENSION:
             raise FailException(f"该.{extension}扩展的文件不允许上传，请上传正确的图片")
 
-        # 3. 生成一个随机名字
-        random_filename = str(uuid.uuid4()) + "." + extension
-        now = datetime.now()
-
-        # 4.本地存储
-        file_content = file.stream.read()
-        current_path = os.path.abspath(__file__)
-        current_path = os.path.dirname(os.path.dirname(os.path.dirname(current_path)))
-        base_file_path = f"{now.year}/{now.month:02d}/{now.day:02d}"
-        dir_path = f"{current_path}/storage/file_storage/{base_file_path}"
-        upload_filename = f"{base_file_path}/{random_filename}"
-        upload_file_path = f"{dir_path}/{random_filename}"
-
-        if not os.path.exists(dir_path):
-            os.makedirs(dir_path)
-
-        try:
-            with open(upload_file_path, "wb") as inline_file:
-                inline_file.write(file_content)
-        except Exception as e:
-            print(e)
-            raise FailException("上传文件失败，请稍等重试")
-
+        # 2. 流式写入存储并创建上传记录
+        upload_filename, size, file_hash = self._store_stream(file.stream, extension)
         return self.upload_file_service.create_upload_file(
             account_id=account_id,
             name=filename,
             key=upload_filename,
-            size=len(file_content),
+            size=size,
             extension=extension,
             mime_type=file.mimetype,
-            hash=hashlib.sha3_256(file_content).hexdigest()
+            hash=file_hash
         )
 
-    def download_file(self, key: str, target_file_path: str):
+    def create_output_file(self, filename: str, account_id: str, mime_type: str) -> UploadFile:
+        """
+        创建服务端增量写入的输出文件(如批量运行结果)并创建上传记录，输出文件使用固定的key而非按内容寻址，
+        写入过程中即可下载已写入的部分，写入结束后调用finish_output_file更新文件大小及哈希
+        """
+        extension = filename.rsplit(".", 1)[-1] if "." in filename else ""
+        upload_filename = f"outputs/{uuid.uuid4()}.{extension}"
+        file_path = self._get_storage_path(upload_filename)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        open(file_path, "wb").close()
+        return self.upload_file_service.create_upload_file(
+            account_id=account_id,
+            name=filename,
+            key=upload_filename,
+            size=0,
+            extension=extension,
+            mime_type=mime_type,
+            hash=""
+        )
 
-        current_path = os.path.abspath(__file__)
-        current_path = os.path.dirname(os.path.dirname(os.path.dirname(current_path)))
-        file_path = f"{current_path}/storage/file_storage/{key}"
+    @contextmanager
+    def open_output_file(self, upload_file: UploadFile) -> Iterator[BinaryIO]:
+        """以追加模式打开输出文件，写入的数据直接落到存储中"""
+        with open(self._get_storage_path(upload_file.key), "ab") as file:
+            yield file
+
+    def finish_output_file(self, upload_file: UploadFile) -> UploadFile:
+        """输出文件写入结束(包括中途失败)后，流式计算文件哈希并更新上传记录的大小及哈希"""
+        hasher = hashlib.sha3_256()
+        size = 0
+        with open(self._get_storage_path(upload_file.key), "rb") as file:
+            while chunk := file.read(UPLOAD_CHUNK_SIZE):
+                hasher.update(chunk)
+                size += len(chunk)
+        return self.upload_file_service.update(upload_file, size=size, hash=hasher.hexdigest())
+
+    def _store_stream(self, stream: BinaryIO, extension: str) -> tuple[str, int, str]:
+        """流式读取数据写入存储，返回按内容寻址的对象key、文件大小以及文件哈希"""
+        # 1. 流式读取数据写入临时文件，并增量计算文件哈希
+        dir_path = self._get_storage_path()
+        os.makedirs(dir_path, exist_ok=True)
+        hasher = hashlib.sha3_256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=dir_path, prefix=".upload_", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as temp_file:
+                while chunk := stream.read(UPLOAD_CHUNK_SIZE):
+                    hasher.update(chunk)
+                    temp_file.write(chunk)
+                    size += len(chunk)
+            file_hash = hasher.hexdigest()
+
+            # 2. 相同内容的文件已存在时直接复用存储对象，否则按内容寻址的路径原子重命名
+            upload_filename = self._get_reusable_key(file_hash, extension)
+            if upload_filename is None:
+                upload_filename = f"{file_hash[:2]}/{file_hash[2:4]}/{file_hash}.{extension}"
+                upload_file_path = self._get_storage_path(upload_filename)
+                os.makedirs(os.path.dirname(upload_file_path), exist_ok=True)
+                os.replace(temp_path, upload_file_path)
+        except Exception as e:
+            logging.exception("上传文件失败, 错误信息: %(error)s", {"error": e})
+            raise FailException("上传文件失败，请稍等重试")
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+        return upload_filename, size, file_hash
+
+    def download_file(self, key: str, target_file_path: str):
+        """复制本地存储的文件到指定路径"""
+        file_path = self._get_storage_path(key)
         if os.path.exists(file_path):
             shutil.copy(file_path, target_file_path)
 
+    @contextmanager
+    def open_local_file(self, key: str) -> Iterator[str]:
+        """本地存储直接返回磁盘上的文件路径，无需额外复制"""
+        file_path = self._get_storage_path(key)
+        if not os.path.exists(file_path):
+            raise FailException("该文件不存在或已被删除")
+        yield file_path
+
+    def _get_reusable_key(self, file_hash: str, extension: str) -> Optional[str]:
+        """查找哈希相同且存储对象仍存在的上传记录，返回可复用的对象key"""
+        upload_file = self.upload_file_service.get_upload_file_by_hash(file_hash, extension)
+        if upload_file is not None and os.path.exists(self._get_storage_path(upload_file.key)):
+            return upload_file.key
+        return None
+
+    def get_local_file_path(self, key: str) -> str:
+        """根据对象的key获取本地文件路径，并校验路径不会越过存储目录"""
+        file_path = safe_join(self._get_storage_path(), key)
+        if file_path is None or not os.path.isfile(file_path):
+            raise NotFoundException("该文件不存在或已被删除")
+        return file_path
+
+    @classmethod
+    def get_content_hash(cls, key: str) -> Optional[str]:
+        """按内容寻址存储的key直接携带文件哈希，其他key返回None"""
+        match = re.match(CONTENT_ADDRESSED_KEY_PATTERN, key)
+        return match.group("hash") if match else None
+
     @classmethod
     def get_file_url(cls, key: str) -> str:
         return f"{os.getenv('COS_DOMAIN')}/static/{key}"
+
+    @classmethod
+    def _get_storage_path(cls, key: str = "") -> str:
+        """根据对象的key获取本地存储的绝对路径"""
+        current_path = os.path.abspath(__file__)
+        current_path = os.path.dirname(os.path.dirname(os.path.dirname(current_path)))
+        return os.path.join(current_path, "storage", "file_storage", key)
@@ -10,6 +10,7 @@ from langchain_openai import OpenAIEmbeddings
 from redis import Redis
 
 from config import Config
+from internal.entity.cache_entity import CACHE_QUERY_EMBEDDINGS_NAMESPACE, CACHE_QUERY_EMBEDDINGS_EXPIRE_TIME
 
 
 @inject
@@ -35,17 +36,27 @@ class EmbeddingsService:
             self._embeddings = DashScopeEmbeddings(model="text-embedding-v3")
         else:
             self._embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
+        # 查询向量单独存储并设置过期时间，部分模型的查询向量与文档向量不同，不能共用文档向量缓存
         self._cache_backed_embeddings = CacheBackedEmbeddings.from_bytes_store(
             self._embeddings,
             self._store,
-            namespace="embeddings"
+            namespace="embeddings",
+            query_embedding_cache=RedisStore(
+                client=redis,
+                ttl=CACHE_QUERY_EMBEDDINGS_EXPIRE_TIME,
+                namespace=CACHE_QUERY_EMBEDDINGS_NAMESPACE,
+            ),
         )
 
+    @classmethod
+    def get_encoding(cls) -> tiktoken.Encoding:
+        """获取计算token数使用的编码器"""
+        return tiktoken.encoding_for_model("gpt-3.5")
+
     @classmethod
     def calculate_token_count(cls, query: str) -> int:
         """计算query的token数"""
-        encoding = tiktoken.encoding_for_model("gpt-3.5")
-        return len(encoding.encode(query))
+        return len(cls.get_encoding().encode(query))
 
     @property
     def store(self) -> RedisStore:
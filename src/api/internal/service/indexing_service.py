@@ -1,5 +1,4 @@
 import logging
-import re
 import uuid
 from dataclasses import dataclass
 from uuid import UUID
@@ -12,8 +11,9 @@ from sqlalchemy import func
 from weaviate.classes.query import Filter
 
 from internal.core.file_extractor import FileExtractor
+from internal.core.text_cleaner import BASE_TEXT_CLEANER
 from internal.entity.cache_entity import LOCK_DOCUMENT_UPDATE_ENABLED
-from internal.entity.dataset_entity import DocumentStatus, SegmentStatus
+from internal.entity.dataset_entity import DocumentStatus, SegmentStatus, ParseMode
 from internal.exception import NotFoundException
 from internal.lib.helper import generate_text_hash
 from internal.model import Document, Segment, KeywordTable, DatasetQuery
@@ -22,6 +22,7 @@ from .base_service import BaseService
 from .embeddings_service import EmbeddingsService
 from .jieba_service import JiebaService
 from .keyword_table_service import KeywordTableService
+from .parse_cache_service import ParseCacheService
 from .process_rule_service import ProcessRuleService
 from .vector_db_service import VectorDatabaseService
 
@@ -38,6 +39,7 @@ class IndexingService(BaseService):
     jieba_service: JiebaService
     keyword_table_service: KeywordTableService
     vector_database_service: VectorDatabaseService
+    parse_cache_service: ParseCacheService
 
     def build_documents(self, document_ids: list[UUID]) -> None:
         """根据文档Ids列表构建知识库文档，包含：加载，分割，索引构建，数据存储等内容"""
@@ -190,7 +192,13 @@ class IndexingService(BaseService):
     def _parsing(self, document: Document) -> list[LCDocument]:
         """解析文件为langchain文档列表类"""
         upload_file = document.upload_file
-        lc_documents = self.file_extractor.load(upload_file, False, True)
+        parse_mode = document.process_rule.rule.get("parse_mode", ParseMode.FAST)
+
+        # 1. 优先从解析缓存中获取，相同文件重复添加或者修改处理规则后重建时无需再次解析
+        lc_documents = self.parse_cache_service.get(upload_file, parse_mode)
+        if lc_documents is None:
+            lc_documents = self.file_extractor.load(upload_file, False, parse_mode == ParseMode.UNSTRUCTURED)
+            self.parse_cache_service.set(upload_file, parse_mode, lc_documents)
 
         # 2. 循环处理langchain文档，并删除多余的空白字符串
         for lc_document in lc_documents:
@@ -213,7 +221,7 @@ class IndexingService(BaseService):
 
         text_splitter = self.process_rule_service.get_text_splitter_by_process_rule(
             process_rule,
-            self.embeddings_service.calculate_token_count
+            self.embeddings_service.get_encoding()
         )
 
         # 2. 按照process_rule规则清除多余的字符串
@@ -346,8 +354,4 @@ class IndexingService(BaseService):
     @classmethod
     def _clean_extra_text(cls, text: str) -> str:
         """清除过滤传递的多余空白字符串"""
-        text = re.sub(r'<\|', '<', text)
-        text = re.sub(r'\|>', '>', text)
-        text = re.sub(r'[\x00-\x08\x0B\x0C\x0E-\x1F\x7F\xEF\xBF\xBE]', '', text)
-        text = re.sub('\uFFFE', '', text)  # 删除零宽非标记字符
-        return text
+        return BASE_TEXT_CLEANER.clean(text)
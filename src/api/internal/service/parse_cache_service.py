@@ -0,0 +1,89 @@
+import gzip
+import json
+import logging
+import os
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from injector import inject
+from langchain_core.documents import Document as LCDocument
+
+from config import Config
+from internal.entity.dataset_entity import FILE_EXTRACTOR_VERSION, ParseMode
+from internal.model import UploadFile
+
+
+@inject
+@dataclass
+class ParseCacheService:
+    """文档解析结果缓存服务，以上传文件hash+解析器版本+解析模式为键，将解析后的文档压缩存储在本地磁盘"""
+    conf: Config
+
+    def get(self, upload_file: UploadFile, parse_mode: str) -> Optional[list[LCDocument]]:
+        """根据上传文件获取缓存的解析结果，未命中时返回None"""
+        cache_path = self._get_cache_path(upload_file, parse_mode)
+        if cache_path is None or not os.path.exists(cache_path):
+            return None
+
+        try:
+            with gzip.open(cache_path, "rt", encoding="utf-8") as file:
+                data = json.load(file)
+            return [
+                LCDocument(page_content=item["page_content"], metadata=item["metadata"])
+                for item in data["documents"]
+            ]
+        except Exception as e:
+            logging.warning("读取文档解析缓存失败，缓存路径: %(path)s, 错误信息: %(error)s", {
+                "path": cache_path,
+                "error": e,
+            })
+            return None
+
+    def set(self, upload_file: UploadFile, parse_mode: str, lc_documents: list[LCDocument]) -> None:
+        """将解析结果写入缓存，先写入临时文件再原子替换，避免并发读取到不完整的数据"""
+        cache_path = self._get_cache_path(upload_file, parse_mode)
+        if cache_path is None:
+            return
+
+        os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+        temp_path = f"{cache_path}.{uuid.uuid4().hex}.tmp"
+        try:
+            with gzip.open(temp_path, "wt", encoding="utf-8") as file:
+                json.dump({
+                    "hash": upload_file.hash,
+                    "extension": upload_file.extension,
+                    "version": FILE_EXTRACTOR_VERSION,
+                    "parse_mode": ParseMode(parse_mode).value,
+                    "documents": [
+                        {"page_content": lc_document.page_content, "metadata": lc_document.metadata}
+                        for lc_document in lc_documents
+                    ],
+                }, file, ensure_ascii=False, default=str)
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            logging.warning("写入文档解析缓存失败，缓存路径: %(path)s, 错误信息: %(error)s", {
+                "path": cache_path,
+                "error": e,
+            })
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _get_cache_path(self, upload_file: UploadFile, parse_mode: str) -> Optional[str]:
+        """获取缓存文件路径，历史上传文件没有hash时不使用缓存"""
+        file_hash = upload_file.hash
+        if not file_hash:
+            return None
+
+        return os.path.join(
+            self._get_cache_dir(),
+            file_hash[:2],
+            f"{file_hash}_{upload_file.extension.lower()}_v{FILE_EXTRACTOR_VERSION}_{ParseMode(parse_mode).value}.json.gz",
+        )
+
+    def _get_cache_dir(self) -> str:
+        """读取解析缓存目录，未配置时写入项目下的storage/parse_cache，不依赖进程的工作目录"""
+        if self.conf.PARSE_CACHE_DIR:
+            return self.conf.PARSE_CACHE_DIR
+        current_path = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        return os.path.join(current_path, "storage", "parse_cache")
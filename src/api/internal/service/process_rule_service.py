@@ -1,10 +1,11 @@
-import re
 from dataclasses import dataclass
-from typing import Callable
 
+import tiktoken
 from injector import inject
-from langchain_text_splitters import TextSplitter, RecursiveCharacterTextSplitter
+from langchain_text_splitters import TextSplitter
 
+from internal.core.text_cleaner import get_text_cleaner
+from internal.core.text_splitter import TokenOffsetTextSplitter
 from internal.model import ProcessRule
 
 
@@ -16,34 +17,19 @@ class ProcessRuleService:
     @classmethod
     def get_text_splitter_by_process_rule(cls,
                                           process_rule: ProcessRule,
-                                          length_function: Callable[[str], int] = len,
+                                          encoding: tiktoken.Encoding,
                                           **kwargs) -> TextSplitter:
-        """根据传递的处理规则+长度计算函数，获取相应文本分割器"""
-        return RecursiveCharacterTextSplitter(
+        """根据传递的处理规则+token编码器，获取相应文本分割器，每个文档只编码一次并按token偏移分割"""
+        return TokenOffsetTextSplitter(
+            encoding=encoding,
             chunk_size=process_rule.rule["segment"]["chunk_size"],
             chunk_overlap=process_rule.rule["segment"]["chunk_overlap"],
             separators=process_rule.rule["segment"]["separators"],
             is_separator_regex=True,
-            length_function=length_function,
             **kwargs
         )
 
     @classmethod
     def clean_text_process_rule(cls, text: str, process_rule: ProcessRule) -> str:
-        """根据传递的处理规则清除多余的字符串"""
-        # 1.循环遍历所有与处理规则
-        for pre_process_rule in process_rule.rule["pre_process_rules"]:
-            # 2.删除多余空格
-            if pre_process_rule["id"] == "remove_extra_space" and pre_process_rule["enabled"] is True:
-                pattern = r'\n{3,}'
-                text = re.sub(pattern, '\n\n', text)
-                pattern = r'[\t\f\r\x20\u00a0\u1680\u180e\u2000-\u200a\u202f\u205f\u3000]{2,}'
-                text = re.sub(pattern, ' ', text)
-            # 3.删除多余的URL链接及邮箱
-            if pre_process_rule["id"] == "remove_url_and_email" and pre_process_rule["enabled"] is True:
-                pattern = r'([a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+)'
-                text = re.sub(pattern, '', text)
-                pattern = r'https?://[^\s]+'
-                text = re.sub(pattern, '', text)
-
-        return text
+        """根据传递的处理规则清除多余的字符串，相同的预处理规则只编译一次清洗处理链"""
+        return get_text_cleaner(process_rule.rule["pre_process_rules"]).clean(text)
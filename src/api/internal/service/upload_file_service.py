@@ -1,4 +1,5 @@
 from dataclasses import dataclass
+from typing import Optional
 
 from injector import inject
 
@@ -15,3 +16,10 @@ class UploadFileService(BaseService):
 
     def create_upload_file(self, **kwargs) -> UploadFile:
         return self.create(UploadFile, **kwargs)
+
+    def get_upload_file_by_hash(self, hash: str, extension: str) -> Optional[UploadFile]:
+        """根据文件哈希+扩展名获取已上传的文件记录，用于复用相同内容的存储对象"""
+        return self.db.session.query(UploadFile).filter(
+            UploadFile.hash == hash,
+            UploadFile.extension == extension,
+        ).first()
@@ -0,0 +1,302 @@
+import asyncio
+import csv
+import json
+import logging
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, Iterator
+from uuid import UUID
+
+from injector import inject
+from redis import Redis
+
+from internal.core.workflow import Workflow as WorkflowTool, load_workflow_config
+from internal.entity.cache_entity import CACHE_WORKFLOW_BATCH_RUN
+from internal.entity.workflow_entity import (
+    WorkflowStatus,
+    WorkflowBatchRunStatus,
+    WORKFLOW_BATCH_ALLOWED_EXTENSION,
+    WORKFLOW_BATCH_DEFAULT_CONCURRENCY,
+    WORKFLOW_BATCH_PROGRESS_INTERVAL,
+    WORKFLOW_BATCH_RUN_EXPIRE_TIME,
+)
+from internal.exception import NotFoundException, FailException
+from internal.model import Account, Workflow, UploadFile
+from internal.schema.workflow_schema import CreateWorkflowBatchRunReq
+from internal.task.workflow_task import run_workflow_batch
+from pkg.sqlalchemy import SQLAlchemy
+from .base_service import BaseService
+from .cos_local_service import CosLocalService
+from .language_model_service import LanguageModelService
+
+
+@inject
+@dataclass
+class WorkflowBatchService(BaseService):
+    """工作流批量运行服务"""
+    db: SQLAlchemy
+    redis_client: Redis
+    cos_service: CosLocalService
+    language_model_service: LanguageModelService
+
+    def create_batch_run(self, workflow_id: UUID, req: CreateWorkflowBatchRunReq, account: Account) -> dict[str, Any]:
+        """根据上传的jsonl/csv输入文件创建批量运行任务"""
+        # 1. 校验工作流是否存在并已发布，批量运行使用发布后的配置
+        workflow = self.get(Workflow, workflow_id)
+        if not workflow or workflow.account_id != account.id:
+            raise NotFoundException("该工作流不存在，请核实后重试")
+        if workflow.status != WorkflowStatus.PUBLISHED:
+            raise FailException("该工作流未发布，请发布后再批量运行")
+
+        # 2. 校验输入文件权限及类型
+        upload_file = self.get(UploadFile, req.upload_file_id.data)
+        if not upload_file or upload_file.account_id != account.id:
+            raise NotFoundException("输入文件不存在，请核实后重试")
+        if upload_file.extension.lower() not in WORKFLOW_BATCH_ALLOWED_EXTENSION:
+            raise FailException("批量运行仅支持jsonl/csv格式的输入文件")
+
+        # 3. 记录批量运行信息并调用异步任务
+        batch_run_id = str(uuid.uuid4())
+        batch_run = {
+            "id": batch_run_id,
+            "account_id": str(account.id),
+            "workflow_id": str(workflow.id),
+            "upload_file_id": str(upload_file.id),
+            "concurrency": req.concurrency.data or WORKFLOW_BATCH_DEFAULT_CONCURRENCY,
+            "status": WorkflowBatchRunStatus.WAITING.value,
+            "processed": 0,
+            "succeeded": 0,
+            "failed": 0,
+            "output_upload_file_id": "",
+            "error": "",
+            "started_at": 0,
+            "finished_at": 0,
+            "created_at": int(time.time()),
+        }
+        self._save_batch_run(batch_run_id, batch_run)
+        run_workflow_batch.delay(batch_run_id)
+
+        return self._format_batch_run(batch_run)
+
+    def get_batch_run(self, batch_run_id: UUID, account: Account) -> dict[str, Any]:
+        """获取批量运行的进度及吞吐量，运行完成后返回结果文件下载地址"""
+        batch_run = self._get_batch_run(str(batch_run_id))
+        if not batch_run or batch_run["account_id"] != str(account.id):
+            raise NotFoundException("该批量运行任务不存在或已过期")
+        return self._format_batch_run(batch_run)
+
+    def run_batch(self, batch_run_id: str):
+        """执行批量运行任务，逐行运行工作流并将每行的结果增量追加到存储中的jsonl结果文件，运行失败时保留已写入的部分结果"""
+        # 1. 获取批量运行信息
+        batch_run = self._get_batch_run(batch_run_id)
+        if not batch_run or batch_run["status"] != WorkflowBatchRunStatus.WAITING:
+            return
+        self._save_batch_run(batch_run_id, {
+            "status": WorkflowBatchRunStatus.RUNNING.value,
+            "started_at": int(time.time()),
+        })
+
+        output_upload_file = None
+        try:
+            # 2. 使用发布后的配置构建工作流，所有输入行复用同一个编译后的工作流
+            workflow = self.get(Workflow, batch_run["workflow_id"])
+            upload_file = self.get(UploadFile, batch_run["upload_file_id"])
+            if not workflow or workflow.status != WorkflowStatus.PUBLISHED or not upload_file:
+                raise FailException("工作流未发布或输入文件不存在")
+            workflow_tool = WorkflowTool(
+                workflow_config=load_workflow_config(
+                    workflow.graph,
+                    workflow.compiled_graph,
+                    account_id=workflow.account_id,
+                    workflow_id=workflow.id,
+                    name=f"wf_{workflow.tool_call_name}",
+                    cn_name=workflow.name,
+                    description=workflow.description,
+                ),
+                base_model_func=self.language_model_service.load_default_language_model_with_config,
+            )
+
+            # 3. 在存储中创建结果文件并记录到批量运行信息上，运行过程中即可下载已完成的部分结果
+            output_upload_file = self.cos_service.create_output_file(
+                f"{workflow.tool_call_name}_{batch_run_id[:8]}_result.jsonl",
+                batch_run["account_id"],
+                "application/jsonl",
+            )
+            self._save_batch_run(batch_run_id, {"output_upload_file_id": str(output_upload_file.id)})
+
+            # 4. 流式读取输入文件并运行，结果追加写入存储中的结果文件
+            with self.cos_service.open_local_file(upload_file.key) as input_path, \
+                    self.cos_service.open_output_file(output_upload_file) as output_file:
+                rows = self._iter_input_rows(input_path, upload_file.extension.lower())
+                asyncio.run(self._arun_rows(batch_run_id, workflow_tool, rows, output_file, int(batch_run["concurrency"])))
+
+            # 5. 更新运行状态
+            self._save_batch_run(batch_run_id, {
+                "status": WorkflowBatchRunStatus.SUCCEEDED.value,
+                "finished_at": int(time.time()),
+            })
+        except Exception as error:
+            logging.exception("工作流批量运行失败, 错误信息: %(error)s", {"error": error})
+            self._save_batch_run(batch_run_id, {
+                "status": WorkflowBatchRunStatus.FAILED.value,
+                "error": str(error),
+                "finished_at": int(time.time()),
+            })
+        finally:
+            # 6. 无论运行成功与否都保留已写入的结果，并更新结果文件的大小及哈希
+            if output_upload_file is not None:
+                try:
+                    self.cos_service.finish_output_file(output_upload_file)
+                except Exception as error:
+                    logging.exception("更新批量运行结果文件失败, 错误信息: %(error)s", {"error": error})
+
+    async def _arun_rows(
+            self,
+            batch_run_id: str,
+            workflow_tool: WorkflowTool,
+            rows: Iterator[tuple[Any, str]],
+            output_file: Any,
+            concurrency: int,
+    ):
+        """
+        按最大并发数运行所有输入行，运行中的任务数达到上限时才继续读取输入，避免一次性加载全部数据，
+        每次上报进度时刷新结果文件，保证已上报的行结果都已写入存储
+        """
+        progress = {"processed": 0, "succeeded": 0, "failed": 0}
+        reported_at = time.monotonic()
+        pending: set[asyncio.Task] = set()
+
+        def handle_results(results: list[dict[str, Any]]):
+            nonlocal reported_at
+            for result in results:
+                output_file.write((json.dumps(result, ensure_ascii=False, default=str) + "\n").encode("utf-8"))
+                progress["processed"] += 1
+                progress["succeeded" if result["status"] == "succeeded" else "failed"] += 1
+            if time.monotonic() - reported_at >= WORKFLOW_BATCH_PROGRESS_INTERVAL:
+                output_file.flush()
+                self._save_batch_run(batch_run_id, progress)
+                reported_at = time.monotonic()
+
+        try:
+            for index, (row, error) in enumerate(rows):
+                # 无法解析的输入行直接记录为失败结果，不影响其他行的运行
+                if error:
+                    handle_results([{
+                        "index": index,
+                        "status": "failed",
+                        "inputs": row,
+                        "outputs": {},
+                        "error": error,
+                        "latency": 0,
+                    }])
+                    continue
+                if len(pending) >= concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    handle_results([task.result() for task in done])
+                pending.add(asyncio.create_task(self._arun_row(workflow_tool, index, row)))
+        finally:
+            # 读取输入出错时也等待已提交的行运行完成并写入结果，再向上抛出异常
+            if pending:
+                done, _ = await asyncio.wait(pending)
+                handle_results([task.result() for task in done])
+            output_file.flush()
+            self._save_batch_run(batch_run_id, progress)
+
+    @classmethod
+    async def _arun_row(cls, workflow_tool: WorkflowTool, index: int, row: dict[str, Any]) -> dict[str, Any]:
+        """运行单行输入，单行出错不影响其他行"""
+        start_at = time.perf_counter()
+        try:
+            outputs = await workflow_tool.ainvoke(row)
+            return {
+                "index": index,
+                "status": "succeeded",
+                "inputs": row,
+                "outputs": outputs,
+                "error": "",
+                "latency": time.perf_counter() - start_at,
+            }
+        except Exception as error:
+            return {
+                "index": index,
+                "status": "failed",
+                "inputs": row,
+                "outputs": {},
+                "error": str(error),
+                "latency": time.perf_counter() - start_at,
+            }
+
+    @classmethod
+    def _iter_input_rows(cls, file_path: str, extension: str) -> Iterator[tuple[Any, str]]:
+        """
+        逐行读取输入文件，jsonl每行为一个输入对象，csv首行为输入变量名，
+        返回(输入对象, 错误信息)，无法解析的jsonl行返回(原始行, 错误信息)，由调用方记录为失败结果
+        """
+        with open(file_path, "r", encoding="utf-8-sig", newline="") as file:
+            if extension == "csv":
+                for row in csv.DictReader(file):
+                    yield {key: value for key, value in row.items() if key}, ""
+            else:
+                for line in file:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        row = json.loads(line)
+                    except json.JSONDecodeError as error:
+                        yield line, f"jsonl输入行解析失败: {error}"
+                        continue
+                    if not isinstance(row, dict):
+                        yield line, "jsonl输入文件每行必须为一个json对象"
+                        continue
+                    yield row, ""
+
+    def _get_batch_run(self, batch_run_id: str) -> dict[str, Any]:
+        cache_key = CACHE_WORKFLOW_BATCH_RUN.format(batch_run_id=batch_run_id)
+        return {
+            key.decode("utf-8"): value.decode("utf-8")
+            for key, value in self.redis_client.hgetall(cache_key).items()
+        }
+
+    def _save_batch_run(self, batch_run_id: str, fields: dict[str, Any]):
+        cache_key = CACHE_WORKFLOW_BATCH_RUN.format(batch_run_id=batch_run_id)
+        pipeline = self.redis_client.pipeline()
+        pipeline.hset(cache_key, mapping=fields)
+        pipeline.expire(cache_key, WORKFLOW_BATCH_RUN_EXPIRE_TIME)
+        pipeline.execute()
+
+    def _format_batch_run(self, batch_run: dict[str, Any]) -> dict[str, Any]:
+        """格式化批量运行信息，并计算运行耗时及吞吐量"""
+        processed = int(batch_run["processed"])
+        started_at = int(batch_run["started_at"])
+        finished_at = int(batch_run["finished_at"])
+        elapsed = ((finished_at or int(time.time())) - started_at) if started_at else 0
+
+        output_file = {}
+        if batch_run["output_upload_file_id"]:
+            upload_file = self.get(UploadFile, batch_run["output_upload_file_id"])
+            if upload_file:
+                output_file = {
+                    "id": upload_file.id,
+                    "name": upload_file.name,
+                    "url": self.cos_service.get_file_url(upload_file.key),
+                }
+
+        return {
+            "id": batch_run["id"],
+            "workflow_id": batch_run["workflow_id"],
+            "upload_file_id": batch_run["upload_file_id"],
+            "concurrency": int(batch_run["concurrency"]),
+            "status": batch_run["status"],
+            "processed": processed,
+            "succeeded": int(batch_run["succeeded"]),
+            "failed": int(batch_run["failed"]),
+            "elapsed": elapsed,
+            "throughput": round(processed / elapsed, 2) if elapsed > 0 else 0,
+            "output_file": output_file,
+            "error": batch_run["error"],
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "created_at": int(batch_run["created_at"]),
+        }
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import queue
@@ -12,13 +13,25 @@ from uuid import UUID
 from asgiref.sync import async_to_sync
 from flask import request, current_app, Flask
 from injector import inject
+from redis import Redis
 from sqlalchemy import desc
 
 from internal.core.tools.builtin_tools.providers import BuiltinProviderManager
-from internal.core.workflow import Workflow as WorkflowTool
+from internal.core.workflow import (
+    Workflow as WorkflowTool,
+    CompiledWorkflowCache,
+    compile_workflow_graph,
+    optimize_workflow_config,
+)
 from internal.core.workflow.entities.edge_entity import BaseEdgeData
 from internal.core.workflow.entities.node_entity import NodeType, BaseNodeData
-from internal.core.workflow.entities.workflow_entity import WorkflowConfig
+from internal.core.workflow.entities.workflow_entity import WorkflowConfig, WORKFLOW_TOKEN_EVENT_KEY
+from internal.core.workflow.tracing import get_latency_histogram
+from internal.core.workflow.utils.state_serializer import (
+    serialize_node_result,
+    load_state_value,
+    collect_state_value_refs,
+)
 from internal.core.workflow.nodes import (
     CodeNodeData,
     DatasetRetrievalNodeData,
@@ -29,12 +42,20 @@ from internal.core.workflow.nodes import (
     TemplateTransformNodeData,
     ToolNodeData, QuestionClassifierNodeData, IterationNodeData, ToolLLMNodeData
 )
+from internal.entity.cache_entity import CACHE_WORKFLOW_RESULT_EVENTS
 from internal.entity.workflow_entity import DEFAULT_WORKFLOW_CONFIG, WorkflowStatus, WorkflowResultStatus
+from internal.entity.workflow_entity import (
+    WorkflowRunMode,
+    WORKFLOW_RESULT_EVENTS_MAXLEN,
+    WORKFLOW_RESULT_EVENTS_EXPIRE_TIME,
+    WORKFLOW_RESULT_STREAM_IDLE_TIMEOUT,
+)
 from internal.entity.workflow_entity import WorkflowDebugGeneratorItemInfo
 from internal.exception import ValidateErrorException, NotFoundException, ForbiddenException, FailException
 from internal.lib.helper import convert_model_to_dict
 from internal.model import Account, Workflow, Dataset, ApiTool, WorkflowResult, McpTool
 from internal.schema.workflow_schema import CreateWorkflowReq, GetWorkflowsWithPageReq
+from internal.task.workflow_task import run_workflow
 from pkg.paginator import Paginator
 from pkg.sqlalchemy import SQLAlchemy
 from .base_service import BaseService
@@ -46,8 +67,10 @@ from .language_model_service import LanguageModelService
 class WorkflowService(BaseService):
     """工作流服务"""
     db: SQLAlchemy
+    redis_client: Redis
     builtin_provider_manager: BuiltinProviderManager
     language_model_service: LanguageModelService
+    compiled_workflow_cache: CompiledWorkflowCache
 
     def create_workflow(self, req: CreateWorkflowReq, account: Account):
         """创建工作流"""
@@ -82,6 +105,7 @@ class WorkflowService(BaseService):
         workflow = self.get_workflow(workflow_id, account)
 
         self.delete(workflow)
+        self.compiled_workflow_cache.invalidate(str(workflow.id))
 
         return workflow
 
@@ -384,12 +408,28 @@ class WorkflowService(BaseService):
     def debug_workflow(self, workflow_id: UUID, inputs: dict[str, Any], account: Account) -> Generator:
         """调试工作流API接口，流式事件输出"""
         workflow_info = self.get_workflow(workflow_id, account)
+
+        # 1. 后台运行模式下将工作流投递到Celery中运行，并从Redis中订阅运行事件
+        if current_app.config.get("WORKFLOW_RUN_MODE") == WorkflowRunMode.CELERY:
+            workflow_result = self.create(WorkflowResult, **{
+                "app_id": None,
+                "account_id": account.id,
+                "workflow_id": workflow_info.id,
+                "graph": workflow_info.draft_graph,
+                "state": [],
+                "latency": 0,
+                "status": WorkflowResultStatus.RUNNING
+            })
+            run_workflow.delay(workflow_result.id, inputs)
+            return self.stream_workflow_result(workflow_result.id, account)
+
         _queue = Queue()
 
         async def handle_stream(workflow: Workflow, arg_inputs: dict[str, Any], account_id: UUID, flask_app: Flask):
             with flask_app.app_context():
                 workflow_tool = WorkflowTool(workflow_config=WorkflowConfig(
                     account_id=account_id,
+                    workflow_id=workflow.id,
                     name=workflow.tool_call_name,
                     description=workflow.description,
                     nodes=workflow.draft_graph.get("nodes", []),
@@ -399,7 +439,14 @@ class WorkflowService(BaseService):
                 node_results = []
                 # 5. 调用stream服务获取工具信息
                 try:
-                    async for chunk in workflow_tool.astream(arg_inputs):
+                    async for chunk in workflow_tool.astream(arg_inputs, stream_tokens=True):
+                        # 4. 大模型类节点的增量token事件直接转发，不记录到运行结果中
+                        if WORKFLOW_TOKEN_EVENT_KEY in chunk:
+                            token_data = chunk[WORKFLOW_TOKEN_EVENT_KEY].model_dump(mode="json")
+                            _queue.put(WorkflowDebugGeneratorItemInfo(
+                                "running", f"event: workflow_token\ndata:{json.dumps(token_data)}\n\n"
+                            ))
+                            continue
                         # 5. chunk的格式为:{"node_name":WorkflowState}，所以需要节点响应结构的第1个key
                         first_key = next(iter(chunk))
                         # 6. 取出名节点的运行结果
@@ -407,7 +454,7 @@ class WorkflowService(BaseService):
                         if len(chunk[first_key]["node_results"]) == 0:
                             continue
                         node_result = chunk[first_key]["node_results"][0]
-                        node_result_dict = convert_model_to_dict(node_result)
+                        node_result_dict = serialize_node_result(node_result)
                         node_results.append(node_result_dict)
                         # 7. 组装响应数据并流式事件输出
                         data = {
@@ -471,6 +518,123 @@ class WorkflowService(BaseService):
         thread.start()
         return listen_stream()
 
+    def run_workflow_result(self, workflow_result_id: UUID, inputs: dict[str, Any]):
+        """在Celery工作进程中运行工作流，每个节点运行完成后持久化运行结果并发布运行事件"""
+        # 1. 获取运行记录，只处理运行中的记录，避免任务重复投递时重复运行
+        workflow_result = self.get(WorkflowResult, workflow_result_id)
+        if not workflow_result or workflow_result.status != WorkflowResultStatus.RUNNING:
+            return
+        workflow_info = self.get(Workflow, workflow_result.workflow_id)
+
+        # 2. 使用运行记录中的图配置构建工作流
+        node_results = []
+        start_at = time.perf_counter()
+
+        async def handle_stream(workflow_tool: WorkflowTool):
+            async for chunk in workflow_tool.astream(inputs, stream_tokens=True):
+                # 3. 大模型类节点的增量token事件只发布到事件流中，不持久化
+                if WORKFLOW_TOKEN_EVENT_KEY in chunk:
+                    self._publish_workflow_event(
+                        workflow_result.id, "workflow_token", chunk[WORKFLOW_TOKEN_EVENT_KEY].model_dump(mode="json")
+                    )
+                    continue
+
+                # 4. chunk的格式为:{"node_name":WorkflowState}，虚拟节点没有运行结果则跳过
+                first_key = next(iter(chunk))
+                if len(chunk[first_key]["node_results"]) == 0:
+                    continue
+                node_result_dict = serialize_node_result(chunk[first_key]["node_results"][0])
+                node_results.append(node_result_dict)
+
+                # 5. 增量持久化节点运行结果并发布运行事件
+                self.update(workflow_result, state=[*node_results])
+                self._publish_workflow_event(workflow_result.id, "workflow", {"id": str(uuid.uuid4()), **node_result_dict})
+
+        try:
+            workflow_tool = WorkflowTool(workflow_config=WorkflowConfig(
+                account_id=workflow_result.account_id,
+                workflow_id=workflow_result.workflow_id,
+                name=workflow_info.tool_call_name,
+                description=workflow_info.description,
+                nodes=workflow_result.graph.get("nodes", []),
+                edges=workflow_result.graph.get("edges", [])
+            ), base_model_func=self.language_model_service.load_default_language_model_with_config)
+            asyncio.run(handle_stream(workflow_tool))
+            status = WorkflowResultStatus.SUCCEEDED
+        except Exception as e:
+            logging.exception("后台运行工作流发生错误, 错误信息: %(error)s", {"error": e})
+            status = WorkflowResultStatus.FAILED
+
+        # 6. 运行结束后更新运行状态，调试运行成功时标记工作流调试通过
+        self.update(workflow_result, **{
+            "status": status,
+            "state": node_results,
+            "latency": (time.perf_counter() - start_at)
+        })
+        if status == WorkflowResultStatus.SUCCEEDED and workflow_result.app_id is None:
+            self.update(workflow_info, is_debug_passed=True)
+        self._publish_workflow_event(workflow_result.id, "end", {"status": status.value})
+
+    def stream_workflow_result(self, workflow_result_id: UUID, account: Account, last_event_id: str = "") -> Generator:
+        """订阅工作流后台运行事件，支持通过最后接收的事件id断线续传，任意API实例均可订阅"""
+        workflow_result = self.get(WorkflowResult, workflow_result_id)
+        if not workflow_result or workflow_result.account_id != account.id:
+            raise NotFoundException("该工作流运行记录不存在，请核实后重试")
+
+        cache_key = CACHE_WORKFLOW_RESULT_EVENTS.format(workflow_result_id=workflow_result_id)
+
+        def listen_stream() -> Generator:
+            last_id = last_event_id or "0"
+            idle_at = time.monotonic()
+            while True:
+                # 1. 阻塞读取新的运行事件
+                response = self.redis_client.xread({cache_key: last_id}, count=100, block=1000)
+                if not response:
+                    # 2. 事件流已过期且运行已结束时，直接使用数据库中持久化的结果
+                    self.db.session.refresh(workflow_result)
+                    if workflow_result.status != WorkflowResultStatus.RUNNING and not self.redis_client.exists(cache_key):
+                        if last_id == "0":
+                            for node_result in workflow_result.state or []:
+                                yield f"event: workflow\ndata:{json.dumps({'id': str(uuid.uuid4()), **node_result})}\n\n"
+                        break
+                    if time.monotonic() - idle_at > WORKFLOW_RESULT_STREAM_IDLE_TIMEOUT:
+                        break
+                    continue
+
+                # 3. 转发运行事件，收到结束事件后结束订阅
+                idle_at = time.monotonic()
+                for _, events in response:
+                    for event_id, fields in events:
+                        last_id = event_id.decode("utf-8")
+                        event = fields[b"event"].decode("utf-8")
+                        if event == "end":
+                            return
+                        yield f"id: {last_id}\nevent: {event}\ndata:{fields[b'data'].decode('utf-8')}\n\n"
+
+        return listen_stream()
+
+    def get_workflow_result_value(self, workflow_result_id: UUID, value_hash: str, account: Account) -> Any:
+        """获取运行结果中单独存储的节点输入/输出，只允许读取该运行结果引用的数据"""
+        workflow_result = self.get(WorkflowResult, workflow_result_id)
+        if not workflow_result or workflow_result.account_id != account.id:
+            raise NotFoundException("该工作流运行记录不存在，请核实后重试")
+        if value_hash not in collect_state_value_refs(workflow_result.state):
+            raise NotFoundException("该节点数据不存在或已被清理")
+        return load_state_value(value_hash)
+
+    def _publish_workflow_event(self, workflow_result_id: UUID, event: str, data: dict[str, Any]):
+        """将工作流运行事件追加到Redis事件流中"""
+        cache_key = CACHE_WORKFLOW_RESULT_EVENTS.format(workflow_result_id=workflow_result_id)
+        pipeline = self.redis_client.pipeline()
+        pipeline.xadd(
+            cache_key,
+            {"event": event, "data": json.dumps(data, ensure_ascii=False)},
+            maxlen=WORKFLOW_RESULT_EVENTS_MAXLEN,
+            approximate=True,
+        )
+        pipeline.expire(cache_key, WORKFLOW_RESULT_EVENTS_EXPIRE_TIME)
+        pipeline.execute()
+
     def publish_workflow(self, workflow_id: UUID, account: Account) -> Workflow:
         """发布指定的工作流"""
         # 1. 获取工作流
@@ -482,7 +646,7 @@ class WorkflowService(BaseService):
 
         # 3. 使用workflowconfig二次校验，如果校验失败则不发布
         try:
-            WorkflowConfig(
+            workflow_config = WorkflowConfig(
                 account_id=account.id,
                 name=workflow.tool_call_name,
                 description=workflow.description,
@@ -495,13 +659,20 @@ class WorkflowService(BaseService):
             })
             raise ValidateErrorException("工作流配置校验失败，请核实后重试")
 
-        # 4. 更新工作流发布状态
+        # 4. 静态优化工作流配置，剔除无用节点并常量折叠模板转换节点
+        optimized_config, optimization = optimize_workflow_config(workflow_config)
+
+        # 5. 更新工作流发布状态，并存储编译产物，运行时直接加载产物跳过图结构校验
         self.update(workflow, **{
             "graph": workflow.draft_graph,
+            "compiled_graph": compile_workflow_graph(optimized_config, workflow.draft_graph, optimization),
             "status": WorkflowStatus.PUBLISHED,
             "is_debug_passed": False
         })
 
+        # 6. 清除当前进程中该工作流及引用它的工作流的编译缓存
+        self.compiled_workflow_cache.invalidate(str(workflow.id))
+
         return workflow
 
     def cancel_publish_workflow(self, workflow_id: UUID, account: Account) -> Workflow:
@@ -513,12 +684,26 @@ class WorkflowService(BaseService):
 
         self.update(workflow, **{
             "graph": {},
+            "compiled_graph": {},
             "status": WorkflowStatus.DRAFT,
             "is_debug_passed": False
         })
+        self.compiled_workflow_cache.invalidate(str(workflow.id))
 
         return workflow
 
+    def get_workflow_latency_histogram(self, workflow_id: UUID, account: Account) -> dict[str, Any]:
+        """获取工作流及各节点的运行延迟直方图，需要开启工作流运行追踪后才会记录"""
+        workflow = self.get_workflow(workflow_id, account)
+        return get_latency_histogram(str(workflow.id))
+
+    def get_workflow_optimization_report(self, workflow_id: UUID, account: Account) -> dict[str, Any]:
+        """获取已发布工作流的静态优化报告，涵盖剔除/折叠的节点、重连的边以及并行分组"""
+        workflow = self.get_workflow(workflow_id, account)
+        if workflow.status != WorkflowStatus.PUBLISHED:
+            raise FailException("该工作流未发布，暂无优化报告")
+        return (workflow.compiled_graph or {}).get("optimization", {})
+
     def _validate_graph(self, workflow_id: UUID, graph: dict[str, Any], account: Account) -> dict[str, Any]:
         """校验传递的graph信息，涵盖nodes和edges对应的数据，该函数使用相对宽松的校验方式，并且因为是草稿，不需要校验节点与边的关系"""
         # 1.提取nodes和edges数据
@@ -0,0 +1,25 @@
+from uuid import UUID
+
+from celery import shared_task
+
+from internal.entity.workflow_entity import WORKFLOW_CELERY_QUEUE
+
+
+@shared_task(queue=WORKFLOW_CELERY_QUEUE)
+def run_workflow_batch(batch_run_id: str) -> None:
+    """根据批量运行id，批量运行工作流"""
+    from app.http.module import injector
+    from internal.service.workflow_batch_service import WorkflowBatchService
+
+    workflow_batch_service = injector.get(WorkflowBatchService)
+    workflow_batch_service.run_batch(batch_run_id)
+
+
+@shared_task(queue=WORKFLOW_CELERY_QUEUE)
+def run_workflow(workflow_result_id: UUID, inputs: dict) -> None:
+    """根据工作流运行结果id，在后台运行工作流并持久化每个节点的运行结果"""
+    from app.http.module import injector
+    from internal.service.workflow_service import WorkflowService
+
+    workflow_service = injector.get(WorkflowService)
+    workflow_service.run_workflow_result(workflow_result_id, inputs)
@@ -0,0 +1,109 @@
+import pytest
+import tiktoken
+from langchain_text_splitters import RecursiveCharacterTextSplitter
+
+from internal.core.text_splitter import TokenOffsetTextSplitter
+from internal.entity.dataset_entity import DEFAULT_PROCESS_RULE
+
+# 默认处理规则中的分隔符
+SEPARATORS = DEFAULT_PROCESS_RULE["rule"]["segment"]["separators"]
+
+# 文本块重新编码时，跨越切分位置的token可能被拆成多个，允许超出chunk_size的token数
+TOKEN_BOUNDARY_TOLERANCE = 2
+
+# 有分隔符的语料中，两个分割器结果完全相同的文本块最低占比，
+# 分隔符附近的token被单独编码时会被拆开，RecursiveCharacterTextSplitter会高估长度，少数文本块的切分位置会不同
+MIN_SAME_CHUNK_RATIO = 0.7
+
+# 具有代表性的语料：中文、英文、markdown(含表格及代码块)
+CORPUS = {
+    "chinese": (
+        "LLMOps平台用于快速构建、调试与发布基于大语言模型的应用。平台支持知识库、插件、工作流等能力，"
+        "用户可以在可视化编排界面中拖拽节点，组合出满足业务需求的智能体。\n\n"
+        "知识库会将上传的文档解析为纯文本，经过清洗后按照分隔符递归分割为多个片段！每个片段都会计算向量并写入向量数据库？"
+        "检索时先召回相关片段，再交由大语言模型生成回答；分割参数决定了片段的粒度，粒度过大会引入噪声，粒度过小则会丢失上下文。\n"
+    ) * 12,
+    "english": (
+        "Retrieval augmented generation splits every document into chunks before indexing. "
+        "Each chunk is embedded and stored in a vector database! When a question arrives, the closest chunks are "
+        "retrieved and passed to the model as context? Chunk size and overlap trade recall for precision; "
+        "larger chunks carry more context, smaller chunks match queries more precisely.\n\n"
+        "The splitter first tries paragraph breaks, then line breaks, then sentence punctuation, then commas, "
+        "then spaces, and finally falls back to single characters.\n"
+    ) * 15,
+    "markdown": (
+        "# 安装指南\n\n"
+        "1. 克隆仓库并进入目录，执行 `pip install -r requirements.txt` 安装依赖。\n"
+        "2. 复制 `.env.example` 为 `.env`，填写数据库、Redis 以及向量数据库的连接信息。\n"
+        "3. 执行 `flask --app app.http.app db upgrade` 完成数据库迁移, then start the API server.\n\n"
+        "## Configuration\n\n"
+        "| key | description |\n| --- | --- |\n| SQLALCHEMY_DATABASE_URI | database url |\n| REDIS_HOST | redis host |\n\n"
+        "```python\ndef split(text: str) -> list[str]:\n    return [line for line in text.splitlines() if line]\n```\n\n"
+    ) * 10,
+}
+
+# 没有任何分隔符的文本，只能回退为按字符拆分
+NO_SEPARATOR_TEXT = "一二三四五六七八九十abcdefghij0123456789" * 120
+
+
+@pytest.fixture
+def encoding():
+    return tiktoken.encoding_for_model("gpt-3.5")
+
+
+def _build_splitters(encoding, chunk_size: int, chunk_overlap: int):
+    token_splitter = TokenOffsetTextSplitter(
+        encoding=encoding,
+        separators=SEPARATORS,
+        is_separator_regex=True,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+    )
+    recursive_splitter = RecursiveCharacterTextSplitter(
+        separators=SEPARATORS,
+        is_separator_regex=True,
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=lambda text: len(encoding.encode(text, disallowed_special=())),
+    )
+    return token_splitter, recursive_splitter
+
+
+def _strip_whitespace(chunks: list[str]) -> str:
+    return "".join("".join(chunk.split()) for chunk in chunks)
+
+
+class TestTokenOffsetTextSplitter:
+    @pytest.mark.parametrize("corpus_name", list(CORPUS.keys()))
+    @pytest.mark.parametrize("chunk_size,chunk_overlap", [(100, 0), (200, 50), (500, 50)])
+    def test_equivalent_to_recursive_splitter(self, corpus_name, chunk_size, chunk_overlap, encoding):
+        """有分隔符的语料中，分割结果与使用token数作为长度函数的RecursiveCharacterTextSplitter只存在token边界差异"""
+        text = CORPUS[corpus_name]
+        token_splitter, recursive_splitter = _build_splitters(encoding, chunk_size, chunk_overlap)
+        chunks = token_splitter.split_text(text)
+        expected_chunks = recursive_splitter.split_text(text)
+
+        expected_set = set(expected_chunks)
+        same_chunks = sum(1 for chunk in chunks if chunk in expected_set)
+        assert len(chunks) <= len(expected_chunks)
+        assert same_chunks >= MIN_SAME_CHUNK_RATIO * len(chunks)
+        assert all(
+            len(encoding.encode(chunk, disallowed_special=())) <= chunk_size + TOKEN_BOUNDARY_TOLERANCE
+            for chunk in chunks
+        )
+        if chunk_overlap == 0:
+            assert _strip_whitespace(chunks) == _strip_whitespace(expected_chunks)
+
+    @pytest.mark.parametrize("chunk_size", [100, 500])
+    def test_character_fallback_counts_real_tokens(self, chunk_size, encoding):
+        """按字符拆分时按实际token数合并，文本块不超过chunk_size，且不会因逐字符计数高估长度而切得更碎"""
+        token_splitter, recursive_splitter = _build_splitters(encoding, chunk_size, 0)
+        chunks = token_splitter.split_text(NO_SEPARATOR_TEXT)
+        expected_chunks = recursive_splitter.split_text(NO_SEPARATOR_TEXT)
+
+        assert "".join(chunks) == NO_SEPARATOR_TEXT
+        assert len(chunks) <= len(expected_chunks)
+        assert all(
+            len(encoding.encode(chunk, disallowed_special=())) <= chunk_size + TOKEN_BOUNDARY_TOLERANCE
+            for chunk in chunks
+        )
@@ -0,0 +1,124 @@
+import uuid
+
+import pytest
+
+from internal.core.workflow.entities import workflow_entity
+from internal.core.workflow.entities.node_entity import NodeType
+from internal.core.workflow.entities.workflow_entity import WorkflowConfig
+from internal.exception import ValidateErrorException
+
+# 深度线性图的节点数，超过Python默认的递归深度限制
+DEEP_GRAPH_NODE_COUNT = 2000
+
+
+def _ref(name: str, node: dict, var_name: str) -> dict:
+    return {"name": name, "value": {"type": "ref", "content": {"ref_node_id": node["id"], "ref_var_name": var_name}}}
+
+
+def _node(node_type: NodeType, title: str, **kwargs) -> dict:
+    return {"id": str(uuid.uuid4()), "node_type": node_type.value, "title": title, **kwargs}
+
+
+def _start_node() -> dict:
+    return _node(NodeType.START, "开始", inputs=[{"name": "query", "value": {"type": "generated"}}])
+
+
+def _template_node(title: str, ref_node: dict, ref_var_name: str = "output") -> dict:
+    return _node(NodeType.TEMPLATE_TRANSFORM, title, template="{{query}}", inputs=[_ref("query", ref_node, ref_var_name)])
+
+
+def _edge(source: dict, target: dict) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "source": source["id"],
+        "source_type": source["node_type"],
+        "source_handle_id": None,
+        "target": target["id"],
+        "target_type": target["node_type"],
+    }
+
+
+def _workflow_config(nodes: list[dict], edges: list[dict]) -> WorkflowConfig:
+    return WorkflowConfig(
+        account_id=uuid.uuid4(),
+        name="test_workflow",
+        description="工作流配置校验测试",
+        nodes=nodes,
+        edges=edges,
+    )
+
+
+class TestWorkflowConfig:
+    def test_reject_cycle(self):
+        """图中存在环路时校验失败"""
+        start = _start_node()
+        node_a = _template_node("模板A", start, "query")
+        node_b = _template_node("模板B", start, "query")
+        end = _node(NodeType.END, "结束", outputs=[_ref("query", start, "query")])
+        edges = [_edge(start, node_a), _edge(node_a, node_b), _edge(node_b, node_a), _edge(node_b, end)]
+
+        with pytest.raises(ValidateErrorException) as exc_info:
+            _workflow_config([start, node_a, node_b, end], edges)
+        assert "环路" in exc_info.value.message
+
+    def test_reject_duplicate_title(self):
+        """节点标题去除首尾空格后重复时校验失败"""
+        start = _start_node()
+        node_a = _template_node("模板", start, "query")
+        node_b = _template_node(" 模板 ", node_a)
+        end = _node(NodeType.END, "结束", outputs=[_ref("query", node_b, "output")])
+        edges = [_edge(start, node_a), _edge(node_a, node_b), _edge(node_b, end)]
+
+        with pytest.raises(ValidateErrorException) as exc_info:
+            _workflow_config([start, node_a, node_b, end], edges)
+        assert "title必须唯一" in exc_info.value.message
+
+    def test_reject_non_ancestor_ref(self):
+        """引用并行分支上的节点(非前置节点)时校验失败"""
+        start = _start_node()
+        node_a = _template_node("模板A", start, "query")
+        node_b = _template_node("模板B", node_a)
+        end = _node(NodeType.END, "结束", outputs=[_ref("query", node_b, "output")])
+        edges = [_edge(start, node_a), _edge(start, node_b), _edge(node_a, end), _edge(node_b, end)]
+
+        with pytest.raises(ValidateErrorException) as exc_info:
+            _workflow_config([start, node_a, node_b, end], edges)
+        assert "模板B" in exc_info.value.message
+
+    def test_accept_deep_linear_graph(self):
+        """深度超过递归限制的线性图可以正常校验通过，且每个节点都可以引用任意前置节点"""
+        start = _start_node()
+        nodes = [start]
+        edges = []
+        for index in range(DEEP_GRAPH_NODE_COUNT):
+            node = _template_node(f"模板{index}", nodes[-1] if index else start, "output" if index else "query")
+            edges.append(_edge(nodes[-1], node))
+            nodes.append(node)
+        end = _node(NodeType.END, "结束", outputs=[_ref("first", nodes[1], "output"), _ref("query", start, "query")])
+        edges.append(_edge(nodes[-1], end))
+        nodes.append(end)
+
+        config = _workflow_config(nodes, edges)
+
+        assert len(config.nodes) == DEEP_GRAPH_NODE_COUNT + 2
+        assert len(config.edges) == DEEP_GRAPH_NODE_COUNT + 1
+
+    def test_cache_hit_returns_unshared_instances(self):
+        """相同图结构命中校验缓存，每个工作流配置持有独立的节点与边实例，修改其中一个不影响其他配置"""
+        start = _start_node()
+        node_a = _template_node("模板A", start, "query")
+        end = _node(NodeType.END, "结束", outputs=[_ref("query", node_a, "output")])
+        nodes = [start, node_a, end]
+        edges = [_edge(start, node_a), _edge(node_a, end)]
+
+        config = _workflow_config(nodes, edges)
+        assert WorkflowConfig._get_graph_hash(nodes, edges) in workflow_entity._validated_graph_cache
+        cached_config = _workflow_config(nodes, edges)
+
+        assert all(node is not cached_node for node, cached_node in zip(config.nodes, cached_config.nodes))
+        assert all(edge is not cached_edge for edge, cached_edge in zip(config.edges, cached_config.edges))
+        config.nodes[1].title = "修改后的模板"
+        config.nodes[1].inputs[0].name = "changed"
+        assert cached_config.nodes[1].title == "模板A"
+        assert cached_config.nodes[1].inputs[0].name == "query"
+        assert _workflow_config(nodes, edges).nodes[1].inputs[0].name == "query"
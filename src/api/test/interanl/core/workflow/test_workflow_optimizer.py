@@ -0,0 +1,165 @@
+import uuid
+
+from internal.core.workflow import workflow_optimizer
+from internal.core.workflow.entities.node_entity import NodeType
+from internal.core.workflow.entities.variable_entity import VariableValueType
+from internal.core.workflow.entities.workflow_entity import WorkflowConfig
+from internal.core.workflow.workflow_optimizer import optimize_workflow_config
+
+
+def _ref(name: str, node: dict, var_name: str) -> dict:
+    return {"name": name, "value": {"type": "ref", "content": {"ref_node_id": node["id"], "ref_var_name": var_name}}}
+
+
+def _literal(name: str, content: str) -> dict:
+    return {"name": name, "value": {"type": "literal", "content": content}}
+
+
+def _node(node_type: NodeType, title: str, **kwargs) -> dict:
+    return {"id": str(uuid.uuid4()), "node_type": node_type.value, "title": title, **kwargs}
+
+
+def _start_node() -> dict:
+    return _node(NodeType.START, "开始", inputs=[{"name": "query", "value": {"type": "generated"}}])
+
+
+def _edge(source: dict, target: dict, source_handle_id: str = None) -> dict:
+    return {
+        "id": str(uuid.uuid4()),
+        "source": source["id"],
+        "source_type": source["node_type"],
+        "source_handle_id": source_handle_id,
+        "target": target["id"],
+        "target_type": target["node_type"],
+    }
+
+
+def _workflow_config(nodes: list[dict], edges: list[dict]) -> WorkflowConfig:
+    return WorkflowConfig(
+        account_id=uuid.uuid4(),
+        name="test_workflow",
+        description="工作流静态优化测试",
+        nodes=nodes,
+        edges=edges,
+    )
+
+
+def _edge_pairs(config: WorkflowConfig) -> set[tuple[str, str, str]]:
+    return {
+        (str(edge.source), str(edge.target), str(edge.source_handle_id) if edge.source_handle_id else None)
+        for edge in config.edges
+    }
+
+
+class TestWorkflowOptimizer:
+    def test_prune_unused_llm_node(self):
+        """输出未被使用的大语言模型节点被剔除，其前置节点直接连接到后续节点"""
+        start = _start_node()
+        llm = _node(NodeType.LLM, "大语言模型", prompt="{{query}}", inputs=[_ref("query", start, "query")])
+        code = _node(
+            NodeType.CODE, "代码",
+            inputs=[_ref("query", start, "query")],
+            outputs=[{"name": "query", "value": {"type": "generated"}}],
+        )
+        end = _node(NodeType.END, "结束", outputs=[_ref("query", code, "query")])
+        config = _workflow_config([start, llm, code, end], [_edge(start, llm), _edge(llm, code), _edge(code, end)])
+
+        optimized_config, report = optimize_workflow_config(config)
+
+        assert [node["title"] for node in report["pruned_nodes"]] == ["大语言模型"]
+        assert {str(node.id) for node in optimized_config.nodes} == {start["id"], code["id"], end["id"]}
+        assert _edge_pairs(optimized_config) == {(start["id"], code["id"], None), (code["id"], end["id"], None)}
+        assert report["added_edges"] == 1
+        assert report["removed_edges"] == 2
+
+    def test_keep_unused_code_node(self):
+        """代码节点可能存在副作用，即使输出未被使用也不会被剔除"""
+        start = _start_node()
+        code = _node(NodeType.CODE, "代码", inputs=[_ref("query", start, "query")], outputs=[])
+        end = _node(NodeType.END, "结束", outputs=[_ref("query", start, "query")])
+        config = _workflow_config([start, code, end], [_edge(start, code), _edge(code, end)])
+
+        optimized_config, report = optimize_workflow_config(config)
+
+        assert report["pruned_nodes"] == []
+        assert {str(node.id) for node in optimized_config.nodes} == {start["id"], code["id"], end["id"]}
+
+    def test_prune_question_classifier_branch_keeps_source_handle(self):
+        """剔除问题分类分支的目标节点后，新连接的边保留原分支的起点句柄"""
+        start = _start_node()
+        handle_llm, handle_code = str(uuid.uuid4()), str(uuid.uuid4())
+        llm = _node(NodeType.LLM, "大语言模型", prompt="{{query}}", inputs=[_ref("query", start, "query")])
+        code = _node(NodeType.CODE, "代码", inputs=[_ref("query", start, "query")], outputs=[])
+        question_classifier = _node(
+            NodeType.QUESTION_CLASSIFIER, "问题分类",
+            inputs=[_ref("query", start, "query")],
+            classes=[
+                {"query": "闲聊", "node_id": llm["id"], "node_type": "llm", "source_handle_id": handle_llm},
+                {"query": "计算", "node_id": code["id"], "node_type": "code", "source_handle_id": handle_code},
+            ],
+        )
+        end = _node(NodeType.END, "结束", outputs=[_ref("query", start, "query")])
+        config = _workflow_config(
+            [start, question_classifier, llm, code, end],
+            [
+                _edge(start, question_classifier),
+                _edge(question_classifier, llm, handle_llm),
+                _edge(question_classifier, code, handle_code),
+                _edge(llm, end),
+                _edge(code, end),
+            ],
+        )
+
+        optimized_config, report = optimize_workflow_config(config)
+
+        assert [node["title"] for node in report["pruned_nodes"]] == ["大语言模型"]
+        assert _edge_pairs(optimized_config) == {
+            (start["id"], question_classifier["id"], None),
+            (question_classifier["id"], end["id"], handle_llm),
+            (question_classifier["id"], code["id"], handle_code),
+            (code["id"], end["id"], None),
+        }
+
+    def test_fold_constant_template(self):
+        """只有直接输入的模板转换节点在发布时渲染，引用其输出的变量替换为直接输入，节点本身被剔除"""
+        start = _start_node()
+        template_transform = _node(
+            NodeType.TEMPLATE_TRANSFORM, "模板转换",
+            template="你好，{{name}}",
+            inputs=[_literal("name", "LLMOps")],
+        )
+        end = _node(
+            NodeType.END, "结束",
+            outputs=[_ref("greeting", template_transform, "output"), _ref("query", start, "query")],
+        )
+        config = _workflow_config(
+            [start, template_transform, end],
+            [_edge(start, template_transform), _edge(template_transform, end)],
+        )
+
+        optimized_config, report = optimize_workflow_config(config)
+
+        assert [node["output"] for node in report["folded_nodes"]] == ["你好，LLMOps"]
+        assert [node["title"] for node in report["pruned_nodes"]] == ["模板转换"]
+        end_node = next(node for node in optimized_config.nodes if node.node_type == NodeType.END)
+        greeting, query = end_node.outputs
+        assert greeting.value.type == VariableValueType.LITERAL
+        assert greeting.value.content == "你好，LLMOps"
+        assert query.value.type == VariableValueType.REF
+        assert _edge_pairs(optimized_config) == {(start["id"], end["id"], None)}
+
+    def test_fallback_when_revalidation_fails(self, monkeypatch):
+        """优化后的配置校验失败时返回原配置，报告中记录错误且不包含任何剔除/折叠结果"""
+        start = _start_node()
+        llm = _node(NodeType.LLM, "大语言模型", prompt="{{query}}", inputs=[_ref("query", start, "query")])
+        end = _node(NodeType.END, "结束", outputs=[_ref("query", start, "query")])
+        config = _workflow_config([start, llm, end], [_edge(start, llm), _edge(llm, end)])
+        monkeypatch.setattr(workflow_optimizer, "_prune_nodes", lambda pruned_nodes, edges: ([], 0, len(edges)))
+
+        optimized_config, report = optimize_workflow_config(config)
+
+        assert optimized_config is config
+        assert report["error"]
+        assert report["pruned_nodes"] == []
+        assert report["folded_nodes"] == []
+        assert report["after"] == report["before"] == {"node_count": 3, "edge_count": 2}